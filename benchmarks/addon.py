@@ -0,0 +1,63 @@
+"""
+Imports the add-on for the benchmarks, inside or outside Blender.
+Outside Blender the minimal bpy in bpy_stub/ stands in for the real one.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+try:
+    import bpy
+    STUBBED = False
+except ImportError:
+    sys.path.insert(0, os.path.join(BENCHMARKS_DIR, "bpy_stub"))
+    import bpy
+    STUBBED = True
+
+from blender_screenwriter import (
+    fountain_document, fountain_fdx, fountain_io, fountain_json, fountain_outline, fountain_paginate,
+    fountain_revision, fountain_search, fountain_stats, screenwriter_breakdown, screenwriter_interchange, screenwriter_load,
+    screenwriter_ops, screenwriter_pages, screenwriter_profile, screenwriter_revision, screenwriter_scenes,
+    screenwriter_stats, screenwriter_timeline, screenwriter_watch,
+)
+
+def new_text(name, content=""):
+    """A text block holding content, as a user would have typed or pasted it"""
+    text = bpy.data.texts.new(name)
+    text.from_string(content)
+    return text
+
+def text_context(text):
+    """Enough of bpy.context for the add-on operators to find text (stub only)"""
+    return SimpleNamespace(
+        edit_text=text,
+        space_data=SimpleNamespace(type='TEXT_EDITOR', text=text),
+        screen=SimpleNamespace(areas=[]),
+    )
+
+def run_operator(cls, text, **properties):
+    """Runs an add-on operator on text, returns its result set"""
+    if STUBBED:
+        operator = cls()
+        for name, value in properties.items():
+            setattr(operator, name, value)
+        return operator.execute(text_context(text))
+    category, name = cls.bl_idname.split(".")
+    with bpy.context.temp_override(edit_text=text):
+        return getattr(getattr(bpy.ops, category), name)(**properties)
+
+def remove_text(text):
+    bpy.data.texts.remove(text)
+
+def clear_scenes():
+    """Removes every scene, with the collections and objects a breakdown put in them"""
+    for scene in list(bpy.data.scenes):
+        bpy.data.scenes.remove(scene)
+    for collection in list(bpy.data.collections):
+        bpy.data.collections.remove(collection)
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
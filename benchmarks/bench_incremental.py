@@ -0,0 +1,59 @@
+"""
+Benchmark: full re-format vs incremental re-format after a one-line edit.
+
+    python benchmarks/bench_incremental.py [--sizes 1000 10000 100000]
+
+Times the bpy-free work behind format_text_block and
+format_text_block_incremental (hashing, window detection, re-classification
+from the cached per-line types).
+"""
+
+import argparse
+import os
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blender_screenwriter import fountain_lines, fountain_parser
+from synth import generate_lines
+
+def full(lines):
+    return "".join([line + "\n" for line in fountain_parser.format_lines(lines)])
+
+def incremental(cached, lines):
+    # update() advances the cache, so every run starts from a copy of it
+    types = fountain_lines.LineTypes()
+    types.hashes = array("i", cached.hashes)
+    types.codes = array("B", cached.codes)
+    return fountain_lines.format_window(types, lines)
+
+def timed(fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"{'lines':>10}{'full ms':>12}{'incr ms':>12}")
+    for n in args.sizes:
+        lines = list(fountain_parser.format_lines(generate_lines(n)))
+        cached = fountain_lines.LineTypes()
+        cached.update(lines)
+
+        edited = list(lines)
+        edited[n // 2] = "MARIA"  # a one-line edit in the middle of the script
+
+        print(f"{n:>10}"
+              f"{timed(full, edited) * 1e3:>12.3f}"
+              f"{timed(incremental, cached, edited) * 1e3:>12.3f}")
+
+if __name__ == "__main__":
+    main()
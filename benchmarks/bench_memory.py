@@ -0,0 +1,56 @@
+"""
+Memory held by parsed scripts: list of (type, content) tuples against ScriptDocument.
+
+    python benchmarks/bench_memory.py [--lines 6000] [--counts 1,10,100]
+
+Parses 1, 10 and 100 synthetic feature-length scripts with each representation
+and prints the memory still allocated (tracemalloc) once parsing is done. The
+source strings are allocated before measuring, since both keep them alive in
+practice (the text datablock or the file read).
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blender_screenwriter import fountain_document, fountain_parser
+from synth import generate_script
+
+REPRESENTATIONS = [
+    ("list of tuples", fountain_parser.parse_elements),
+    ("ScriptDocument", fountain_document.ScriptDocument),
+]
+
+def measure(parse, corpus):
+    """Returns (bytes held, seconds) for parsing every script in corpus"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    parsed = [parse(script) for script in corpus]
+    seconds = time.perf_counter() - start
+    held, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del parsed
+    return held, seconds
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=6000, help="lines per script (a feature is ~6000)")
+    parser.add_argument("--counts", default="1,10,100", help="comma separated script counts")
+    args = parser.parse_args(argv)
+
+    for count in (int(c) for c in args.counts.split(",")):
+        corpus = [generate_script(args.lines, seed, spec_elements=True) for seed in range(count)]
+        source_bytes = sum(sys.getsizeof(script) for script in corpus)
+        print(f"{count} script(s), {source_bytes / 2**20:.1f} MiB of source")
+        for label, parse in REPRESENTATIONS:
+            held, seconds = measure(parse, corpus)
+            print(f"  {label:<16}{held / 2**20:>9.2f} MiB{seconds:>9.3f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Throughput of the spec tokenizer against the parsers it replaced.
+
+    python benchmarks/bench_tokenizer.py [--lines 200000] [--scripts 5]
+
+Parses a corpus of synthetic scripts that mixes in notes, boneyard, sections,
+synopses, centered text, lyrics, page breaks and forced characters, and prints
+lines/second for each implementation.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from blender_screenwriter import fountain_parser
+from legacy_parser import baseline_parse_fountain_elements, single_pass_parse_elements
+from synth import generate_script
+
+PARSERS = [
+    ("baseline parse_fountain_elements", baseline_parse_fountain_elements),
+    ("single-pass classifier", single_pass_parse_elements),
+    ("spec tokenizer", fountain_parser.parse_elements),
+]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=200000, help="lines per script")
+    parser.add_argument("--scripts", type=int, default=5, help="scripts in the corpus")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    corpus = [generate_script(args.lines, seed, spec_elements=True) for seed in range(args.scripts)]
+    total_lines = sum(script.count("\n") for script in corpus)
+
+    for label, parse in PARSERS:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for script in corpus:
+                parse(script)
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<34}{best:>8.3f} s{total_lines / best:>14,.0f} lines/s")
+
+if __name__ == "__main__":
+    main()
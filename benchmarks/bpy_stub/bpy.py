@@ -0,0 +1,391 @@
+"""
+Minimal stand-in for Blender's bpy, enough to import the add-on and run its
+operators on in-memory text blocks and scenes outside Blender.
+Only the benchmarks put this on sys.path, and only when the real bpy is missing.
+"""
+
+import os
+from types import SimpleNamespace
+
+class IDPropertyArray(list):
+    """Int list IDProperty, as Blender returns it"""
+    def to_list(self):
+        return list(self)
+
+class ID:
+    """Datablock with a name and IDProperties (text["key"])"""
+    def __init__(self, name):
+        self.name = name
+        self._props = {}
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        if isinstance(value, (list, tuple)) and value and all(isinstance(v, int) for v in value):
+            value = IDPropertyArray(value)
+        self._props[key] = value
+
+    def __delitem__(self, key):
+        del self._props[key]
+
+    def __contains__(self, key):
+        return key in self._props
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+    def keys(self):
+        return self._props.keys()
+
+class TextLine:
+    __slots__ = ("_text", "_index")
+
+    def __init__(self, text, index):
+        self._text = text
+        self._index = index
+
+    @property
+    def body(self):
+        return self._text._lines[self._index]
+
+    @body.setter
+    def body(self, value):
+        self._text._lines[self._index] = value
+        self._text.is_dirty = True
+
+class TextLines:
+    def __init__(self, text):
+        self._text = text
+
+    def __len__(self):
+        return len(self._text._lines)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return TextLine(self._text, index)
+
+    def __iter__(self):
+        return (TextLine(self._text, i) for i in range(len(self)))
+
+class Text(ID):
+    """Text datablock: a list of lines, always at least one (possibly empty)"""
+    def __init__(self, name):
+        super().__init__(name)
+        self._lines = [""]
+        self.filepath = ""
+        self.is_dirty = False
+        self.use_syntax_highlight = True
+        self.current_line_index = 0
+        self.current_character = 0
+
+    @property
+    def lines(self):
+        return TextLines(self)
+
+    @property
+    def current_line(self):
+        return TextLine(self, self.current_line_index)
+
+    def as_string(self):
+        return "\n".join(self._lines)
+
+    def from_string(self, string):
+        self._lines = string.split("\n")
+        self.is_dirty = True
+
+    def clear(self):
+        self._lines = [""]
+        self.current_line_index = self.current_character = 0
+        self.is_dirty = True
+
+    def select_set(self, line_start, char_start, line_end, char_end):
+        self.current_line_index, self.current_character = line_start, char_start
+        self._select_end = (line_end, char_end)
+
+    def write(self, string):
+        # Replaces the selection, if any, then inserts at the cursor and leaves
+        # the cursor after the inserted text
+        select_end = getattr(self, "_select_end", None)
+        if select_end is not None:
+            self._select_end = None
+            end_line, end_character = select_end
+            head = self._lines[self.current_line_index][:self.current_character]
+            tail = self._lines[end_line][end_character:]
+            self._lines[self.current_line_index:end_line + 1] = [head + tail]
+        line = self._lines[self.current_line_index]
+        head, tail = line[:self.current_character], line[self.current_character:]
+        pieces = string.split("\n")
+        last = len(pieces[-1]) + (len(head) if len(pieces) == 1 else 0)
+        pieces[0] = head + pieces[0]
+        pieces[-1] += tail
+        self._lines[self.current_line_index:self.current_line_index + 1] = pieces
+        self.current_line_index += len(pieces) - 1
+        self.current_character = last
+        self.is_dirty = True
+
+    def cursor_set(self, line, character=0, select=False):
+        self.current_line_index = max(0, min(line, len(self._lines) - 1))
+        self.current_character = character
+
+class Strip(ID):
+    """Scene strip; its content is the frame range of the scene it shows"""
+    def __init__(self, name, scene, channel, frame_start):
+        super().__init__(name)
+        self.scene = scene
+        self.channel = channel
+        self.frame_start = frame_start
+        self.frame_final_duration = scene.frame_end - scene.frame_start + 1
+
+    @property
+    def frame_final_start(self):
+        return self.frame_start
+
+    @property
+    def frame_final_end(self):
+        return self.frame_start + self.frame_final_duration
+
+class Strips(list):
+    def new_scene(self, name, scene, channel, frame_start):
+        strip = Strip(name, scene, channel, frame_start)
+        self.append(strip)
+        return strip
+
+    def remove(self, strip):
+        list.remove(self, strip)
+
+class Marker:
+    def __init__(self, name, frame):
+        self.name = name
+        self.frame = frame
+
+class Markers(list):
+    def new(self, name, frame=1):
+        marker = Marker(name, frame)
+        self.append(marker)
+        return marker
+
+    def remove(self, marker):
+        list.remove(self, marker)
+
+class Links(list):
+    """Collection.children and Collection.objects: datablocks linked by reference"""
+    def get(self, name, default=None):
+        for item in self:
+            if item.name == name:
+                return item
+        return default
+
+    def link(self, item):
+        if item in self:
+            raise RuntimeError(f"'{item.name}' already in collection")
+        self.append(item)
+
+    def unlink(self, item):
+        list.remove(self, item)
+
+class BlendCollection(ID):
+    """bpy.types.Collection (bpy.data.collections items): objects and child collections"""
+    def __init__(self, name):
+        super().__init__(name)
+        self.children = Links()
+        self.objects = Links()
+
+class Object(ID):
+    def __init__(self, name, object_data=None):
+        super().__init__(name)
+        self.data = object_data
+        self.empty_display_type = 'PLAIN_AXES'
+        self.empty_display_size = 1.0
+
+class Scene(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.collection = BlendCollection("Scene Collection")
+        self.frame_start = 1
+        self.frame_end = 250
+        self.render = SimpleNamespace(fps=24, fps_base=1.0)
+        self.timeline_markers = Markers()
+        self.sequence_editor = None
+
+    def sequence_editor_create(self):
+        if self.sequence_editor is None:
+            self.sequence_editor = SimpleNamespace(strips=Strips())
+        return self.sequence_editor
+
+class Collection(list):
+    """bpy.data collection: get/new/remove by name"""
+    def __init__(self, type_):
+        super().__init__()
+        self._type = type_
+
+    def get(self, name, default=None):
+        for item in self:
+            if item.name == name:
+                return item
+        return default
+
+    def new(self, name, *args):
+        # Blender de-duplicates names with a .001 suffix
+        unique, count = name, 0
+        while self.get(unique) is not None:
+            count += 1
+            unique = f"{name}.{count:03d}"
+        item = self._type(unique, *args)
+        self.append(item)
+        return item
+
+    def remove(self, item):
+        list.remove(self, item)
+
+class _Base:
+    pass
+
+# Value of a property defined without a default, by property function
+_TYPE_DEFAULTS = {"BoolProperty": False, "IntProperty": 0, "FloatProperty": 0.0, "StringProperty": ""}
+
+class Operator(_Base):
+    def __init__(self):
+        self.reports = []
+        # Like Blender, properties start at their default values
+        for cls in reversed(type(self).__mro__):
+            for name, definition in vars(cls).get("__annotations__", {}).items():
+                if isinstance(definition, dict) and "_property" in definition:
+                    setattr(self, name, definition.get("default", _TYPE_DEFAULTS.get(definition["_property"])))
+
+    def report(self, level, message):
+        self.reports.append((set(level), message))
+
+class _Menu(_Base):
+    _draw_funcs = []
+
+    @classmethod
+    def append(cls, func):
+        cls._draw_funcs.append(func)
+
+    @classmethod
+    def remove(cls, func):
+        if func in cls._draw_funcs:
+            cls._draw_funcs.remove(func)
+
+class _Types(SimpleNamespace):
+    def __getattr__(self, name):
+        # Any other bpy.types class (Panel, UIList, PropertyGroup, menus...)
+        cls = type(name, (_Menu if "_MT_" in name else _Base,), {"_draw_funcs": []})
+        setattr(self, name, cls)
+        return cls
+
+types = _Types(Operator=Operator, Text=Text, Scene=Scene, ID=ID, Collection=BlendCollection, Object=Object)
+
+class PropertyCollection(list):
+    """Items of a CollectionProperty"""
+    def __init__(self, item_type):
+        super().__init__()
+        self._item_type = item_type
+
+    def add(self):
+        item = self._item_type()
+        self.append(item)
+        return item
+
+    def remove(self, index):
+        del self[index]
+
+class _CollectionProperty:
+    """CollectionProperty assigned to a type (bpy.types.Text.items = ...): one collection per instance"""
+    def __init__(self, type=None, **kwargs):
+        self._item_type = type
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        collections = instance.__dict__.setdefault("_collections", {})
+        return collections.setdefault(id(self), PropertyCollection(self._item_type))
+
+class _Props:
+    CollectionProperty = _CollectionProperty
+
+    def __getattr__(self, name):
+        # Property definitions are only annotations: return their keyword arguments
+        return lambda **kwargs: dict(kwargs, _property=name)
+
+props = _Props()
+
+class _Utils:
+    registered = []
+
+    def register_class(self, cls):
+        self.registered.append(cls)
+
+    def unregister_class(self, cls):
+        if cls in self.registered:
+            self.registered.remove(cls)
+
+utils = _Utils()
+
+class _Timers:
+    def __init__(self):
+        self._functions = {}
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        self._functions[function] = first_interval
+
+    def unregister(self, function):
+        self._functions.pop(function, None)
+
+    def is_registered(self, function):
+        return function in self._functions
+
+app = SimpleNamespace(
+    background=True,
+    version=(4, 0, 0),
+    timers=_Timers(),
+    handlers=SimpleNamespace(
+        load_post=[], save_post=[], undo_post=[], redo_post=[], depsgraph_update_post=[],
+        persistent=lambda function: function,
+    ),
+)
+
+def _abspath(path, start=None, library=None):
+    # "//" is the directory of the .blend file
+    if path.startswith("//"):
+        path = os.path.join(os.path.dirname(data.filepath) if start is None else start, path[2:])
+    return os.path.abspath(path)
+
+path = SimpleNamespace(abspath=_abspath)
+
+data = SimpleNamespace(
+    texts=Collection(Text),
+    scenes=Collection(Scene),
+    collections=Collection(BlendCollection),
+    objects=Collection(Object),
+    filepath="",
+)
+
+class _Ops:
+    def __getattr__(self, name):
+        return _Ops()
+
+    def __call__(self, *args, **kwargs):
+        return {'CANCELLED'}
+
+ops = _Ops()
+
+context = SimpleNamespace(
+    preferences=SimpleNamespace(addons={}),
+    window_manager=SimpleNamespace(windows=[]),
+    edit_text=None,
+    space_data=None,
+    screen=SimpleNamespace(areas=[]),
+)
+
+def reset():
+    """Empties bpy.data between benchmark runs"""
+    data.texts.clear()
+    data.scenes.clear()
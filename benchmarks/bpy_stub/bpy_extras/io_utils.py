@@ -0,0 +1,7 @@
+"""Stand-in for bpy_extras.io_utils (see ../bpy.py)"""
+
+class ImportHelper:
+    filepath = ""
+
+class ExportHelper:
+    filepath = ""
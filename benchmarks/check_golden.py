@@ -0,0 +1,200 @@
+"""
+Correctness golden files for the parsing and formatting paths.
+
+    python benchmarks/check_golden.py [--update]
+
+For every golden/*.fountain input, compares against golden/expected/:
+  <name>.elements.json     parse_fountain_elements, as [type, content] pairs
+  <name>.formatted.txt     the text block after format_text_block
+  <name>.exported.fountain write_fountain_file of the formatted text block
+  <name>.scenes.json       scene names created by Sync Scenes
+  <name>.breakdown.json    per scene, the collections and properties Breakdown to Scenes gives it
+  <name>.pages.txt         fountain_paginate.paginate, pages separated by form feeds
+  <name>.stats.json        fountain_stats.analyze, as exported
+  <name>.fdx               fountain_fdx export
+  <name>.dump.json         fountain_json export
+and checks that the script reads back from both as the same elements, and that
+editing any one line and re-formatting incrementally gives what a full format
+would. For
+every golden/*.fdx (Final Draft files), compares <name>.imported.fountain.
+--update rewrites the expectations from the current code; only do that for an
+intended change in output, and review the diff.
+"""
+
+import argparse
+import difflib
+import glob
+import json
+import os
+import sys
+import tempfile
+
+from addon import (
+    BENCHMARKS_DIR, bpy, clear_scenes, fountain_document, fountain_io, fountain_paginate, fountain_stats, new_text,
+    remove_text, run_operator, screenwriter_breakdown, screenwriter_scenes,
+)
+from blender_screenwriter import fountain_fdx, fountain_json, fountain_lines, fountain_parser
+
+GOLDEN_DIR = os.path.join(BENCHMARKS_DIR, "golden")
+EXPECTED_DIR = os.path.join(GOLDEN_DIR, "expected")
+
+def _read(filepath):
+    with open(filepath, encoding="utf-8", newline="") as f:
+        return f.read()
+
+def _json_lines(items):
+    # One item per line, so a changed classification is a one line diff
+    return "[\n" + ",\n".join(json.dumps(item, ensure_ascii=False) for item in items) + "\n]\n"
+
+def outputs(filepath):
+    """Returns {expected file suffix: content} for one golden input"""
+    raw_content = _read(filepath)
+    elements = [list(element) for element in fountain_io.parse_fountain_elements(raw_content)]
+    stats = fountain_stats.stats_dict(fountain_stats.analyze(fountain_document.ScriptDocument(raw_content)))
+    paginated = fountain_paginate.paginate(raw_content.splitlines())
+    pages = "\f\n".join("".join(" " * column + row + "\n" for column, row in page) for page in paginated.pages)
+
+    text = new_text(os.path.basename(filepath), raw_content)
+    try:
+        fountain_io.format_text_block(text)
+        formatted = text.as_string()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            export_path = os.path.join(tmp, "export.fountain")
+            fountain_io.write_fountain_file(export_path, text)
+            exported = _read(export_path)
+
+        clear_scenes()
+        run_operator(screenwriter_scenes.SCREENWRITER_OT_sync_scenes, text)
+        scenes = [scene.name for scene in bpy.data.scenes if scene.get("screenwriter_text") == text.name]
+
+        run_operator(screenwriter_breakdown.SCREENWRITER_OT_breakdown_scenes, text)
+        breakdown = []
+        for name in scenes:
+            scene = bpy.data.scenes.get(name)
+            collection = screenwriter_breakdown._breakdown_collection(scene)
+            breakdown.append([
+                name,
+                [child.name for child in collection.children] if collection else None,
+                scene.get("screenwriter_time_of_day"),
+                scene.get("screenwriter_day_night"),
+                scene.get("screenwriter_notes"),
+            ])
+    finally:
+        clear_scenes()
+        remove_text(text)
+
+    return {
+        ".elements.json": _json_lines(elements),
+        ".formatted.txt": formatted,
+        ".exported.fountain": exported,
+        ".scenes.json": _json_lines(scenes),
+        ".breakdown.json": _json_lines(breakdown),
+        ".pages.txt": pages,
+        ".stats.json": json.dumps(stats, indent=1, ensure_ascii=False) + "\n",
+        ".fdx": "".join(fountain_fdx.fdx_chunks(raw_content.split("\n"))),
+        ".dump.json": "".join(fountain_json.json_chunks(raw_content.split("\n"))),
+    }
+
+def _elements(lines):
+    return [(t, c) for t, c, _line in fountain_parser.classify_lines(lines) if t != fountain_parser.BLANK]
+
+def roundtrip_failures(filepath):
+    """Interchange formats the golden input does not read back from as the same elements"""
+    raw_content = _read(filepath)
+    lines = raw_content.split("\n")
+    expected = _elements(lines)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, chunks, reader in (
+            ("fdx", fountain_fdx.fdx_chunks, fountain_fdx.read_fdx),
+            ("json", fountain_json.json_chunks, fountain_json.read_json),
+        ):
+            path = os.path.join(tmp, "roundtrip." + name)
+            fountain_parser.write_atomic(path, chunks(lines))
+            if _elements(reader(path)) != expected:
+                failures.append(name)
+    return failures
+
+def incremental_failures(filepath):
+    """Lines where an edit re-formatted by format_text_block_incremental differs from a full format"""
+    text = new_text(os.path.basename(filepath), _read(filepath))
+    failures = []
+    try:
+        fountain_io.format_text_block(text)
+        formatted = text.as_string().split("\n")
+        for i, line in enumerate(formatted):
+            for edit in (line + " x", ""):
+                edited = formatted[:i] + [edit] + formatted[i + 1:]
+                text.from_string("\n".join(formatted))
+                fountain_io.format_text_block(text)
+                text.from_string("\n".join(edited))
+                fountain_io.format_text_block_incremental(text)
+                if text.as_string() != "\n".join(fountain_parser.format_lines(edited)):
+                    failures.append(i + 1)
+                    break
+                # The same edit, known to the caller along with the line types before it
+                types = fountain_lines.LineTypes()
+                types.update(formatted)
+                text.from_string("\n".join(edited))
+                fountain_io.format_text_block_incremental(text, (i, i + 1, i + 1), types)
+                if text.as_string() != "\n".join(fountain_parser.format_lines(edited)):
+                    failures.append(i + 1)
+                    break
+    finally:
+        remove_text(text)
+    return failures
+
+def import_outputs(filepath):
+    """Returns {expected file suffix: content} for one golden Final Draft input"""
+    return {".imported.fountain": "".join(line + "\n" for line in fountain_fdx.read_fdx(filepath))}
+
+def check(update=False, out=sys.stdout):
+    """Returns the number of mismatching expected files (0 when all pass)"""
+    failures = 0
+    os.makedirs(EXPECTED_DIR, exist_ok=True)
+    inputs = [(path, outputs) for path in sorted(glob.glob(os.path.join(GOLDEN_DIR, "*.fountain")))]
+    inputs += [(path, import_outputs) for path in sorted(glob.glob(os.path.join(GOLDEN_DIR, "*.fdx")))]
+    for filepath, make_outputs in inputs:
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        if make_outputs is outputs:
+            for format_name in roundtrip_failures(filepath):
+                failures += 1
+                print(f"FAIL {name} does not read back the same from {format_name}", file=out)
+            lines = incremental_failures(filepath)
+            if lines:
+                failures += 1
+                print(f"FAIL {name} incremental format differs after editing lines {lines[:10]}", file=out)
+        for suffix, actual in make_outputs(filepath).items():
+            expected_path = os.path.join(EXPECTED_DIR, name + suffix)
+            if update:
+                with open(expected_path, "w", encoding="utf-8", newline="") as f:
+                    f.write(actual)
+                continue
+            expected = _read(expected_path) if os.path.exists(expected_path) else ""
+            if actual != expected:
+                failures += 1
+                print(f"FAIL {name}{suffix}", file=out)
+                diff = difflib.unified_diff(
+                    expected.splitlines(), actual.splitlines(), "expected", "actual", lineterm="", n=1,
+                )
+                for line in list(diff)[:40]:
+                    print("    " + line, file=out)
+    return failures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--update", action="store_true", help="rewrite the expected files")
+    args = parser.parse_args(argv)
+
+    failures = check(args.update)
+    if args.update:
+        print(f"Updated {EXPECTED_DIR}")
+    elif failures:
+        print(f"{failures} golden file(s) differ")
+        sys.exit(1)
+    else:
+        print("Golden files match")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Reference copies of earlier parser implementations, kept only so the benchmarks
+can compare against them. Not used by the add-on.
+"""
+
+# Original heuristics and parse_fountain_elements (re-strips neighbouring lines)
+
+def is_scene_header(line):
+    s = line.strip()
+    return s.startswith(("INT.", "EXT.", "INT ", "EXT ", "EST.", ". ", "I/E"))
+
+def is_character(line):
+    # Basic heuristic: Uppercase and not a scene header
+    s = line.strip()
+    return s.isupper() and not is_scene_header(s)
+
+def is_parenthetical(line):
+    s = line.strip()
+    return s.startswith("(") and s.endswith(")")
+
+def is_transition(line):
+    s = line.strip()
+    # Forced transition or standard "TO:" ending
+    if s.startswith(">"): return True
+    return s.isupper() and s.endswith("TO:")
+
+def baseline_parse_fountain_elements(raw_content):
+    """
+    Parses raw text into a list of (type, content) tuples.
+    Types: HEADER, ACTION, CHARACTER, DIALOGUE, PARENTHETICAL, TRANSITION
+    """
+    lines = raw_content.splitlines()
+    elements = []
+    
+    if not lines: return elements
+
+    for i, raw_line in enumerate(lines):
+        line = raw_line.strip()
+        
+        if not line:
+            continue
+            
+        # Context checks
+        prev_line_empty = True
+        if i > 0:
+            prev_line_empty = (lines[i-1].strip() == "")
+            
+        element_type = "ACTION"
+        content = line
+        
+        if is_scene_header(line):
+            element_type = "HEADER"
+            
+        elif is_transition(line):
+             element_type = "TRANSITION"
+             if line.startswith(">"):
+                 content = line[1:].strip()
+                 
+        elif is_character(line) and prev_line_empty:
+            element_type = "CHARACTER"
+            
+        elif is_parenthetical(line):
+            element_type = "PARENTHETICAL"
+            
+        else:
+            # Dialogue Check
+            is_dialogue = False
+            if i > 0 and not prev_line_empty:
+                prev_line = lines[i-1].strip()
+                prev_prev_empty = True
+                if i > 1:
+                    prev_prev_empty = (lines[i-2].strip() == "")
+                
+                prev_is_char = is_character(prev_line) and prev_prev_empty
+                prev_is_paren = is_parenthetical(prev_line)
+                
+                if prev_is_char or prev_is_paren:
+                    is_dialogue = True
+            
+            if is_dialogue:
+                 element_type = "DIALOGUE"
+        
+        elements.append( (element_type, content) )
+        
+    return elements
+
+# Single-pass classifier that preceded the spec tokenizer
+
+_SCENE_PREFIXES = ("INT.", "EXT.", "INT ", "EXT ", "EST.", ". ", "I/E")
+
+def single_pass_classify(lines):
+    """
+    Classifies an iterable of raw lines in a single pass.
+    Yields one (type, content) tuple per input line; empty lines yield ("BLANK", "").
+    Each line is stripped exactly once and the look-behind needed for
+    character/dialogue detection is carried forward instead of re-examined.
+    """
+    prev_empty = True
+    # Previous line was a character cue or parenthetical, so this one may be dialogue
+    prev_cue = False
+
+    for raw_line in lines:
+        line = raw_line.strip()
+
+        if not line:
+            prev_empty = True
+            prev_cue = False
+            yield "BLANK", ""
+            continue
+
+        upper = line.isupper()
+        header = line.startswith(_SCENE_PREFIXES)
+        character = upper and not header
+        paren = line.startswith("(") and line.endswith(")")
+
+        # 1. Scene Header: Always wins
+        if header:
+            element_type = "HEADER"
+        # 2. Transition: Forced > (stripped) or uppercase ending in TO:
+        elif line.startswith(">"):
+            element_type = "TRANSITION"
+            line = line[1:].strip()
+        elif upper and line.endswith("TO:"):
+            element_type = "TRANSITION"
+        # 3. Character: Uppercase, NOT a header/transition, and PRECEDED BY EMPTY LINE
+        elif character and prev_empty:
+            element_type = "CHARACTER"
+        # 4. Parenthetical: Wrapped in ()
+        elif paren:
+            element_type = "PARENTHETICAL"
+        # 5. Dialogue: previous line was a Character or Parenthetical
+        elif prev_cue:
+            element_type = "DIALOGUE"
+        else:
+            element_type = "ACTION"
+
+        prev_cue = (character and prev_empty) or paren
+        prev_empty = False
+        yield element_type, line
+
+def single_pass_parse_elements(raw_content):
+    return [(t, c) for t, c in single_pass_classify(raw_content.splitlines()) if t != "BLANK"]
@@ -0,0 +1,519 @@
+"""
+Benchmark suite for the parsing and formatting hot paths.
+
+    python benchmarks/run.py [--lines 1000,10000,100000] [--mix action=0.6,beats=4-12]
+                             [--ops parse,format] [--output results.json]
+                             [--compare baseline.json] [--threshold 0.10]
+
+Runs outside Blender on the stub in bpy_stub/ (or inside Blender, e.g.
+blender -b -P benchmarks/run.py -- --lines 10000). Checks the golden files
+first, then times every operation on synthetic scripts of each size and prints
+a table. --output writes the timings as JSON; --compare reads a previous
+--output and exits with status 1 if any operation got slower by more than
+--threshold (a fraction, 0.10 = 10%).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from addon import (
+    BENCHMARKS_DIR, STUBBED, bpy, clear_scenes, fountain_document, fountain_fdx, fountain_io, fountain_json,
+    fountain_outline, fountain_paginate, fountain_revision, fountain_search, fountain_stats, new_text, remove_text,
+    run_operator, screenwriter_breakdown, screenwriter_interchange, screenwriter_load, screenwriter_ops, screenwriter_pages,
+    screenwriter_profile, screenwriter_revision, screenwriter_scenes, screenwriter_stats, screenwriter_timeline,
+    screenwriter_watch,
+)
+from blender_screenwriter import fountain_lines
+import check_golden
+from synth import DEFAULT_MIX, generate_script, parse_mix
+
+_unique = itertools.count()
+
+def _edit_first_header(raw_content):
+    # One renamed scene, as a writer would between two syncs
+    return raw_content.replace(" - ", " - LATER ", 1)
+
+def bench_parse(raw_content, tmp):
+    return None, lambda: fountain_io.parse_fountain_elements(raw_content)
+
+def bench_format(raw_content, tmp):
+    text = new_text("bench.fountain", raw_content)
+    return (lambda: remove_text(text)), lambda: fountain_io.format_text_block(text)
+
+def bench_format_instrumented(raw_content, tmp):
+    # The same as format with timings recorded, to see what instrumentation costs
+    text = new_text("bench.fountain", raw_content)
+    screenwriter_profile.enable()
+
+    def cleanup():
+        screenwriter_profile.disable()
+        screenwriter_profile.recorder.clear()
+        remove_text(text)
+
+    return cleanup, lambda: fountain_io.format_text_block(text)
+
+def bench_format_incremental(raw_content, tmp):
+    # One line typed into the middle of an already formatted script
+    text = new_text("bench.fountain", raw_content)
+    fountain_io.format_text_block(text)
+    # The first incremental format after a full one classifies every line once
+    first = text.lines[0]
+    first.body = first.body + " "
+    fountain_io.format_text_block_incremental(text)
+    middle = text.lines[len(text.lines) // 2]
+    middle.body = middle.body + " And then some."
+    return (lambda: remove_text(text)), lambda: fountain_io.format_text_block_incremental(text)
+
+def bench_format_edit(raw_content, tmp):
+    # The same line typed, with the edit and the line types before it known (as on reload)
+    text = new_text("bench.fountain", raw_content)
+    fountain_io.format_text_block(text)
+    types = fountain_lines.LineTypes()
+    types.update(text.as_string().split("\n"))
+    middle = len(text.lines) // 2
+    text.lines[middle].body = text.lines[middle].body + " And then some."
+    edit = (middle, middle + 1, middle + 1)
+    return (lambda: remove_text(text)), lambda: fountain_io.format_text_block_incremental(text, edit, types)
+
+def bench_import(raw_content, tmp):
+    filepath = os.path.join(tmp, "import.fountain")
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write(raw_content)
+    before = set(bpy.data.texts)
+
+    def cleanup():
+        for text in set(bpy.data.texts) - before:
+            remove_text(text)
+
+    return cleanup, lambda: run_operator(fountain_io.SCREENWRITER_OT_import_fountain, None, filepath=filepath, use_mmap=False)
+
+def bench_export(raw_content, tmp):
+    text = new_text("bench.fountain", raw_content)
+    fountain_io.format_text_block(text)
+    filepath = os.path.join(tmp, "export.fountain")
+    return (lambda: remove_text(text)), lambda: run_operator(fountain_io.SCREENWRITER_OT_export_fountain, text, filepath=filepath)
+
+def bench_save(raw_content, tmp):
+    text = new_text("bench.fountain", raw_content)
+    fountain_io.format_text_block(text)
+    text.filepath = os.path.join(tmp, "save.fountain")
+    return (lambda: remove_text(text)), lambda: run_operator(fountain_io.SCREENWRITER_OT_save_fountain, text)
+
+def bench_save_unchanged(raw_content, tmp):
+    # Saved once already: only the export is hashed and the file stamp compared
+    text = new_text("bench.fountain", raw_content)
+    fountain_io.format_text_block(text)
+    text.filepath = os.path.join(tmp, "save.fountain")
+    fountain_io.save_fountain_file(text)
+    return (lambda: remove_text(text)), lambda: run_operator(fountain_io.SCREENWRITER_OT_save_fountain, text)
+
+def bench_format_unchanged(raw_content, tmp):
+    text = new_text("bench.fountain", raw_content)
+    fountain_io.format_text_block(text)
+    return (lambda: remove_text(text)), lambda: run_operator(fountain_io.SCREENWRITER_OT_format_fountain, text)
+
+def bench_sync_scenes(raw_content, tmp):
+    # First sync: every scene is created
+    clear_scenes()
+    text = new_text("bench.fountain", raw_content)
+
+    def cleanup():
+        clear_scenes()
+        remove_text(text)
+
+    return cleanup, lambda: run_operator(screenwriter_scenes.SCREENWRITER_OT_sync_scenes, text)
+
+def bench_resync_scenes(raw_content, tmp):
+    # Re-sync after renaming one scene: only that scene is touched
+    clear_scenes()
+    text = new_text("bench.fountain", raw_content)
+    run_operator(screenwriter_scenes.SCREENWRITER_OT_sync_scenes, text)
+    text.from_string(_edit_first_header(raw_content))
+
+    def cleanup():
+        clear_scenes()
+        remove_text(text)
+
+    return cleanup, lambda: run_operator(screenwriter_scenes.SCREENWRITER_OT_sync_scenes, text)
+
+def bench_breakdown(raw_content, tmp):
+    # First breakdown of synced scenes: every scene and asset is created
+    clear_scenes()
+    text = new_text("bench.fountain", raw_content)
+    run_operator(screenwriter_scenes.SCREENWRITER_OT_sync_scenes, text)
+
+    def cleanup():
+        clear_scenes()
+        remove_text(text)
+
+    return cleanup, lambda: run_operator(screenwriter_breakdown.SCREENWRITER_OT_breakdown_scenes, text)
+
+def bench_rebreakdown(raw_content, tmp):
+    # A new character speaks in one scene: only that scene is touched
+    clear_scenes()
+    text = new_text("bench.fountain", raw_content)
+    run_operator(screenwriter_breakdown.SCREENWRITER_OT_breakdown_scenes, text)
+    middle = raw_content.find("\n\n", len(raw_content) // 2)
+    text.from_string(raw_content[:middle] + "\n\nNEWCOMER\nSorry I'm late." + raw_content[middle:])
+
+    def cleanup():
+        clear_scenes()
+        remove_text(text)
+
+    return cleanup, lambda: run_operator(screenwriter_breakdown.SCREENWRITER_OT_breakdown_scenes, text)
+
+def bench_paginate(raw_content, tmp):
+    lines = raw_content.split("\n")
+    return None, lambda: fountain_paginate.paginate(lines)
+
+def bench_count_pages(raw_content, tmp):
+    lines = raw_content.split("\n")
+    return None, lambda: fountain_paginate.count_pages(lines)
+
+def bench_export_pdf(raw_content, tmp):
+    text = new_text("bench.fountain", raw_content)
+    fountain_io.format_text_block(text)
+    filepath = os.path.join(tmp, "export.pdf")
+    return (lambda: remove_text(text)), lambda: run_operator(screenwriter_pages.SCREENWRITER_OT_export_pdf, text, filepath=filepath)
+
+def bench_stats(raw_content, tmp):
+    document = fountain_document.ScriptDocument(raw_content)
+    return None, lambda: fountain_stats.analyze(document)
+
+def bench_stats_incremental(raw_content, tmp):
+    # Counted once, then one line of dialogue is edited
+    cache = {}
+    fountain_stats.analyze(fountain_document.ScriptDocument(raw_content), cache)
+    document = fountain_document.ScriptDocument(raw_content.replace(" why ", " why oh why ", 1))
+    return None, lambda: fountain_stats.analyze(document, cache)
+
+def bench_export_stats(raw_content, tmp):
+    # A new name every run, so the statistics are not already cached for it
+    text = new_text(f"bench{next(_unique)}.fountain", raw_content)
+    filepath = os.path.join(tmp, "stats.csv")
+    return (lambda: remove_text(text)), lambda: run_operator(screenwriter_stats.SCREENWRITER_OT_export_stats, text, filepath=filepath, file_format='CSV')
+
+def bench_sync_timeline(raw_content, tmp):
+    # First sync: every scene, strip and marker is created
+    clear_scenes()
+    text = new_text(f"bench{next(_unique)}.fountain", raw_content)
+
+    def cleanup():
+        clear_scenes()
+        remove_text(text)
+
+    return cleanup, lambda: run_operator(screenwriter_timeline.SCREENWRITER_OT_sync_timeline, text, method='EIGHTHS', words_per_minute=150)
+
+def bench_resync_timeline(raw_content, tmp):
+    # Re-sync after one scene got longer: its strip is resized, later ones move
+    clear_scenes()
+    text = new_text(f"bench{next(_unique)}.fountain", raw_content)
+    screenwriter_timeline.sync_timeline(text)
+    middle = raw_content.find("\n\n", len(raw_content) // 2)
+    text.from_string(raw_content[:middle] + "\n\nA new paragraph of action." * 8 + raw_content[middle:])
+
+    def cleanup():
+        clear_scenes()
+        remove_text(text)
+
+    return cleanup, lambda: run_operator(screenwriter_timeline.SCREENWRITER_OT_sync_timeline, text, method='EIGHTHS', words_per_minute=150)
+
+def bench_cycle_element(raw_content, tmp):
+    # Tab on an empty line in the middle, after a line above it was edited:
+    # the line types are brought up to date, then the line is formatted
+    text = new_text(f"bench{next(_unique)}.fountain", raw_content)
+    screenwriter_ops.line_types(text)
+    middle = raw_content.count("\n", 0, raw_content.find("\n\n", len(raw_content) // 2)) + 1
+    text.lines[middle - 1].body += " Edited."
+    text.cursor_set(middle)
+    return (lambda: remove_text(text)), lambda: run_operator(screenwriter_ops.SCREENWRITER_OT_cycle_element, text)
+
+def bench_sidebar_draw(raw_content, tmp):
+    # What one redraw of the sidebar reads from the caches, counted once before
+    text = new_text(f"bench{next(_unique)}.fountain", raw_content)
+    screenwriter_stats.compute_stats(text)
+    screenwriter_pages._recount(text.name)
+    screenwriter_revision.take_snapshot(text)
+    screenwriter_revision.compute_diff(text)
+
+    def draw():
+        screenwriter_stats.cached_stats(text)
+        screenwriter_pages.page_estimate(text)
+        screenwriter_revision.cached_diff(text)
+
+    return (lambda: remove_text(text)), draw
+
+def bench_outline(raw_content, tmp):
+    return None, lambda: fountain_outline.Outline().update(raw_content.split("\n"))
+
+def bench_outline_incremental(raw_content, tmp):
+    # Outline built once, then a scene header is inserted in the middle
+    outline = fountain_outline.Outline()
+    lines = raw_content.split("\n")
+    outline.update(lines)
+    middle = len(lines) // 2
+    lines[middle:middle] = ["", "INT. NEW ROOM - NIGHT", ""]
+    return None, lambda: outline.update(lines)
+
+SEASON = 20
+
+def bench_search_index(raw_content, tmp):
+    return None, lambda: fountain_search.SearchIndex().update("episode.fountain", None, lambda: raw_content)
+
+def bench_search_query(raw_content, tmp):
+    # A season of SEASON episodes of this size: a character at a time of day, then a word
+    index = fountain_search.SearchIndex()
+    for episode in range(SEASON):
+        content = raw_content + "\n" * episode
+        index.update(f"episode{episode:02}.fountain", None, lambda: content)
+    queries = [fountain_search.parse_query(q) for q in ("@MARIA time:NIGHT", "location:OFFICE coffee")]
+    return None, lambda: [index.search(query) for query in queries]
+
+def bench_load_format(raw_content, tmp):
+    # Draining the load queue of a SEASON-episode file, without a time budget
+    texts = [new_text(f"bench{next(_unique)}.fountain", raw_content) for _ in range(SEASON)]
+    screenwriter_load._state.update(queue=[text.name for text in texts], job=None, current=None)
+
+    def cleanup():
+        screenwriter_load.timings.clear()
+        for text in texts:
+            remove_text(text)
+
+    return cleanup, screenwriter_load.run_queue
+
+def bench_watch_tick(raw_content, tmp):
+    # A SEASON of saved episodes, none changed on disk: one tick checks FILES_PER_TICK of them
+    texts = []
+    for episode in range(SEASON):
+        text = new_text(f"bench{next(_unique)}.fountain", raw_content)
+        text.filepath = os.path.join(tmp, f"episode{episode:02}.fountain")
+        fountain_io.save_fountain_file(text)
+        texts.append(text)
+    screenwriter_watch._state.update(names=[], position=0)
+
+    def cleanup():
+        for text in texts:
+            remove_text(text)
+
+    return cleanup, screenwriter_watch.watch_tick
+
+def bench_reload(raw_content, tmp):
+    # A scene inserted in the middle of the file by another editor
+    text = new_text(f"bench{next(_unique)}.fountain", raw_content)
+    fountain_io.format_text_block(text)
+    text.filepath = os.path.join(tmp, "reload.fountain")
+    fountain_io.save_fountain_file(text)
+    with open(text.filepath, "r", encoding="utf-8") as f:
+        content = f.read()
+    middle = content.find("\n\n", len(content) // 2)
+    with open(text.filepath, "w", encoding="utf-8") as f:
+        f.write(content[:middle] + "\n\nINT. NEW ROOM - NIGHT\n\nShe waits." + content[middle:])
+    return (lambda: remove_text(text)), lambda: screenwriter_watch.reload_text(text)
+
+def _next_draft(raw_content):
+    # A renamed scene, and a line of action added in the middle of the script
+    draft = _edit_first_header(raw_content)
+    middle = draft.find("\n\n", len(draft) // 2)
+    return draft[:middle] + "\n\nHe hesitates at the door." + draft[middle:]
+
+def bench_revision_diff(raw_content, tmp):
+    # Snapshot of the new draft and diff against the previous one
+    previous = fountain_revision.snapshot(raw_content.split("\n"))
+    lines = _next_draft(raw_content).split("\n")
+    return None, lambda: fountain_revision.diff(previous, fountain_revision.snapshot(lines))
+
+def bench_export_pdf_revised(raw_content, tmp):
+    text = new_text("bench.fountain", raw_content)
+    fountain_io.format_text_block(text)
+    screenwriter_revision.take_snapshot(text)
+    text.from_string(_next_draft(text.as_string()))
+    filepath = os.path.join(tmp, "revised.pdf")
+    return (lambda: remove_text(text)), lambda: run_operator(screenwriter_pages.SCREENWRITER_OT_export_pdf, text, filepath=filepath)
+
+def _bench_export_to(operator, extension):
+    def setup(raw_content, tmp):
+        text = new_text("bench.fountain", raw_content)
+        fountain_io.format_text_block(text)
+        filepath = os.path.join(tmp, "export" + extension)
+        return (lambda: remove_text(text)), lambda: run_operator(operator, text, filepath=filepath)
+    return setup
+
+def _bench_import_from(operator, extension, chunks):
+    def setup(raw_content, tmp):
+        filepath = os.path.join(tmp, "import" + extension)
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.writelines(chunks(raw_content.split("\n")))
+        before = set(bpy.data.texts)
+
+        def cleanup():
+            for text in set(bpy.data.texts) - before:
+                remove_text(text)
+
+        return cleanup, lambda: run_operator(operator, None, filepath=filepath)
+    return setup
+
+bench_export_fdx = _bench_export_to(screenwriter_interchange.SCREENWRITER_OT_export_fdx, ".fdx")
+bench_import_fdx = _bench_import_from(screenwriter_interchange.SCREENWRITER_OT_import_fdx, ".fdx", fountain_fdx.fdx_chunks)
+bench_export_json = _bench_export_to(screenwriter_interchange.SCREENWRITER_OT_export_json, ".json")
+bench_import_json = _bench_import_from(screenwriter_interchange.SCREENWRITER_OT_import_json, ".json", fountain_json.json_chunks)
+
+# Name -> setup(raw_content, tmp dir) returning (cleanup or None, timed callable)
+BENCHMARKS = {
+    "parse": bench_parse,
+    "format": bench_format,
+    "format_instrumented": bench_format_instrumented,
+    "format_incremental": bench_format_incremental,
+    "format_edit": bench_format_edit,
+    "import": bench_import,
+    "export": bench_export,
+    "save": bench_save,
+    "save_unchanged": bench_save_unchanged,
+    "format_unchanged": bench_format_unchanged,
+    "sync_scenes": bench_sync_scenes,
+    "resync_scenes": bench_resync_scenes,
+    "breakdown": bench_breakdown,
+    "rebreakdown": bench_rebreakdown,
+    "paginate": bench_paginate,
+    "count_pages": bench_count_pages,
+    "export_pdf": bench_export_pdf,
+    "stats": bench_stats,
+    "stats_incremental": bench_stats_incremental,
+    "export_stats": bench_export_stats,
+    "sync_timeline": bench_sync_timeline,
+    "resync_timeline": bench_resync_timeline,
+    "cycle_element": bench_cycle_element,
+    "sidebar_draw": bench_sidebar_draw,
+    "outline": bench_outline,
+    "outline_incremental": bench_outline_incremental,
+    "search_index": bench_search_index,
+    "search_query": bench_search_query,
+    "load_format": bench_load_format,
+    "watch_tick": bench_watch_tick,
+    "reload": bench_reload,
+    "revision_diff": bench_revision_diff,
+    "export_pdf_revised": bench_export_pdf_revised,
+    "export_fdx": bench_export_fdx,
+    "import_fdx": bench_import_fdx,
+    "export_json": bench_export_json,
+    "import_json": bench_import_json,
+}
+
+def time_benchmark(setup, raw_content, repeat):
+    """Best of repeat runs, each on a fresh setup, in seconds"""
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeat):
+            cleanup, run = setup(raw_content, tmp)
+            try:
+                start = time.perf_counter()
+                run()
+                best = min(best, time.perf_counter() - start)
+            finally:
+                if cleanup is not None:
+                    cleanup()
+    return best
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(ops, sizes, mix, spec_elements, repeat, seed=0):
+    """Returns the results dict written by --output"""
+    results = {}
+    for n_lines in sizes:
+        raw_content = generate_script(n_lines, seed, spec_elements, mix)
+        for op in ops:
+            seconds = time_benchmark(BENCHMARKS[op], raw_content, repeat)
+            results.setdefault(op, {})[str(n_lines)] = {
+                "seconds": seconds,
+                "lines_per_second": n_lines / seconds if seconds else None,
+            }
+            print(f"{op:<20}{n_lines:>9,} lines{seconds * 1000:>12.2f} ms{n_lines / max(seconds, 1e-9):>14,.0f} lines/s")
+    return {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "blender": None if STUBBED else ".".join(map(str, bpy.app.version)),
+            "mix": dict(mix, beats=list(mix["beats"])),
+            "spec_elements": spec_elements,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+def compare(baseline, current, threshold):
+    """Prints the change per operation/size, returns the regressions as (op, lines, ratio)"""
+    regressions = []
+    for op, sizes in current["results"].items():
+        for n_lines, result in sizes.items():
+            base = baseline.get("results", {}).get(op, {}).get(n_lines)
+            if not base or not base["seconds"]:
+                continue
+            ratio = result["seconds"] / base["seconds"]
+            flag = ""
+            if ratio > 1 + threshold:
+                regressions.append((op, n_lines, ratio))
+                flag = "  REGRESSION"
+            print(f"{op:<20}{int(n_lines):>9,} lines{(ratio - 1) * 100:>+10.1f} %{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", default="1000,10000,100000", help="comma separated script sizes")
+    parser.add_argument("--mix", default="", help=f"element mix overrides, keys: {', '.join(DEFAULT_MIX)}")
+    parser.add_argument("--plain", action="store_true", help="leave out notes, boneyard and other spec elements")
+    parser.add_argument("--ops", default=",".join(BENCHMARKS), help="comma separated operations")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing")
+    parser.add_argument("--skip-golden", action="store_true", help="do not check the golden files first")
+    # Blender passes its own arguments before "--"
+    args = parser.parse_args(argv if argv is not None else sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else None)
+
+    ops = [op.strip() for op in args.ops.split(",") if op.strip()]
+    unknown = [op for op in ops if op not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown operation(s) {', '.join(unknown)}, expected: {', '.join(BENCHMARKS)}")
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if not args.skip_golden and check_golden.check():
+        print("Golden files differ, not timing a change in behaviour (see check_golden.py)")
+        sys.exit(2)
+
+    sizes = [int(n) for n in args.lines.split(",")]
+    current = run(ops, sizes, mix, not args.plain, args.repeat, args.seed)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nAgainst {args.compare} ({baseline['meta'].get('commit')}), threshold {args.threshold:.0%}:")
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s)")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
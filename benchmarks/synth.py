@@ -0,0 +1,91 @@
+"""
+Synthetic screenplay generator for the benchmarks.
+Produces deterministic Fountain text of an arbitrary number of lines.
+"""
+
+import random
+
+LOCATIONS = ["HOUSE", "ROAD", "OFFICE", "DINER", "ROOFTOP", "CAR", "FOREST", "HOSPITAL"]
+TIMES = ["DAY", "NIGHT", "DAWN", "LATER", "CONTINUOUS"]
+CHARACTERS = ["MARIA", "HERO", "BOB", "DETECTIVE RAY", "OLD WOMAN", "KID"]
+WORDS = ("the a she he runs looks at door window slowly turns away from light "
+         "we never said anything about it again why not because").split()
+PARENS = ["(beat)", "(quietly)", "(to Maria)", "(laughing)", "(V.O.)"]
+TRANSITIONS = ["CUT TO:", "SMASH CUT TO:", "> FADE OUT", "DISSOLVE TO:"]
+
+def _sentence(rng, low=4, high=14):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+    return " ".join(words).capitalize() + "."
+
+# Spec elements the original heuristics did not know about
+EXTRAS = [
+    ["[[Check continuity with the previous scene]]"],
+    ["/* Cut for time", "", "MARIA", "This never made it.", "*/"],
+    ["# Act Two"],
+    ["= The stakes rise."],
+    ["> THE END <"],
+    ["~Happy birthday to you"],
+    ["==="],
+    ["@McCLANE", "Yippee ki-yay."],
+    ["BRICK ^", "Side by side."],
+]
+
+# Element mix: probability of each choice the generator makes per scene/beat
+DEFAULT_MIX = {
+    "extras": 0.5,          # a spec element block after the header (with spec_elements)
+    "action": 0.35,         # a beat is an action line rather than dialogue
+    "parenthetical": 0.3,   # a dialogue beat has a parenthetical
+    "transition": 0.3,      # a scene ends with a transition
+    "beats": (2, 8),        # beats per scene
+}
+
+def parse_mix(spec):
+    """
+    Returns a mix dict from "key=value,..." (e.g. "action=0.6,beats=4-12"),
+    falling back to DEFAULT_MIX for missing keys.
+    """
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        key, _, value = item.partition("=")
+        if key not in DEFAULT_MIX:
+            raise ValueError(f"unknown mix key {key!r}, expected one of {', '.join(DEFAULT_MIX)}")
+        if key == "beats":
+            low, _, high = value.partition("-")
+            mix[key] = (int(low), int(high or low))
+        else:
+            mix[key] = float(value)
+    return mix
+
+def generate_lines(n_lines, seed=0, spec_elements=False, mix=None):
+    """
+    Returns a list of n_lines raw Fountain lines.
+    spec_elements mixes in notes, boneyard, sections, synopses, centered text,
+    lyrics, page breaks and forced/dual characters.
+    mix overrides DEFAULT_MIX probabilities.
+    """
+    mix = dict(DEFAULT_MIX, **(mix or {}))
+    rng = random.Random(seed)
+    lines = []
+    while len(lines) < n_lines:
+        lines.append(f"{rng.choice(('INT.', 'EXT.'))} {rng.choice(LOCATIONS)} - {rng.choice(TIMES)}")
+        lines.append("")
+        if spec_elements and rng.random() < mix["extras"]:
+            lines.extend(rng.choice(EXTRAS))
+            lines.append("")
+        for _ in range(rng.randint(*mix["beats"])):
+            if rng.random() < mix["action"]:
+                lines.append(_sentence(rng, 8, 30))
+            else:
+                lines.append(rng.choice(CHARACTERS))
+                if rng.random() < mix["parenthetical"]:
+                    lines.append(rng.choice(PARENS))
+                lines.append(_sentence(rng))
+            lines.append("")
+        if rng.random() < mix["transition"]:
+            lines.append(rng.choice(TRANSITIONS))
+            lines.append("")
+    return lines[:n_lines]
+
+def generate_script(n_lines, seed=0, spec_elements=False, mix=None):
+    """Returns n_lines of synthetic Fountain as a single string"""
+    return "\n".join(generate_lines(n_lines, seed, spec_elements, mix)) + "\n"
@@ -10,24 +10,65 @@ bl_info = {
     "category": "Text Editor",
 }
 
-import bpy
-from . import screenwriter_ops
-from . import screenwriter_ui
-from . import fountain_io
-from . import screenwriter_scenes
+import sys
+
+# Blender imports bpy before any add-on. Anywhere else (the command line
+# interface, batch worker processes) bpy is not imported here, even where it is
+# installed as a module, so startup stays fast and only the bpy-free fountain_*
+# modules are usable until something imports bpy itself.
+bpy = sys.modules.get("bpy")
+
+if bpy is not None:
+    from . import screenwriter_prefs
+    from . import screenwriter_ops
+    from . import screenwriter_ui
+    from . import fountain_io
+    from . import screenwriter_scenes
+    from . import screenwriter_live
+    from . import screenwriter_batch
+    from . import screenwriter_pages
+    from . import screenwriter_stats
+    from . import screenwriter_timeline
+    from . import screenwriter_outline
+    from . import screenwriter_search
+    from . import screenwriter_load
+    from . import screenwriter_watch
+    from . import screenwriter_revision
+    from . import screenwriter_interchange
+    from . import screenwriter_profile
+    from . import screenwriter_breakdown
 
 def menu_func_import(self, context):
     self.layout.operator(fountain_io.SCREENWRITER_OT_import_fountain.bl_idname, text="Fountain (.fountain)")
+    self.layout.operator(screenwriter_interchange.SCREENWRITER_OT_import_fdx.bl_idname, text="Final Draft (.fdx)")
+    self.layout.operator(screenwriter_interchange.SCREENWRITER_OT_import_json.bl_idname, text="Script Elements (.json)")
 
 def menu_func_export(self, context):
     self.layout.operator(fountain_io.SCREENWRITER_OT_export_fountain.bl_idname, text="Fountain (.fountain)")
+    self.layout.operator(screenwriter_pages.SCREENWRITER_OT_export_pdf.bl_idname, text="Screenplay (.pdf)")
+    self.layout.operator(screenwriter_interchange.SCREENWRITER_OT_export_fdx.bl_idname, text="Final Draft (.fdx)")
+    self.layout.operator(screenwriter_interchange.SCREENWRITER_OT_export_json.bl_idname, text="Script Elements (.json)")
 
 modules = [
+    screenwriter_prefs,
     screenwriter_ops,
     screenwriter_ui,
     fountain_io,
     screenwriter_scenes,
-]
+    screenwriter_live,
+    screenwriter_batch,
+    screenwriter_pages,
+    screenwriter_stats,
+    screenwriter_timeline,
+    screenwriter_outline,
+    screenwriter_search,
+    screenwriter_load,
+    screenwriter_watch,
+    screenwriter_revision,
+    screenwriter_interchange,
+    screenwriter_breakdown,
+    screenwriter_profile,
+] if bpy is not None else []
 
 def register():
     for module in modules:
@@ -0,0 +1,6 @@
+import sys
+from .fountain_cli import main
+
+if __name__ == "__main__":
+    # Spawned worker processes import this module again under another name
+    sys.exit(main())
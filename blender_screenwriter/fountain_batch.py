@@ -0,0 +1,139 @@
+"""
+Batch processing of many .fountain files in a process pool.
+The workers only use the bpy-free fountain_parser; text blocks are created
+from their results on Blender's main thread (see screenwriter_batch).
+"""
+
+import glob
+import importlib
+import os
+import site
+import sys
+import time
+from collections import namedtuple
+from . import fountain_parser
+
+# content: formatted text (import) or None (export); hashes: per-line hashes for
+# incremental formatting as array('i') bytes, which pickle far cheaper than a
+# list of ints; error: message if the file failed, else None; digest: stripped_hash
+# of the file's lines and stat: its os.stat result from before it was read (import)
+FileResult = namedtuple("FileResult", "filepath content hashes lines seconds error digest stat", defaults=(None, None))
+
+def collect_paths(source, pattern="*.fountain"):
+    """Returns the sorted files matching pattern in a directory, or matching source if it is a glob"""
+    if os.path.isdir(source):
+        source = os.path.join(source, pattern)
+    return sorted(p for p in glob.glob(source) if os.path.isfile(p))
+
+def format_file(filepath, use_mmap=False):
+    """Worker: reads and formats one .fountain file"""
+    start = time.perf_counter()
+    try:
+        # Stat first: a change made while reading shows as a change to the file
+        st = os.stat(filepath)
+        lines = list(fountain_parser.format_lines(fountain_parser.read_lines(filepath, use_mmap)))
+    except (OSError, UnicodeDecodeError) as e:
+        return FileResult(filepath, None, None, 0, time.perf_counter() - start, str(e))
+
+    hashes = fountain_parser.line_hashes(lines)
+    # The empty line after the final newline, as in fountain_io.write_formatted
+    hashes.append(fountain_parser.line_hash(""))
+    content = "".join([line + "\n" for line in lines])
+    digest = fountain_parser.stripped_hash(lines)
+    return FileResult(filepath, content, hashes.tobytes(), len(lines), time.perf_counter() - start, None, digest, st)
+
+def export_file(filepath, raw_content):
+    """Worker: writes the text content of one text block as plain Fountain"""
+    start = time.perf_counter()
+    lines = raw_content.split("\n")
+    try:
+        fountain_parser.write_atomic(filepath, fountain_parser.export_chunks(lines))
+    except OSError as e:
+        return FileResult(filepath, None, None, 0, time.perf_counter() - start, str(e))
+    return FileResult(filepath, None, None, len(lines), time.perf_counter() - start, None)
+
+class _Imported:
+    """Pickles as an import of module, done where it is unpickled"""
+    __slots__ = ("module",)
+
+    def __init__(self, module):
+        self.module = module
+
+    def __reduce__(self):
+        return importlib.import_module, (self.module,)
+
+class _WorkerCall:
+    """
+    Pickles as _call_in_worker of this module imported by the name the add-on
+    is installed under, its directory name: extensions live in a runtime-only
+    package (bl_ext.<repo>.<name>) that a spawned worker cannot import.
+    Nothing is imported under that name in this process.
+    """
+    __slots__ = ("package",)
+
+    def __init__(self, package):
+        self.package = package
+
+    def __reduce__(self):
+        return getattr, (_Imported(self.package + "." + __name__.rpartition(".")[2]), "_call_in_worker")
+
+def _call_in_worker(module, name, *args):
+    """
+    Runs in a spawned worker: calls name from module (both bpy-free) and
+    returns its result, a namedtuple, as (class name, plain tuple), so
+    unpickling it does not import the add-on under a second name either.
+    """
+    result = getattr(importlib.import_module(module), name)(*args)
+    return type(result).__name__, tuple(result)
+
+def _pool_call(pool, func, args):
+    """
+    Submits func(*args) to the pool. Returns a function that turns the
+    future's result into what func returned.
+    """
+    if "." not in __package__:
+        # Importable by the same name in a spawned worker
+        return pool.submit(func, *args), lambda result: result
+    package = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+    module = sys.modules[func.__module__]
+    worker_module = package + func.__module__[len(__package__):]
+    future = pool.submit(_WorkerCall(package), worker_module, func.__name__, *args)
+    return future, lambda result: getattr(module, result[0])._make(result[1])
+
+def run(func, jobs, max_workers=0):
+    """
+    Calls func(*args) for every args tuple in jobs, in a process pool unless there
+    is only one job or one worker. Yields FileResults in completion order.
+    """
+    jobs = list(jobs)
+    max_workers = max_workers or os.cpu_count() or 1
+    if len(jobs) < 2 or max_workers == 1:
+        for args in jobs:
+            yield func(*args)
+        return
+
+    # Imported here: they are a good part of the command line's startup time
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    # Never fork Blender itself: start clean interpreters
+    context = multiprocessing.get_context("spawn")
+    options = {}
+    if "." in __package__:
+        # Workers import the add-on by its directory name: its parent goes on their sys.path, not on Blender's
+        parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        options.update(initializer=site.addsitedir, initargs=(parent,))
+    with ProcessPoolExecutor(min(max_workers, len(jobs)), mp_context=context, **options) as pool:
+        calls = dict(_pool_call(pool, func, args) for args in jobs)
+        for future in as_completed(calls):
+            yield calls[future](future.result())
+
+def report_lines(results, elapsed):
+    """Per-file timing lines followed by a total throughput line"""
+    lines = []
+    for r in sorted(results, key=lambda r: r.filepath):
+        status = f"FAILED: {r.error}" if r.error else f"{r.lines:>8} lines"
+        lines.append(f"{r.seconds * 1000:>9.1f} ms {status}  {r.filepath}")
+    rate = len(results) / elapsed if elapsed > 0 else 0.0
+    lines.append(f"{len(results)} files in {elapsed:.2f} s ({rate:.1f} files/s)")
+    return lines
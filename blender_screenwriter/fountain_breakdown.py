@@ -0,0 +1,113 @@
+"""
+Breakdown sheet of a script: for every scene, the characters who speak in it,
+its location and time of day, and the props and notes flagged in it.
+Props are flagged with notes, [[prop: revolver, coffee cup]], on their own
+line or inside another element; any other note is kept as a note.
+Pure Python, no bpy.
+"""
+
+import json
+import re
+import zlib
+from collections import namedtuple
+from . import fountain_parser, fountain_scenes, fountain_stats
+from .fountain_parser import HEADER, CHARACTER, NOTE, BONEYARD, BLANK
+
+CHARACTERS = "CHARACTERS"
+LOCATIONS = "LOCATIONS"
+PROPS = "PROPS"
+
+# Kind of breakdown asset -> prefix of its Blender name
+ASSET_PREFIXES = {
+    CHARACTERS: "CHR",
+    LOCATIONS: "LOC",
+    PROPS: "PROP",
+}
+
+_INLINE_NOTE_RE = re.compile(r"\[\[(.*?)\]\]")
+_PROP_RE = re.compile(r"props?\s*:\s*(.*)$", re.IGNORECASE | re.DOTALL)
+
+# name: the scene's Blender name (fountain_scenes.scene_name); characters and
+# props in order of first appearance
+SceneBreakdown = namedtuple(
+    "SceneBreakdown", "name int_ext location time_of_day day_night characters props notes",
+)
+
+def asset_name(kind, name):
+    """Blender name of the shared collection for a character, location or prop"""
+    return f"{ASSET_PREFIXES[kind]} {name}"[:fountain_scenes.MAX_NAME]
+
+def _add_note(note, props, notes):
+    note = note.strip()
+    if note.endswith("]]"):
+        note = note[:-2].rstrip()
+    match = _PROP_RE.match(note)
+    if match is None:
+        if note:
+            notes.append(note)
+        return
+    for prop in match.group(1).split(","):
+        prop = " ".join(prop.split())
+        if prop:
+            props.setdefault(prop.casefold(), prop)
+
+def breakdown(lines):
+    """
+    SceneBreakdown of every Blender scene of an iterable of raw lines, in script
+    order. Identical headers share one Blender scene, so they share one breakdown.
+    """
+    scenes = {}     # name -> [header, characters, props, notes]
+    current = None
+    for element_type, content, line in fountain_parser.classify_lines(lines):
+        if element_type == BLANK or element_type == BONEYARD:
+            continue
+        if element_type == HEADER:
+            name = fountain_scenes.scene_name(content)
+            current = scenes.get(name)
+            if current is None:
+                current = scenes[name] = [content, {}, {}, []]
+            continue
+        if current is None:
+            # Title page and anything before the first scene
+            continue
+        if element_type == CHARACTER:
+            character = fountain_stats.character_name(content)
+            if character:
+                current[1].setdefault(character, None)
+        elif element_type == NOTE:
+            _add_note(content, current[2], current[3])
+        elif "[[" in content:
+            for note in _INLINE_NOTE_RE.findall(content):
+                _add_note(note, current[2], current[3])
+
+    result = []
+    for name, (header, characters, props, notes) in scenes.items():
+        int_ext, location, time_of_day = fountain_stats.parse_header(header)
+        result.append(SceneBreakdown(
+            name, int_ext, location, time_of_day, fountain_stats.day_night(time_of_day),
+            list(characters), list(props.values()), notes,
+        ))
+    return result
+
+def assets(scene):
+    """(kind, asset name) of every shared asset a SceneBreakdown uses"""
+    found = []
+    if scene.location:
+        found.append((LOCATIONS, asset_name(LOCATIONS, scene.location)))
+    found += [(CHARACTERS, asset_name(CHARACTERS, name)) for name in scene.characters]
+    found += [(PROPS, asset_name(PROPS, name)) for name in scene.props]
+    return found
+
+def breakdown_hash(scene):
+    return zlib.crc32(json.dumps(scene).encode("utf-8"))
+
+def dumps_index(source, hashes):
+    return json.dumps({"source": source, "scenes": hashes})
+
+def loads_index(data):
+    """Returns (source hash, {scene name: breakdown_hash}) from dumps_index output, or (None, {}) if unreadable"""
+    try:
+        index = json.loads(data)
+        return index["source"], dict(index["scenes"])
+    except (TypeError, ValueError, KeyError):
+        return None, {}
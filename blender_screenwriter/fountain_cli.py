@@ -0,0 +1,271 @@
+"""
+Command line interface for batch work outside the Blender UI, e.g. in CI:
+
+    python -m blender_screenwriter parse scripts/
+    python -m blender_screenwriter stats scripts/*.fountain -o reports/ --format csv
+    python -m blender_screenwriter export scripts/ --to pdf -o out/ --jobs 8 --json
+    blender --background --python screenwriter_headless.py -- sync scripts/ --save season.blend
+
+Files run in parallel worker processes (see fountain_batch). Only sync needs
+bpy, and it is only imported when sync runs, so every other command starts as
+fast as the interpreter. --json prints one JSON object per file as it finishes
+and a summary object last; everything else goes to stderr.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, namedtuple
+from . import fountain_batch, fountain_document, fountain_fdx, fountain_json, fountain_parser, fountain_pdf, fountain_stats
+
+COMMANDS = ("parse", "format", "stats", "export", "sync")
+
+# --to -> file extension
+EXPORT_FORMATS = {
+    "fountain": ".fountain",
+    "pdf": ".pdf",
+    "fdx": ".fdx",
+    "json": ".json",
+}
+
+# output: file written or None; data: command specific results, JSON-ready
+TaskResult = namedtuple("TaskResult", "filepath lines seconds error output data")
+
+def read_script(filepath):
+    """The raw lines of a .fountain file, or of a Final Draft or element JSON file converted to Fountain"""
+    extension = os.path.splitext(filepath)[1].lower()
+    if extension == ".fdx":
+        return list(fountain_fdx.read_fdx(filepath))
+    if extension == ".json":
+        return list(fountain_json.read_json(filepath))
+    with open(filepath, encoding="utf-8") as f:
+        return fountain_parser.file_lines(f.read())
+
+def _output_path(filepath, directory, extension):
+    name = os.path.splitext(os.path.basename(filepath))[0] + extension
+    path = os.path.abspath(os.path.join(directory or os.path.dirname(filepath), name))
+    if path == os.path.abspath(filepath):
+        raise ValueError("output would overwrite the input, pass -o")
+    return path
+
+def _parse(filepath, lines, options):
+    document = fountain_document.ScriptDocument("\n".join(lines))
+    counts = Counter(fountain_document.TYPES[code] for code in document.types)
+    return None, {
+        "elements": len(document),
+        "scenes": counts[fountain_parser.HEADER],
+        "types": dict(counts),
+    }
+
+def _format(filepath, lines, options):
+    formatted = [line + "\n" for line in fountain_parser.format_lines(lines)]
+    if not options["output"]:
+        return None, {}
+    output = _output_path(filepath, options["output"], os.path.splitext(filepath)[1] or ".fountain")
+    fountain_parser.write_atomic(output, formatted)
+    return output, {}
+
+def _stats(filepath, lines, options):
+    stats = fountain_stats.analyze(fountain_document.ScriptDocument("\n".join(lines)))
+    data = fountain_stats.stats_dict(stats)
+    output = None
+    if options["output"]:
+        output = _output_path(filepath, options["output"], ".stats." + options["format"])
+        with open(output, "w", encoding="utf-8", newline="") as f:
+            if options["format"] == "csv":
+                fountain_stats.write_csv(f, stats)
+            else:
+                json.dump(data, f, indent=1, ensure_ascii=False)
+    return output, data["totals"]
+
+def _export(filepath, lines, options):
+    to = options["to"]
+    output = _output_path(filepath, options["output"], EXPORT_FORMATS[to])
+    if to == "pdf":
+        return output, {"pages": fountain_pdf.write_pdf(output, lines)}
+    if to == "fdx":
+        chunks = fountain_fdx.fdx_chunks(lines)
+    elif to == "json":
+        chunks = fountain_json.json_chunks(lines)
+    else:
+        chunks = fountain_parser.export_chunks(lines)
+    fountain_parser.write_atomic(output, chunks)
+    return output, {}
+
+TASKS = {
+    "parse": _parse,
+    "format": _format,
+    "stats": _stats,
+    "export": _export,
+}
+
+def run_task(command, filepath, options):
+    """Worker: reads filepath and runs one bpy-free command on it"""
+    start = time.perf_counter()
+    try:
+        lines = read_script(filepath)
+        output, data = TASKS[command](filepath, lines, options)
+    except (OSError, UnicodeDecodeError, ValueError, SyntaxError) as e:
+        # SyntaxError covers malformed Final Draft XML (ElementTree.ParseError)
+        return TaskResult(filepath, 0, time.perf_counter() - start, str(e) or type(e).__name__, None, {})
+    return TaskResult(filepath, len(lines), time.perf_counter() - start, None, output, data)
+
+def result_record(command, result):
+    """JSON-ready record of one TaskResult"""
+    return dict(
+        result.data,
+        command=command,
+        file=result.filepath,
+        lines=result.lines,
+        seconds=round(result.seconds, 6),
+        error=result.error,
+        output=result.output,
+    )
+
+def summary_record(command, results, elapsed, workers):
+    lines = sum(r.lines for r in results)
+    return {
+        "command": command,
+        "summary": True,
+        "files": len(results),
+        "failed": sum(1 for r in results if r.error),
+        "lines": lines,
+        "seconds": round(elapsed, 6),
+        "files_per_second": round(len(results) / elapsed, 3) if elapsed > 0 else None,
+        "lines_per_second": round(lines / elapsed) if elapsed > 0 else None,
+        "workers": workers,
+    }
+
+def report(command, results, as_json, workers):
+    """
+    Consumes an iterable of TaskResults, printing a JSON record per result as it
+    arrives (with as_json) and then a summary. Returns the exit status.
+    """
+    start = time.perf_counter()
+    done = []
+    for result in results:
+        done.append(result)
+        if as_json:
+            print(json.dumps(result_record(command, result), ensure_ascii=False), flush=True)
+    elapsed = time.perf_counter() - start
+    if as_json:
+        print(json.dumps(summary_record(command, done, elapsed, workers)), flush=True)
+    else:
+        for line in fountain_batch.report_lines(done, elapsed):
+            print(line, file=sys.stderr)
+    return 1 if any(r.error for r in done) else 0
+
+def worker_count(jobs, max_workers):
+    """Processes fountain_batch.run uses for jobs"""
+    if jobs < 2:
+        return 1
+    return min(max_workers or os.cpu_count() or 1, jobs)
+
+def collect_inputs(inputs, pattern):
+    """Files named by inputs (files, directories or globs), in order, each once"""
+    paths = []
+    for source in inputs:
+        paths += [source] if os.path.isfile(source) else fountain_batch.collect_paths(source, pattern)
+    return list(dict.fromkeys(os.path.abspath(p) for p in paths))
+
+def sync(args, paths):
+    """
+    Formats paths into text blocks of the open .blend and syncs their scenes
+    (and with --breakdown, fills them with their breakdown).
+    Texts already linked to one of the files are refilled instead of duplicated,
+    so running again on a saved .blend only syncs what changed.
+    """
+    try:
+        import bpy
+    except ImportError:
+        print(
+            "sync needs Blender: blender --background [file.blend] "
+            "--python screenwriter_headless.py -- sync ...",
+            file=sys.stderr,
+        )
+        return 2
+    from . import screenwriter_batch, screenwriter_breakdown, screenwriter_scenes
+
+    linked = {os.path.abspath(bpy.path.abspath(t.filepath)): t for t in bpy.data.texts if t.filepath}
+
+    def synced():
+        jobs = [(p, False) for p in paths]
+        for result in fountain_batch.run(fountain_batch.format_file, jobs, args.jobs):
+            if result.error:
+                yield TaskResult(result.filepath, 0, result.seconds, result.error, None, {})
+                continue
+            start = time.perf_counter()
+            text = screenwriter_batch.create_text(result, linked.get(result.filepath))
+            created, renamed, orphaned = screenwriter_scenes.sync_scenes(text) or (0, [], [])
+            data = {
+                "text": text.name,
+                "scenes_created": created,
+                "scenes_renamed": len(renamed),
+                "scenes_orphaned": len(orphaned),
+            }
+            if args.breakdown:
+                updated, assets, _unchanged = screenwriter_breakdown.breakdown_scenes(text)
+                data.update(breakdown_scenes=updated, breakdown_assets=assets)
+            seconds = result.seconds + time.perf_counter() - start
+            yield TaskResult(result.filepath, result.lines, seconds, None, None, data)
+
+    status = report("sync", synced(), args.json, worker_count(len(paths), args.jobs))
+    if args.save:
+        bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.save))
+    return status
+
+def build_parser(prog=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="files, directories or globs")
+    common.add_argument("--pattern", default="*.fountain", help="files to take from directories (default: *.fountain)")
+    common.add_argument("-j", "--jobs", type=int, default=0, help="worker processes (default: one per CPU)")
+    common.add_argument("--json", action="store_true", help="print a JSON record per file and a summary to stdout")
+
+    parser = argparse.ArgumentParser(
+        prog=prog or "python -m blender_screenwriter",
+        description="Parse, format, analyze and export Fountain scripts (.fdx and element .json are read too)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("parse", parents=[common], help="classify every line and count elements")
+
+    command = commands.add_parser("format", parents=[common], help="apply the add-on's visual indentation")
+    command.add_argument("-o", "--output", help="directory to write formatted copies to (default: only time it)")
+
+    command = commands.add_parser("stats", parents=[common], help="script statistics")
+    command.add_argument("-o", "--output", help="directory to write <name>.stats.json/csv to")
+    command.add_argument("--format", choices=("json", "csv"), default="json", help="report file format")
+
+    command = commands.add_parser("export", parents=[common], help="export as Fountain, PDF, Final Draft or element JSON")
+    command.add_argument("--to", choices=sorted(EXPORT_FORMATS), required=True, help="output format")
+    command.add_argument("-o", "--output", help="output directory (default: next to each input)")
+
+    command = commands.add_parser("sync", parents=[common], help="create Blender scenes from scene headers (needs Blender)")
+    command.add_argument("--save", help=".blend file to save afterwards")
+    command.add_argument("--breakdown", action="store_true", help="also fill the scenes with their breakdown")
+    return parser
+
+def main(argv=None, prog=None):
+    """Runs the command line interface, returns the exit status"""
+    args = build_parser(prog).parse_args(argv)
+    paths = collect_inputs(args.inputs, args.pattern)
+    if not paths:
+        print(f"No input files in {' '.join(args.inputs)}", file=sys.stderr)
+        return 2
+
+    if args.command == "sync":
+        return sync(args, paths)
+
+    output = getattr(args, "output", None)
+    if output:
+        os.makedirs(output, exist_ok=True)
+    options = {
+        "output": output,
+        "format": getattr(args, "format", None),
+        "to": getattr(args, "to", None),
+    }
+    jobs = [(args.command, p, options) for p in paths]
+    results = fountain_batch.run(run_task, jobs, args.jobs)
+    return report(args.command, results, args.json, worker_count(len(jobs), args.jobs))
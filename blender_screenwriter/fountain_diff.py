@@ -0,0 +1,122 @@
+"""
+Line diffs between two versions of a script, as hunks of lines to replace,
+and a patience diff for sequences of hashes (scenes, elements).
+Pure Python, no bpy.
+"""
+
+from bisect import bisect_left
+from difflib import SequenceMatcher
+
+def line_hunks(old, new):
+    """
+    Hunks turning the list of lines old into new, as (old_start, old_stop,
+    new_start, new_stop): old[old_start:old_stop] is replaced by
+    new[new_start:new_stop]. In order; lines outside the hunks are equal.
+    """
+    # Most edits touch a small part of a script: skip the common ends first
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    old_middle = old[start:len(old) - end]
+    new_middle = new[start:len(new) - end]
+    if not old_middle and not new_middle:
+        return []
+
+    # Junk heuristics on: blank lines and other frequent lines do not anchor
+    # matches, which keeps long scripts from going quadratic
+    matcher = SequenceMatcher(None, old_middle, new_middle)
+    return [
+        (start + i1, start + i2, start + j1, start + j2)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+def _unique_anchors(old, new, old_lo, old_hi, new_lo, new_hi):
+    """
+    Pairs (i, j) of items occurring exactly once in both ranges, longest
+    increasing run of them (patience sorting), in order
+    """
+    counts = {}
+    for i in range(old_lo, old_hi):
+        entry = counts.get(old[i])
+        counts[old[i]] = [i, None, 1, 0] if entry is None else [entry[0], None, entry[2] + 1, 0]
+    for j in range(new_lo, new_hi):
+        entry = counts.get(new[j])
+        if entry is not None:
+            entry[1] = j
+            entry[3] += 1
+    pairs = sorted((entry[0], entry[1]) for entry in counts.values() if entry[2] == 1 and entry[3] == 1)
+    if not pairs:
+        return []
+
+    # Longest run with j increasing too: piles of patience sorting with back links
+    tops = []
+    piles = []
+    links = []
+    for k, (_i, j) in enumerate(pairs):
+        pile = bisect_left(tops, j)
+        links.append(piles[pile - 1] if pile else -1)
+        if pile == len(tops):
+            tops.append(j)
+            piles.append(k)
+        else:
+            tops[pile] = j
+            piles[pile] = k
+    anchors = []
+    k = piles[-1]
+    while k != -1:
+        anchors.append(pairs[k])
+        k = links[k]
+    anchors.reverse()
+    return anchors
+
+def patience_matches(old, new):
+    """
+    Matching (i, j) index pairs, old[i] == new[j], in order, for two sequences
+    of hashable items. Items unique to both sides anchor the match and the
+    ranges between anchors are matched the same way; a range without unique
+    items falls back to difflib.
+    """
+    matches = []
+    ranges = [(0, len(old), 0, len(new))]
+    while ranges:
+        old_lo, old_hi, new_lo, new_hi = ranges.pop()
+        while old_lo < old_hi and new_lo < new_hi and old[old_lo] == new[new_lo]:
+            matches.append((old_lo, new_lo))
+            old_lo += 1
+            new_lo += 1
+        while old_lo < old_hi and new_lo < new_hi and old[old_hi - 1] == new[new_hi - 1]:
+            old_hi -= 1
+            new_hi -= 1
+            matches.append((old_hi, new_hi))
+        if old_lo == old_hi or new_lo == new_hi:
+            continue
+
+        anchors = _unique_anchors(old, new, old_lo, old_hi, new_lo, new_hi)
+        if not anchors:
+            matcher = SequenceMatcher(None, old[old_lo:old_hi], new[new_lo:new_hi], autojunk=False)
+            for i, j, size in matcher.get_matching_blocks():
+                matches.extend((old_lo + i + k, new_lo + j + k) for k in range(size))
+            continue
+        for i, j in anchors:
+            matches.append((i, j))
+            ranges.append((old_lo, i, new_lo, j))
+            old_lo, new_lo = i + 1, j + 1
+        ranges.append((old_lo, old_hi, new_lo, new_hi))
+
+    matches.sort()
+    return matches
+
+def hunks(old, new):
+    """Like line_hunks, for any two sequences of hashable items, through patience_matches"""
+    result = []
+    i = j = 0
+    for match_i, match_j in patience_matches(old, new) + [(len(old), len(new))]:
+        if match_i > i or match_j > j:
+            result.append((i, match_i, j, match_j))
+        i, j = match_i + 1, match_j + 1
+    return result
@@ -0,0 +1,166 @@
+"""
+Compact, array-backed representation of a parsed script.
+
+A ScriptDocument keeps the script source once and describes every element
+with a few machine ints (type code, line number, offset and length of its
+content in the source) instead of a (type, content) tuple holding its own copy
+of the text. Intended for holding many scripts in memory at once, e.g.
+whole-season analysis. Pure Python, no bpy.
+"""
+
+from array import array
+from collections.abc import Sequence
+from . import fountain_parser
+
+# Element type <-> one byte code
+TYPES = (
+    fountain_parser.HEADER,
+    fountain_parser.ACTION,
+    fountain_parser.CHARACTER,
+    fountain_parser.DIALOGUE,
+    fountain_parser.PARENTHETICAL,
+    fountain_parser.TRANSITION,
+    fountain_parser.CENTERED,
+    fountain_parser.LYRIC,
+    fountain_parser.SECTION,
+    fountain_parser.SYNOPSIS,
+    fountain_parser.NOTE,
+    fountain_parser.BONEYARD,
+    fountain_parser.PAGE_BREAK,
+    fountain_parser.TITLE,
+)
+CODES = {element_type: code for code, element_type in enumerate(TYPES)}
+
+class Element:
+    """Lightweight view of one element of a ScriptDocument"""
+    __slots__ = ("document", "index")
+
+    def __init__(self, document, index):
+        self.document = document
+        self.index = index
+
+    @property
+    def type(self):
+        return TYPES[self.document.types[self.index]]
+
+    @property
+    def content(self):
+        return self.document.content(self.index)
+
+    @property
+    def line(self):
+        """0-based line number in the source"""
+        return self.document.lines[self.index]
+
+    def __repr__(self):
+        return f"Element({self.type}, {self.content!r}, line={self.line})"
+
+class ElementTuples(Sequence):
+    """The document as a read-only sequence of (type, content) tuples, like parse_fountain_elements returns"""
+    __slots__ = ("document",)
+
+    def __init__(self, document):
+        self.document = document
+
+    def __len__(self):
+        return len(self.document)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        document = self.document
+        if index < 0:
+            index += len(document)
+        return TYPES[document.types[index]], document.content(index)
+
+    def __iter__(self):
+        document = self.document
+        source = document.source
+        for code, start, length in zip(document.types, document.starts, document.lengths):
+            yield TYPES[code], source[start:start + length]
+
+    def __eq__(self, other):
+        if isinstance(other, (ElementTuples, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"ElementTuples({list(self)!r})"
+
+class ScriptDocument:
+    """
+    Parsed script stored as parallel arrays over a shared source string:
+    types (array 'B' of codes into TYPES), lines (line number of each element),
+    starts/lengths (where its content sits in source). Content strings are only
+    sliced out when asked for. Empty lines are not stored.
+    """
+    __slots__ = ("source", "types", "lines", "starts", "lengths")
+
+    def __init__(self, source):
+        self.source = source
+        self.types = array("B")
+        self.lines = array("I")
+        self.starts = array("I")
+        self.lengths = array("I")
+        self._parse()
+
+    def _parse(self):
+        types_append = self.types.append
+        lines_append = self.lines.append
+        starts_append = self.starts.append
+        lengths_append = self.lengths.append
+        codes = CODES
+        blank = fountain_parser.BLANK
+
+        raw_lines = self.source.split("\n")
+        if raw_lines[-1] == "":
+            # Like splitlines(): a final newline does not start another line
+            raw_lines.pop()
+        offset = 0
+        for i, (raw_line, (element_type, content, line)) in enumerate(
+            zip(raw_lines, fountain_parser.classify_lines(raw_lines))
+        ):
+            if element_type != blank:
+                # line is raw_line stripped, and content is always a substring of line
+                start = offset + len(raw_line) - len(raw_line.lstrip())
+                if content:
+                    start += line.find(content)
+                types_append(codes[element_type])
+                lines_append(i)
+                starts_append(start)
+                lengths_append(len(content))
+            offset += len(raw_line) + 1
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.types)
+        if not 0 <= index < len(self.types):
+            raise IndexError("element index out of range")
+        return Element(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield Element(self, index)
+
+    def type(self, index):
+        return TYPES[self.types[index]]
+
+    def content(self, index):
+        start = self.starts[index]
+        return self.source[start:start + self.lengths[index]]
+
+    def count(self, element_type):
+        """Number of elements of element_type, counted in C"""
+        return self.types.count(CODES[element_type])
+
+    def indices(self, element_type):
+        """Element indices of element_type, in script order"""
+        code = CODES[element_type]
+        return [i for i, c in enumerate(self.types) if c == code]
+
+    def tuples(self):
+        """Compatibility view: a sequence of (type, content) tuples"""
+        return ElementTuples(self)
@@ -0,0 +1,291 @@
+"""
+Final Draft (.fdx) import and export, streamed both ways: the reader walks the
+XML with ElementTree.iterparse and drops every paragraph once read, the writer
+yields the file paragraph by paragraph. Pure Python, no bpy.
+
+Fountain elements Final Draft has no paragraph type for (sections, synopses,
+notes, boneyard) travel as General paragraphs holding their Fountain line, so
+they survive a round trip; lyrics are dialogue starting with ~.
+"""
+
+import mmap
+import re
+import xml.etree.ElementTree as ET
+from itertools import chain
+from . import fountain_interchange, fountain_parser
+from .fountain_parser import (
+    HEADER, ACTION, CHARACTER, DIALOGUE, PARENTHETICAL, TRANSITION, CENTERED, LYRIC,
+    SECTION, SYNOPSIS, NOTE, BONEYARD, PAGE_BREAK, TITLE,
+)
+
+GENERAL = "General"
+
+# Element type -> Final Draft paragraph type
+PARAGRAPH_TYPES = {
+    HEADER: "Scene Heading",
+    ACTION: "Action",
+    CENTERED: "Action",
+    CHARACTER: "Character",
+    DIALOGUE: "Dialogue",
+    LYRIC: "Dialogue",
+    PARENTHETICAL: "Parenthetical",
+    TRANSITION: "Transition",
+    SECTION: GENERAL,
+    SYNOPSIS: GENERAL,
+    NOTE: GENERAL,
+    BONEYARD: GENERAL,
+}
+# Final Draft paragraph type -> element type; anything else is read as action
+ELEMENT_TYPES = {
+    "Scene Heading": HEADER,
+    "Action": ACTION,
+    "Character": CHARACTER,
+    "Dialogue": DIALOGUE,
+    "Parenthetical": PARENTHETICAL,
+    "Transition": TRANSITION,
+    GENERAL: None,
+}
+
+# Paragraphs whose consecutive lines are written as one paragraph
+_MULTILINE = frozenset(("Action", "Dialogue", GENERAL))
+
+_SCENE_NUMBER_RE = re.compile(r"\s*#([^#\s]+)#$")
+_TITLE_KEY_RE = re.compile(r"[^\s:][^:]*:")
+
+HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="no" ?>\n'
+    '<FinalDraft DocumentType="Script" Template="No" Version="5">\n'
+    '  <Content>\n'
+)
+
+def _escape(text):
+    # xml.sax.saxutils.escape, without importing urllib at startup
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def _quoteattr(value):
+    return '"' + _escape(value).replace('"', "&quot;") + '"'
+
+def _paragraph(paragraph_type, lines, attributes):
+    attrs = "".join(f" {name}={_quoteattr(value)}" for name, value in attributes)
+    text = _escape("\n".join(lines))
+    return f"    <Paragraph Type={_quoteattr(paragraph_type)}{attrs}>\n      <Text>{text}</Text>\n    </Paragraph>\n"
+
+def _title_page(lines):
+    parts = ["  <TitlePage>\n    <Content>\n"]
+    for line in lines:
+        parts.append(f'      <Paragraph Type="Action">\n        <Text>{_escape(line)}</Text>\n      </Paragraph>\n')
+    parts.append("    </Content>\n  </TitlePage>\n")
+    return "".join(parts)
+
+def _dual_dialogue(paragraphs):
+    """
+    Yields the XML of (paragraph type, xml, dual) paragraphs, holding back the
+    last dialogue block so a following dual cue (^) can wrap both blocks in one
+    DualDialogue paragraph
+    """
+    held = []      # the last dialogue block, from its cue
+    partner = None # the block before it, when held is its dual
+    for paragraph_type, xml, dual in paragraphs:
+        if paragraph_type in ("Dialogue", "Parenthetical") and held:
+            held.append(xml)
+            continue
+        if partner is not None:
+            yield "    <Paragraph>\n      <DualDialogue>\n" + "".join(partner + held) + "      </DualDialogue>\n    </Paragraph>\n"
+            held, partner = [], None
+        if paragraph_type == "Character":
+            if dual and held:
+                partner = held
+            else:
+                yield from held
+            held = [xml]
+            continue
+        yield from held
+        held = []
+        yield xml
+    if partner is not None:
+        yield "    <Paragraph>\n      <DualDialogue>\n" + "".join(partner + held) + "      </DualDialogue>\n    </Paragraph>\n"
+    else:
+        yield from held
+
+def _paragraphs(lines, title):
+    """(paragraph type, xml, dual) for the script paragraphs of raw lines; title page lines go to title"""
+    current = None   # [paragraph type, lines, attributes, dual]
+    page_break = False
+
+    for element in fountain_interchange.elements(lines):
+        element_type = element.type
+        if element_type == TITLE:
+            title.append(element.source)
+            continue
+        if element_type == PAGE_BREAK:
+            page_break = True
+            continue
+
+        paragraph_type = PARAGRAPH_TYPES[element_type]
+        attributes = []
+        if paragraph_type == GENERAL:
+            text = element.source
+        elif element_type == LYRIC:
+            text = "~" + element.content
+        else:
+            text = element.content
+        if element_type == HEADER:
+            match = _SCENE_NUMBER_RE.search(text)
+            if match:
+                attributes.append(("Number", match.group(1)))
+                text = text[:match.start()]
+        elif element_type == CENTERED:
+            attributes.append(("Alignment", "Center"))
+
+        if (
+            current is not None and element.joined and not page_break
+            and paragraph_type in _MULTILINE and current[0] == paragraph_type and current[2] == attributes
+        ):
+            current[1].append(text)
+            continue
+        if current is not None:
+            yield current[0], _paragraph(*current[:3]), current[3]
+        if page_break:
+            attributes.append(("StartsNewPage", "Yes"))
+            page_break = False
+        dual = element_type == CHARACTER and element.source.endswith("^")
+        current = [paragraph_type, [text], attributes, dual]
+
+    if current is not None:
+        yield current[0], _paragraph(*current[:3]), current[3]
+
+def fdx_chunks(lines):
+    """
+    Yields a Final Draft document for an iterable of raw lines, one paragraph
+    at a time. Lines of one action or dialogue paragraph stay one paragraph,
+    and dual dialogue (a cue ending in ^) becomes a DualDialogue paragraph.
+    """
+    yield HEAD
+    title = []
+    yield from _dual_dialogue(_paragraphs(lines, title))
+    yield "  </Content>\n"
+    if title:
+        yield _title_page(title)
+    yield "</FinalDraft>\n"
+
+def _paragraph_text(paragraph):
+    # Style runs are separate Text children; their text is the paragraph's
+    return "".join(text.text or "" for text in paragraph.findall("Text"))
+
+def title_lines(texts):
+    """Fountain title page lines for the paragraphs of a Final Draft title page"""
+    lines = []
+    for text in texts:
+        for line in text.split("\n"):
+            line = line.strip()
+            if not line:
+                continue
+            if _TITLE_KEY_RE.match(line) and (lines or fountain_parser.is_title_start(line)):
+                lines.append(line)
+            elif lines:
+                lines.append(fountain_parser.TITLE_INDENT + line)
+            else:
+                # Final Draft title pages are free text: the first line is the title
+                lines.append("Title: " + line)
+    return lines
+
+def read_title_page(filepath):
+    """
+    Title page lines of a Final Draft file. Final Draft writes the title page
+    after the script, so it is found by searching the mapped file from the end
+    and only that element is parsed.
+    """
+    with open(filepath, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return []
+        with data:
+            start = data.rfind(b"<TitlePage")
+            end = data.find(b"</TitlePage>", start) if start >= 0 else -1
+            if end < 0:
+                return []
+            fragment = data[start:end + len(b"</TitlePage>")]
+    try:
+        page = ET.fromstring(fragment)
+    except ET.ParseError:
+        return []
+    return title_lines(_paragraph_text(paragraph) for paragraph in page.iter("Paragraph"))
+
+def read_items(source):
+    """
+    Yields (element type, text, joined) items (see fountain_interchange.build_lines)
+    for the script paragraphs of a Final Draft file or file object, streamed:
+    each paragraph is dropped from the tree once read. Raises ET.ParseError.
+    """
+    previous = None
+    started = False
+    depth = 0
+    body = None          # the Content element of the script
+    dual = None          # number of cues read in the current DualDialogue
+    for event, node in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 2 and node.tag == "Content":
+                body = node
+            elif node.tag == "DualDialogue" and body is not None:
+                dual = 0
+            continue
+
+        depth -= 1
+        if body is None:
+            continue
+        if node.tag == "Content" and node is body:
+            body = None
+            continue
+        if node.tag == "DualDialogue":
+            dual = None
+            continue
+        if node.tag != "Paragraph":
+            continue
+
+        text = _paragraph_text(node)
+        paragraph_type = node.get("Type", "Action")
+        attributes = dict(node.attrib)
+        nested = node.find("DualDialogue") is not None
+        node.clear()
+        if depth == 2:
+            # A paragraph of the script itself: nothing before it is needed again
+            body.clear()
+        if nested:
+            continue
+
+        element_type = ELEMENT_TYPES.get(paragraph_type, ACTION)
+        if element_type == ACTION and attributes.get("Alignment") == "Center":
+            element_type = CENTERED
+        lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        if element_type is not None:
+            lines = [line.strip() for line in lines if line.strip()]
+        if not lines:
+            continue
+
+        if attributes.get("StartsNewPage") == "Yes" and started:
+            yield PAGE_BREAK, "", False
+            previous = PAGE_BREAK
+        if element_type == HEADER and attributes.get("Number"):
+            lines[-1] += f" #{attributes['Number']}#"
+        elif element_type == PARENTHETICAL and not lines[0].startswith("("):
+            lines = [f"({' '.join(lines)})"]
+        elif element_type == CHARACTER and dual is not None:
+            dual += 1
+            if dual == 2 and not lines[0].endswith("^"):
+                lines[0] += " ^"
+
+        joined = fountain_interchange.continues_dialogue(previous, element_type)
+        for line in lines:
+            yield element_type, line, joined
+            joined = True
+        previous = element_type
+        started = True
+
+def read_fdx(filepath):
+    """Yields the Fountain lines of a Final Draft file, title page first"""
+    title = read_title_page(filepath)
+    items = [(None, line, i > 0) for i, line in enumerate(title)]
+    with open(filepath, "rb") as f:
+        yield from fountain_interchange.build_lines(chain(items, read_items(f)))
@@ -0,0 +1,59 @@
+"""
+Element stream shared by the interchange formats (fountain_fdx, fountain_json):
+a script as non-empty elements, each knowing whether it directly follows the
+previous one, and the way back to Fountain lines. Pure Python, no bpy.
+"""
+
+from collections import namedtuple
+from . import fountain_parser
+from .fountain_parser import BLANK, CHARACTER, DIALOGUE, PARENTHETICAL
+
+# type: element type, content: text without markup, source: the stripped
+# Fountain line, line: 0-based line number, scene: 0-based scene number (-1
+# before the first header), joined: no empty line between it and the previous element
+ScriptElement = namedtuple("ScriptElement", "type content source line scene joined")
+
+_DIALOGUE_BLOCK = frozenset((CHARACTER, DIALOGUE, PARENTHETICAL))
+
+def continues_dialogue(previous_type, element_type):
+    """True if element_type directly follows previous_type inside a dialogue block"""
+    return element_type in (DIALOGUE, PARENTHETICAL) and previous_type in _DIALOGUE_BLOCK
+
+def elements(lines):
+    """Yields a ScriptElement for every non-empty line of an iterable of raw lines"""
+    joined = False
+    scene = -1
+    header = fountain_parser.HEADER
+    for i, (element_type, content, line) in enumerate(fountain_parser.classify_lines(lines)):
+        if element_type == BLANK:
+            joined = False
+            continue
+        if element_type == header:
+            scene += 1
+        yield ScriptElement(element_type, content, line, i, scene, joined)
+        joined = True
+
+def build_lines(items):
+    """
+    Yields Fountain lines, empty lines included, for an iterable of
+    (element type, text, joined) items: text is the element content, or the
+    Fountain source line itself when the type is None. Markup is added where the
+    content alone would be read as another element (see fountain_parser.fountain_line).
+    """
+    iterator = iter(items)
+    current = next(iterator, None)
+    first = True
+    while current is not None:
+        following = next(iterator, None)
+        element_type, text, joined = current
+        if not joined and not first:
+            yield ""
+        if element_type is None:
+            yield text
+        else:
+            yield fountain_parser.fountain_line(
+                element_type, text, after_blank=first or not joined,
+                followed=following is not None and following[2],
+            )
+        first = False
+        current = following
@@ -1,25 +1,10 @@
 import bpy
+import json
 import os
+from array import array
 from bpy_extras.io_utils import ImportHelper, ExportHelper
-
-def is_scene_header(line):
-    s = line.strip()
-    return s.startswith(("INT.", "EXT.", "INT ", "EXT ", "EST.", ". ", "I/E"))
-
-def is_character(line):
-    # Basic heuristic: Uppercase and not a scene header
-    s = line.strip()
-    return s.isupper() and not is_scene_header(s)
-
-def is_parenthetical(line):
-    s = line.strip()
-    return s.startswith("(") and s.endswith(")")
-
-def is_transition(line):
-    s = line.strip()
-    # Forced transition or standard "TO:" ending
-    if s.startswith(">"): return True
-    return s.isupper() and s.endswith("TO:")
+from . import fountain_lines, fountain_parser
+from .fountain_parser import is_scene_header, is_character, is_parenthetical, is_transition
 
 class SCREENWRITER_OT_export_fountain(bpy.types.Operator, ExportHelper):
     """Export current text to Fountain"""
@@ -53,16 +38,8 @@ class SCREENWRITER_OT_export_fountain(bpy.types.Operator, ExportHelper):
             self.report({'ERROR'}, "No text file found to export.")
             return {'CANCELLED'}
 
-        content = ""
-        for line in text.lines:
-            # For export, we primarily just strip the indentation we added
-            # Fountain format is remarkably resilient.
-            # "                      HERO" -> "HERO" (Valid Character)
-            # "          (beat)" -> "(beat)" (Valid Parenthetical)
-            content += line.body.strip() + "\n"
-
-        with open(self.filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        # For export, we primarily just strip the indentation we added
+        write_fountain_file(self.filepath, text)
             
         self.report({'INFO'}, "Exported to " + self.filepath)
         return {'FINISHED'}
@@ -79,10 +56,13 @@ class SCREENWRITER_OT_import_fountain(bpy.types.Operator, ImportHelper):
         maxlen=255,
     )
 
-    def execute(self, context):
-        with open(self.filepath, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+    use_mmap: bpy.props.BoolProperty(
+        name="Memory-Map File",
+        description="Classify the file straight from a memory map (faster on very large files)",
+        default=False,
+    )
 
+    def execute(self, context):
         text_name = os.path.basename(self.filepath)
         text = bpy.data.texts.new(name=text_name)
         
@@ -95,14 +75,15 @@ class SCREENWRITER_OT_import_fountain(bpy.types.Operator, ImportHelper):
                     area.spaces.active.text = text
                     break
         
-        text.write("".join(lines)) # Write raw first, then format
+        # Classify and indent while reading, so the file is written to the text once
+        digest = write_formatted(text, fountain_parser.read_lines(self.filepath, self.use_mmap))
         
         # Link the file to the text block for saving
         text.filepath = self.filepath
-        
-        # Format it
-        format_text_block(text)
+        disable_syntax_highlight(text)
         text["screenwriter_init"] = True
+        # In sync with the file: the watcher reloads changes made to it from now on
+        set_save_stamp(text, self.filepath, digest, source=text[FORMAT_HASH_KEY])
         
         return {'FINISHED'}
 
@@ -110,154 +91,264 @@ def parse_fountain_elements(raw_content):
     """
     Parses raw text into a list of (type, content) tuples.
     Types: HEADER, ACTION, CHARACTER, DIALOGUE, PARENTHETICAL, TRANSITION
+    Use fountain_document.ScriptDocument instead to keep many scripts in
+    memory, or for the line number of each element.
     """
-    lines = raw_content.splitlines()
-    elements = []
-    
-    if not lines: return elements
+    return fountain_parser.parse_elements(raw_content)
 
-    for i, raw_line in enumerate(lines):
-        line = raw_line.strip()
-        
-        if not line:
-            continue
-            
-        # Context checks
-        prev_line_empty = True
-        if i > 0:
-            prev_line_empty = (lines[i-1].strip() == "")
-            
-        element_type = "ACTION"
-        content = line
-        
-        if is_scene_header(line):
-            element_type = "HEADER"
-            
-        elif is_transition(line):
-             element_type = "TRANSITION"
-             if line.startswith(">"):
-                 content = line[1:].strip()
-                 
-        elif is_character(line) and prev_line_empty:
-            element_type = "CHARACTER"
-            
-        elif is_parenthetical(line):
-            element_type = "PARENTHETICAL"
-            
-        else:
-            # Dialogue Check
-            is_dialogue = False
-            if i > 0 and not prev_line_empty:
-                prev_line = lines[i-1].strip()
-                prev_prev_empty = True
-                if i > 1:
-                    prev_prev_empty = (lines[i-2].strip() == "")
-                
-                prev_is_char = is_character(prev_line) and prev_prev_empty
-                prev_is_paren = is_parenthetical(prev_line)
-                
-                if prev_is_char or prev_is_paren:
-                    is_dialogue = True
-            
-            if is_dialogue:
-                 element_type = "DIALOGUE"
-        
-        elements.append( (element_type, content) )
-        
-    return elements
+# Per-line hashes of the text as it was last formatted, used to find edited lines
+LINE_HASHES_KEY = "screenwriter_line_hashes"
+# Per-line type codes (fountain_lines.CODES) of the same lines, to find where the classifier resets
+LINE_TYPES_KEY = "screenwriter_line_types"
+# Hash of the whole text as it was last formatted: unchanged text is not formatted again
+FORMAT_HASH_KEY = "screenwriter_format_hash"
+# [hash of the text, file_stamp()] from the last time the text and its file were
+# in sync, by a save or a reload (JSON). The hash is null if they never were.
+SAVE_STAMP_KEY = "screenwriter_save_stamp"
+# "size:mtime_ns" of a linked file that changed on disk while its text had unsaved edits
+EXTERNAL_CHANGE_KEY = "screenwriter_external_change"
+
+def is_formatted(text, raw_content):
+    """True if raw_content (text.as_string()) is exactly what the add-on last formatted"""
+    return text.get(FORMAT_HASH_KEY) == fountain_parser.content_hash((raw_content,))
+
+def write_formatted(text, lines, final_newline=True):
+    """
+    Classifies and indents an iterable of raw lines while appending them to text
+    in chunks, so no second full copy of the script is built along the way.
+    Returns the stripped_hash() of the lines.
+    """
+    return write_chunks(text, fountain_parser.format_chunks(lines), final_newline)
+
+def write_chunks(text, chunks, final_newline=True):
+    """
+    Appends already formatted lists of lines to text, stores their hashes and
+    returns their stripped_hash(). Every line ends with a newline, as read from
+    a file, unless final_newline is False: then the lines are joined, as
+    text.as_string().split("\n") gave them.
+    """
+    hashes = array("i")
+    stripped = fountain_parser.StrippedHash()
+
+    def written():
+        separator = ""
+        for chunk in chunks:
+            if final_newline:
+                content = "".join([line + "\n" for line in chunk])
+            else:
+                content = separator + "\n".join(chunk)
+                separator = "\n"
+            text.write(content)
+            hashes.extend(fountain_parser.line_hashes(chunk))
+            stripped.update(chunk)
+            yield content
+
+    # Hashed chunk by chunk as it is written, without keeping a copy
+    text[FORMAT_HASH_KEY] = fountain_parser.content_hash(written())
+    if final_newline:
+        # The empty line after the final newline
+        hashes.append(fountain_parser.line_hash(""))
+    text[LINE_HASHES_KEY] = hashes.tolist()
+    # Classified again, once, by the next incremental format
+    if LINE_TYPES_KEY in text:
+        del text[LINE_TYPES_KEY]
+    return stripped.digest()
+
+def disable_syntax_highlight(text):
+    if hasattr(text, "use_syntax_highlight"): # Older blender
+         text.use_syntax_highlight = False
 
 def format_text_block(text):
     """Parses the text block content as Fountain and applies visual formatting"""
     raw_content = text.as_string()
-    lines = raw_content.splitlines()
-    
-    if not lines: return
-
-    new_content = ""
     
-    # We need to look behind, so we iterate by index
-    for i, raw_line in enumerate(lines):
-        line = raw_line.strip()
-        
-        if not line:
-            new_content += "\n"
-            continue
-            
-        # Context checks
-        prev_line_empty = True
-        if i > 0:
-            prev_line_empty = (lines[i-1].strip() == "")
-            
-        indent = ""
-        
-        # 1. Scene Header: Always wins
-        if is_scene_header(line):
-            indent = ""
-            
-        # 2. Transition: Forced > or uppercase ending in TO: and preceded by empty line
-        elif is_transition(line):
-             # Logic: If it starts with > it's definitely a transition (strip it)
-             # If it ends with TO: it should probably be preceded by empty line to be safe, 
-             # but we'll accept it for now.
-             indent = " " * 42
-             if line.startswith(">"):
-                 line = line[1:].strip()
-                 
-        # 3. Character: Uppercase, NOT a header/transition, and PRECEDED BY EMPTY LINE
-        elif is_character(line) and prev_line_empty:
-            indent = " " * 22
-            
-        # 4. Parenthetical: Wrapped in ()
-        elif is_parenthetical(line):
-            indent = " " * 16
-            
-        # 5. Dialogue: If previous line was Character or Parenthetical?
-        else:
-            # Complex Dialogue Check
-            is_dialogue = False
-            if i > 0 and not prev_line_empty:
-                prev_line = lines[i-1].strip()
-                
-                # Was prev line a Character? (Uppercase, preceded by empty line [check i-2])
-                prev_prev_empty = True
-                if i > 1:
-                    prev_prev_empty = (lines[i-2].strip() == "")
-                
-                prev_is_char = is_character(prev_line) and prev_prev_empty
-                prev_is_paren = is_parenthetical(prev_line)
-                
-                if prev_is_char or prev_is_paren:
-                    is_dialogue = True
-            
-            if is_dialogue:
-                indent = " " * 10
-            else:
-                indent = "" # Action
-        
-        new_content += indent + line + "\n"
+    if not raw_content or is_formatted(text, raw_content): return
         
     text.clear()
-    text.write(new_content)
+    write_formatted(text, raw_content.split("\n"), final_newline=False)
     
     # Disable syntax highlight
-    if hasattr(text, "use_syntax_highlight"): # Older blender
-         text.use_syntax_highlight = False
+    disable_syntax_highlight(text)
+
+class LineBodies:
+    """The bodies of text.lines as a sequence, read one line at a time"""
+    __slots__ = ("lines",)
+
+    def __init__(self, text):
+        self.lines = text.lines
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getitem__(self, index):
+        return self.lines[index].body
+
+def format_text_block_incremental(text, edit=None, types=None):
+    """
+    Re-formats only the lines edited since the last format, plus the rest of the
+    paragraphs they are in, whose classification can depend on the edit. Lines are rewritten in place,
+    so the cursor and undo history of untouched lines survive.
+    When the caller knows the edit, (start, old_stop, new_stop) as in
+    LineTypes.edit(), and has types, the LineTypes of the text as it was
+    before it (screenwriter_ops keeps one per text), only the lines around
+    the edit are read and types is kept in step. Else every line is hashed
+    to find the edits.
+    Returns the number of rewritten lines.
+    """
+    if edit is not None and types is not None:
+        rewritten = _format_edit(text, edit, types)
+        if rewritten is not None:
+            return rewritten
+
+    old_hashes = text.get(LINE_HASHES_KEY)
+    if old_hashes is None:
+        # Never formatted (or formatted by an older version): do it all once
+        format_text_block(text)
+        return len(text.lines)
+
+    raw_content = text.as_string()
+    if is_formatted(text, raw_content):
+        # One CRC of the whole text instead of one per line
+        return 0
+
+    types = fountain_lines.LineTypes()
+    old_codes = text.get(LINE_TYPES_KEY)
+    if old_codes is not None and len(old_codes) == len(old_hashes):
+        types.hashes = array("i", old_hashes.to_list())
+        types.codes = array("B", old_codes.to_list())
+    # else: no line types stored yet, every line is classified once
+
+    lines = raw_content.split("\n")
+    first, formatted = fountain_lines.format_window(types, lines)
+
+    hashes = types.hashes
+    rewritten = 0
+    for i, new_line in enumerate(formatted, first):
+        if new_line != lines[i]:
+            text.lines[i].body = new_line
+            lines[i] = new_line
+            hashes[i] = fountain_parser.line_hash(new_line)
+            rewritten += 1
+
+    text[LINE_HASHES_KEY] = hashes.tolist()
+    text[LINE_TYPES_KEY] = types.codes.tolist()
+    text[FORMAT_HASH_KEY] = fountain_parser.content_hash(("\n".join(lines),))
+    return rewritten
+
+def _format_edit(text, edit, types):
+    # None if types does not match the text around the edit
+    start, old_stop, new_stop = edit
+    lines = text.lines
+    line_hash = fountain_parser.line_hash
+    if len(types) + new_stop - old_stop != len(lines):
+        return None
+    if start > 0 and types.hashes[start - 1] != line_hash(lines[start - 1].body):
+        return None
+    if new_stop < len(lines) and types.hashes[old_stop] != line_hash(lines[new_stop].body):
+        return None
+
+    first, stop = types.edit(LineBodies(text), start, old_stop, new_stop)
+    rewritten = 0
+    for i in range(first, stop):
+        old_line = lines[i].body
+        new_line = fountain_parser.indent_line(types.type(i), old_line.strip())
+        if new_line != old_line:
+            lines[i].body = new_line
+            types.hashes[i] = line_hash(new_line)
+            rewritten += 1
+    # The stored line hashes and types still describe the text as last formatted
+    # in full, which the next full pass compares with; the whole-text hash is stale
+    if FORMAT_HASH_KEY in text:
+        del text[FORMAT_HASH_KEY]
+    return rewritten
+
+def write_fountain_file(filepath, text):
+    """Streams the text block to filepath as plain Fountain (indentation stripped), atomically"""
+    # as_string() is one call into Blender, iterating text.lines is one per line
+    fountain_parser.write_atomic(filepath, fountain_parser.export_chunks(text.as_string().split("\n")))
+
+def file_stamp(filepath, digest, st=None):
+    """[path, digest, size, mtime_ns] of a file whose stripped lines hash to digest"""
+    st = st or os.stat(filepath)
+    return [os.path.abspath(filepath), digest, st.st_size, st.st_mtime_ns]
+
+def get_save_stamp(text):
+    """(hash of the text, file_stamp) as of the last save or reload, or (None, None)"""
+    try:
+        return tuple(json.loads(text.get(SAVE_STAMP_KEY, "null")) or (None, None))
+    except (TypeError, ValueError):
+        return None, None
+
+def set_save_stamp(text, filepath, digest, raw_content=None, st=None, source=None):
+    """
+    Records that the file at filepath (as of os.stat result st) and text (now
+    raw_content, or hashing to source) are in sync
+    """
+    if source is None:
+        if raw_content is None:
+            raw_content = text.as_string()
+        source = fountain_parser.content_hash((raw_content,))
+    text[SAVE_STAMP_KEY] = json.dumps([source, file_stamp(filepath, digest, st)])
+
+def set_file_stamp(text, filepath, digest, st=None):
+    """Records the state of the file at filepath without claiming text matches it: the next save writes the text"""
+    text[SAVE_STAMP_KEY] = json.dumps([None, file_stamp(filepath, digest, st)])
+
+def save_fountain_file(text):
+    """
+    Saves text to its linked file as plain Fountain, unless the file already
+    holds exactly that: same content as the last save and untouched on disk
+    since. Returns True if the file was written.
+    """
+    filepath = bpy.path.abspath(text.filepath)
+    raw_content = text.as_string()
+    saved_source, stamp = get_save_stamp(text)
+
+    def unchanged_on_disk(digest):
+        try:
+            return stamp == file_stamp(filepath, digest)
+        except OSError:
+            return False
+
+    # Text untouched since the last save: not even its lines need to be hashed
+    if stamp is not None and fountain_parser.content_hash((raw_content,)) == saved_source and unchanged_on_disk(stamp[1]):
+        return False
+
+    lines = raw_content.split("\n")
+    # Only the indentation changed (e.g. formatting): the file would be the same
+    digest = fountain_parser.stripped_hash(lines)
+    written = not (stamp is not None and unchanged_on_disk(digest))
+    if written:
+        fountain_parser.write_atomic(filepath, fountain_parser.export_chunks(lines))
+    set_save_stamp(text, filepath, digest, raw_content)
+    if EXTERNAL_CHANGE_KEY in text:
+        # Saving over a file changed on disk keeps the text's version
+        del text[EXTERNAL_CHANGE_KEY]
+    return written
+
+def is_fountain_text(text):
+    """True for text blocks named or linked to a .fountain file"""
+    is_fountain = text.name.lower().endswith(".fountain")
+    if text.filepath:
+        is_fountain = is_fountain or text.filepath.lower().endswith(".fountain")
+    return is_fountain
 
 def on_load_handler(dummy):
-    """Event handler for when a .blend file is opened"""
-    for text in bpy.data.texts:
-        is_fountain = text.name.lower().endswith(".fountain")
-        if text.filepath:
-            is_fountain = is_fountain or text.filepath.lower().endswith(".fountain")
-            
-        if is_fountain and not text.get("screenwriter_init"):
-            format_text_block(text)
-            text["screenwriter_init"] = True
+    """
+    Event handler for when a .blend file is opened. Only queues the Fountain
+    texts never formatted before: they are formatted from a timer afterwards,
+    so opening the file is not held up.
+    """
+    from . import screenwriter_load
+    screenwriter_load.queue_texts(
+        [text for text in bpy.data.texts if is_fountain_text(text) and not text.get("screenwriter_init")]
+    )
 
 class SCREENWRITER_OT_format_fountain(bpy.types.Operator):
     """Format current text as Fountain (Manual Trigger)"""
     bl_idname = "screenwriter.format_fountain"
     bl_label = "Format as Fountain"
+    bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
         text = getattr(context, "edit_text", None)
@@ -268,7 +359,8 @@ class SCREENWRITER_OT_format_fountain(bpy.types.Operator):
             self.report({'ERROR'}, "No active text.")
             return {'CANCELLED'}
             
-        format_text_block(text)
+        if not format_text_block_incremental(text) and text.get("screenwriter_init"):
+            self.report({'INFO'}, "Already formatted.")
         text["screenwriter_init"] = True
         return {'FINISHED'}
 
@@ -291,14 +383,11 @@ class SCREENWRITER_OT_save_fountain(bpy.types.Operator):
             return bpy.ops.screenwriter.export_fountain('INVOKE_DEFAULT')
             
         # Write File
-        content = ""
-        for line in text.lines:
-            content += line.body.strip() + "\n"
-
         try:
-            with open(text.filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
-            self.report({'INFO'}, f"Saved to {text.filepath}")
+            if save_fountain_file(text):
+                self.report({'INFO'}, f"Saved to {text.filepath}")
+            else:
+                self.report({'INFO'}, f"No changes to save to {text.filepath}")
             text.is_dirty = False
         except Exception as e:
             self.report({'ERROR'}, f"Failed to save: {str(e)}")
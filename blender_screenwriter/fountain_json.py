@@ -0,0 +1,184 @@
+"""
+JSON element dump of a script for downstream tools, and its import.
+Written one element per line as the script is classified:
+
+    {"format": "screenwriter-elements", "version": 1, "elements": [
+    {"type": "HEADER", "text": "INT. HOUSE - NIGHT", "source": "INT. HOUSE - NIGHT", "line": 14, "scene": 0},
+    ...
+    ]}
+
+type is a fountain_parser element type, text the element without markup,
+source its Fountain line, line the 0-based line number and scene the 0-based
+scene number (-1 before the first header). On import only type and text are
+required; source and line, when present, give back the exact Fountain.
+Pure Python, no bpy.
+"""
+
+import json
+import re
+from itertools import islice
+from . import fountain_document, fountain_interchange
+
+FORMAT = "screenwriter-elements"
+VERSION = 1
+
+def json_chunks(lines, size=1024):
+    """Yields the JSON dump of an iterable of raw lines, up to size elements per chunk"""
+    yield '{"format": "%s", "version": %d, "elements": [\n' % (FORMAT, VERSION)
+    dumps = json.dumps
+    separator = ""
+    elements = fountain_interchange.elements(lines)
+    while True:
+        chunk = list(islice(elements, size))
+        if not chunk:
+            break
+        yield separator + ",\n".join([
+            dumps({
+                "type": element.type, "text": element.content, "source": element.source,
+                "line": element.line, "scene": element.scene,
+            }, ensure_ascii=False)
+            for element in chunk
+        ])
+        separator = ",\n"
+    yield "\n]}\n"
+
+class _Stream:
+    """A text file read a buffer at a time, for decoding one JSON value after another"""
+
+    def __init__(self, f, size=1 << 16):
+        self.f = f
+        self.size = size
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self):
+        data = self.f.read(self.size)
+        if not data:
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """The next character that is not whitespace, "" at the end of the file"""
+        while True:
+            pos = self.pos = _whitespace(self.buffer, self.pos).end()
+            if pos < len(self.buffer):
+                return self.buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"malformed {FORMAT} file: expected {char!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decodes the next JSON value, after peek()"""
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Cut off by the end of the buffer, unless the file ends too
+                if self._fill():
+                    continue
+                raise ValueError(f"malformed {FORMAT} file: {e}") from e
+            # A number at the end of the buffer may go on in the next read
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def array(self):
+        """Yields the values of the next JSON array, one at a time"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            self.peek()
+            yield self.value()
+            if self.peek() != ",":
+                self.expect("]")
+                return
+            self.pos += 1
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\r\n]*").match
+
+def _check_header(header):
+    if header.get("format") != FORMAT:
+        raise ValueError(f"not a {FORMAT} file")
+    if header.get("version", VERSION) > VERSION:
+        raise ValueError(f"{FORMAT} version {header['version']} is newer than this add-on")
+
+def read_elements(f):
+    """
+    Yields the element objects of a JSON dump read from a text file object,
+    streamed: only the element being decoded is in memory. That holds when
+    format comes before elements, as json_chunks writes them; elements found
+    before it are kept until it is checked. Raises ValueError if it is not a dump.
+    """
+    stream = _Stream(f)
+    if stream.peek() != "{":
+        raise ValueError(f"not a {FORMAT} file")
+    stream.pos += 1
+    header = {}
+    early = None
+    checked = False
+    if stream.peek() == "}":
+        stream.pos += 1
+    else:
+        while True:
+            stream.peek()
+            key = stream.value()
+            stream.expect(":")
+            if key == "elements" and "format" in header:
+                _check_header(header)
+                checked = True
+                yield from stream.array()
+            elif key == "elements":
+                early = list(stream.array())
+            else:
+                stream.peek()
+                header[key] = stream.value()
+            if stream.peek() != ",":
+                stream.expect("}")
+                break
+            stream.pos += 1
+    if not checked:
+        _check_header(header)
+        yield from early or ()
+
+def read_items(elements):
+    """
+    Yields (element type, text, joined) items (see fountain_interchange.build_lines)
+    for the element objects of a JSON dump. Raises ValueError for a malformed one.
+    """
+    previous_type = previous_line = None
+    for element in elements:
+        try:
+            element_type = element["type"]
+            text = element.get("source")
+            if element_type not in fountain_document.CODES:
+                raise ValueError(f"unknown element type {element_type!r}")
+            line = element.get("line")
+            if line is not None and previous_line is not None:
+                joined = line == previous_line + 1
+            else:
+                joined = fountain_interchange.continues_dialogue(previous_type, element_type)
+            if text is None:
+                yield element_type, element["text"], joined
+            else:
+                yield None, text, joined
+        except (TypeError, KeyError, AttributeError) as e:
+            raise ValueError(f"malformed element {element!r}") from e
+        previous_type, previous_line = element_type, line
+
+def read_json(filepath):
+    """
+    Yields the Fountain lines of a JSON element dump, streamed like a Final
+    Draft file. Raises ValueError if it is not one.
+    """
+    with open(filepath, "r", encoding="utf-8") as f:
+        yield from fountain_interchange.build_lines(read_items(read_elements(f)))
@@ -0,0 +1,180 @@
+"""
+Element type of every line of a text, kept up to date incrementally so
+keyboard commands can look at the current and previous line in O(1).
+Pure Python, no bpy.
+"""
+
+from array import array
+from itertools import islice
+from . import fountain_document, fountain_parser
+from .fountain_parser import BLANK
+
+# Line type <-> one byte code (BLANK added to the element types)
+TYPES = fountain_document.TYPES + (BLANK,)
+CODES = {line_type: code for code, line_type in enumerate(TYPES)}
+BLANK_CODE = CODES[BLANK]
+
+class LineTypes:
+    """
+    Classification of each line of a text, as two parallel arrays: CRC32 of the
+    line (to find edits) and its type code. update() and edit() re-classify only
+    from the BLANK line before the first edited line to the first line after the
+    edit where the old and new classification are both reset (BLANK).
+    """
+    __slots__ = ("hashes", "codes")
+
+    def __init__(self):
+        self.hashes = array("i")
+        self.codes = array("B")
+
+    def __len__(self):
+        return len(self.codes)
+
+    def type(self, index):
+        """Element type of line index, BLANK outside the text"""
+        if 0 <= index < len(self.codes):
+            return TYPES[self.codes[index]]
+        return BLANK
+
+    def update(self, lines):
+        """
+        Brings the cache up to date with lines (a list of raw lines), finding the
+        edit by hashing every line.
+        Returns the (start, stop) range of lines that were classified again,
+        or None when nothing changed.
+        """
+        hashes = fountain_parser.line_hashes(lines)
+        if not self.codes:
+            self.codes = array("B", [CODES[t] for t, _content, _line in fountain_parser.classify_lines(lines)])
+            self.hashes = hashes
+            return (0, len(lines)) if lines else None
+
+        window = fountain_parser.changed_range(self.hashes, hashes)
+        if window is None:
+            return None
+        start, old_stop, new_stop = window
+        self.hashes = hashes
+        return self._classify(lines, start, old_stop, new_stop)
+
+    def fill(self, lines, size=4096):
+        """
+        Generator classifying lines (len() and indexing, like edit()) from
+        scratch, size lines per step, so the work can be spread over time.
+        Each line is read once. The cache only changes once it is exhausted.
+        """
+        count = len(lines)
+        raw = []
+
+        def read():
+            for i in range(count):
+                line = lines[i]
+                raw.append(line)
+                yield line
+
+        hashes = array("i")
+        codes = array("B")
+        classified = fountain_parser.classify_lines(read())
+        for start in range(0, count, size):
+            stop = min(count, start + size)
+            codes.extend([CODES[t] for t, _content, _line in islice(classified, stop - start)])
+            hashes.extend(fountain_parser.line_hashes(raw[start:stop]))
+            yield
+        self.hashes = hashes
+        self.codes = codes
+
+    def edit(self, lines, start, old_stop, new_stop):
+        """
+        Brings the cache up to date after an edit known to have replaced the old
+        lines[start:old_stop] by lines[start:new_stop], without hashing the rest.
+        lines only needs len() and indexing, and is read from the line the
+        classification restarts on until it settles. Returns the (start, stop)
+        range of lines that were classified again.
+        """
+        self.hashes[start:old_stop] = fountain_parser.line_hashes([lines[i] for i in range(start, new_stop)])
+        return self._classify(lines, start, old_stop, new_stop)
+
+    def _classify(self, lines, start, old_stop, new_stop):
+        # Restart on the last BLANK line before the edit, where the classifier state is reset
+        codes = self.codes
+        first = start - 1
+        while first > 0 and codes[first] != BLANK_CODE:
+            first -= 1
+        first = max(first, 0)
+
+        # Lines after the edit keep their index shifted by delta; once a line there
+        # is BLANK in both the old and the new classification, the rest is unchanged
+        delta = new_stop - old_stop
+        new_codes = array("B")
+        stop = len(lines)
+        tail = map(lines.__getitem__, range(first, stop))
+        for i, (line_type, _content, _line) in enumerate(fountain_parser.classify_lines(tail, title_page=first == 0), first):
+            code = CODES[line_type]
+            if i >= new_stop and code == BLANK_CODE and codes[i - delta] == BLANK_CODE:
+                stop = i
+                break
+            new_codes.append(code)
+
+        self.codes = codes[:first] + new_codes + codes[stop - delta:]
+        return first, stop
+
+def format_window(types, lines):
+    """
+    Brings types (the LineTypes of the lines as last formatted) up to date with
+    lines and re-formats the lines it classified again. Empty lines inside a
+    boneyard or note are not BLANK, so the window never restarts or stops there.
+    Returns (first, formatted): formatted replaces lines[first:first + len(formatted)].
+    """
+    window = types.update(lines)
+    if window is None:
+        return 0, []
+    first, stop = window
+    indent_line = fountain_parser.indent_line
+    return first, [
+        indent_line(TYPES[code], line.strip()) for code, line in zip(types.codes[first:stop], lines[first:stop])
+    ]
+
+# Tab cycles a written line through these element types
+CYCLE = (
+    fountain_parser.ACTION,
+    fountain_parser.CHARACTER,
+    fountain_parser.PARENTHETICAL,
+    fountain_parser.DIALOGUE,
+    fountain_parser.TRANSITION,
+    fountain_parser.HEADER,
+)
+
+# What an empty line most likely is, given the type of the line above it
+_AFTER = {
+    fountain_parser.CHARACTER: fountain_parser.DIALOGUE,
+    fountain_parser.PARENTHETICAL: fountain_parser.DIALOGUE,
+    fountain_parser.DIALOGUE: fountain_parser.PARENTHETICAL,
+    fountain_parser.LYRIC: fountain_parser.PARENTHETICAL,
+    fountain_parser.HEADER: fountain_parser.ACTION,
+    fountain_parser.TRANSITION: fountain_parser.HEADER,
+}
+
+def next_type(current, previous):
+    """
+    The element type Tab turns a line into. current is the line's type (BLANK
+    for an empty line), previous the type of the line above it.
+    """
+    if current == BLANK:
+        return _AFTER.get(previous, fountain_parser.CHARACTER)
+    if current not in CYCLE:
+        return CYCLE[0]
+    return CYCLE[(CYCLE.index(current) + 1) % len(CYCLE)]
+
+def starts_dialogue(line_type, previous, body):
+    """
+    True if the line after this one is dialogue: after a cue or parenthetical,
+    including a cue still being typed, which reads as action until its first
+    line of dialogue exists.
+    """
+    if line_type in (fountain_parser.CHARACTER, fountain_parser.PARENTHETICAL):
+        return True
+    return (
+        line_type == fountain_parser.ACTION
+        and previous == BLANK
+        and fountain_parser.is_character(body)
+        and not fountain_parser.is_transition(body)
+    )
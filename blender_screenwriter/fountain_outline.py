@@ -0,0 +1,95 @@
+"""
+Outline of a script: its scene headers, sections and synopses with their line
+indices, sorted by line and updated incrementally from the line types kept by
+fountain_lines, so navigating never parses the whole script again.
+Pure Python, no bpy.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from . import fountain_lines, fountain_parser
+
+OUTLINE_TYPES = (fountain_parser.HEADER, fountain_parser.SECTION, fountain_parser.SYNOPSIS)
+_OUTLINE_CODES = frozenset(fountain_lines.CODES[t] for t in OUTLINE_TYPES)
+
+# line: 0-based line index, level: number of #s of a section (0 otherwise)
+OutlineEntry = namedtuple("OutlineEntry", "line element_type level title")
+
+def outline_entry(index, element_type, line):
+    """The OutlineEntry for raw line number index, known to be of element_type"""
+    s = line.strip()
+    level = 0
+    if element_type == fountain_parser.SECTION:
+        title = s.lstrip("#")
+        level = len(s) - len(title)
+    elif element_type == fountain_parser.SYNOPSIS or s.startswith("."):
+        # Synopsis "=" or forced scene heading "."
+        title = s[1:]
+    else:
+        title = s
+    return OutlineEntry(index, element_type, level, title.strip())
+
+class Outline:
+    """
+    The OutlineEntries of a text in line order, plus their line indices as an
+    array for bisect. update() replaces only the entries in the range of lines
+    that fountain_lines.LineTypes classified again, and shifts the ones after it.
+    """
+    __slots__ = ("types", "entries", "starts")
+
+    def __init__(self):
+        self.types = fountain_lines.LineTypes()
+        self.entries = []
+        self.starts = array("i")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, lines):
+        """
+        Brings the outline up to date with lines (a list of raw lines).
+        Returns the (start, stop) range of entries that were replaced, or None
+        when the outline did not change.
+        """
+        old_count = len(self.types)
+        window = self.types.update(lines)
+        if window is None:
+            return None
+        first, stop = window
+        delta = len(lines) - old_count
+
+        codes = self.types.codes
+        types = fountain_lines.TYPES
+        new = [
+            outline_entry(i, types[codes[i]], lines[i])
+            for i in range(first, stop) if codes[i] in _OUTLINE_CODES
+        ]
+        # Entries before first are kept, those from the old end of the window are shifted
+        lo = bisect_left(self.starts, first)
+        hi = bisect_left(self.starts, stop - delta)
+        tail = self.entries[hi:]
+        if delta:
+            tail = [entry._replace(line=entry.line + delta) for entry in tail]
+        if new == self.entries[lo:hi] and not delta:
+            return None
+
+        self.entries[lo:] = new + tail
+        self.starts = array("i", [entry.line for entry in self.entries])
+        return lo, lo + len(new)
+
+    def entry_at(self, line):
+        """Index of the entry line belongs to (the last one at or before it), or -1"""
+        return bisect_right(self.starts, line) - 1
+
+    def find(self, line, step, element_type=fountain_parser.HEADER):
+        """
+        Index of the next (step 1) or previous (step -1) entry of element_type
+        after or before line, or -1 when there is none.
+        """
+        index = bisect_right(self.starts, line) if step > 0 else bisect_left(self.starts, line) - 1
+        while 0 <= index < len(self.entries):
+            if self.entries[index].element_type == element_type:
+                return index
+            index += step
+        return -1
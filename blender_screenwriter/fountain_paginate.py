@@ -0,0 +1,283 @@
+"""
+Lays a script out on standard screenplay pages: 55 lines of 12pt Courier
+(10 characters per inch), elements in the columns of fountain_parser.INDENTS.
+Dialogue split over a page break gets (MORE) and a (CONT'D) cue, a character
+cue is never left alone at the bottom of a page and a scene header is kept
+with the start of its scene. Pure Python, no bpy.
+
+count_pages() runs the same layout without building the printed lines, for
+page and running time estimates.
+"""
+
+import re
+from collections import namedtuple
+from . import fountain_parser
+from .fountain_parser import (
+    HEADER, ACTION, CHARACTER, DIALOGUE, PARENTHETICAL, TRANSITION, CENTERED, LYRIC,
+    SECTION, SYNOPSIS, NOTE, BONEYARD, PAGE_BREAK, TITLE, BLANK,
+)
+
+LINES_PER_PAGE = 55
+# Printable characters per line (6 inches at 10 cpi)
+PAGE_COLUMNS = 60
+
+MORE = "(MORE)"
+CONTD = " (CONT'D)"
+
+# Characters per line for each printed element; the column comes from INDENTS
+WIDTHS = {
+    HEADER: 60,
+    ACTION: 60,
+    CHARACTER: 38,
+    DIALOGUE: 35,
+    PARENTHETICAL: 26,
+    TRANSITION: 60,
+    CENTERED: 60,
+    LYRIC: 35,
+}
+
+# Kept in the .fountain but never printed
+_UNPRINTED = frozenset((SECTION, SYNOPSIS, NOTE, BONEYARD))
+
+# A page may not end on these inside a dialogue block
+_HOLD_TOGETHER = frozenset((CHARACTER, PARENTHETICAL))
+
+_EMPHASIS_RE = re.compile(r"(\*{1,3}|_)(?=\S)(.+?)(?<=\S)\1")
+_INLINE_NOTE_RE = re.compile(r"\s*\[\[.*?\]\]")
+_SCENE_NUMBER_RE = re.compile(r"\s*#[^#\s]+#$")
+_TITLE_KEY_RE = re.compile(r"([^\s:][^:]*):(.*)")
+
+_BLANK_ROW = (0, "")
+_PAGE_BREAK_BLOCK = (None, None, False, False, None)
+
+# title: {lowercase key: [values]} from the title page, pages: a list of pages,
+# each a list of (column, text) rows, blank rows included, revised: for every
+# page the indices of its rows printed from a marked line (revision asterisks)
+Paginated = namedtuple("Paginated", "title pages revised")
+
+# pages: pages in the body, minutes: running time at one page per minute
+PageEstimate = namedtuple("PageEstimate", "pages minutes")
+
+def _printable(element_type, content):
+    """The element text as printed: emphasis markers, notes and scene numbers removed"""
+    if "[[" in content:
+        content = _INLINE_NOTE_RE.sub("", content)
+    if "*" in content or "_" in content:
+        content = _EMPHASIS_RE.sub(r"\2", content)
+    if element_type == HEADER and content.endswith("#"):
+        content = _SCENE_NUMBER_RE.sub("", content)
+    return content
+
+def _column(element_type, row):
+    if element_type == TRANSITION:
+        return max(PAGE_COLUMNS - len(row), 0)
+    if element_type == CENTERED:
+        return max((PAGE_COLUMNS - len(row)) // 2, 0)
+    return len(fountain_parser.INDENTS[element_type])
+
+def _wrap(text, width):
+    """Greedy word wrap at width; words longer than a line are cut"""
+    if len(text) <= width:
+        return [text]
+    rows = []
+    pos = 0
+    end = len(text)
+    while end - pos > width:
+        cut = text.rfind(" ", pos, pos + width + 1)
+        if cut <= pos:
+            rows.append(text[pos:pos + width])
+            pos += width
+        else:
+            rows.append(text[pos:cut].rstrip())
+            pos = cut + 1
+        while pos < end and text[pos] == " ":
+            pos += 1
+    if pos < end:
+        rows.append(text[pos:])
+    return rows
+
+def _wrap_count(text, width):
+    """len(_wrap(text, width)) without slicing out the rows"""
+    end = len(text)
+    if end <= width:
+        return 1
+    count = 0
+    pos = 0
+    while end - pos > width:
+        cut = text.rfind(" ", pos, pos + width + 1)
+        pos = pos + width if cut <= pos else cut + 1
+        while pos < end and text[pos] == " ":
+            pos += 1
+        count += 1
+    return count + 1 if pos < end else count
+
+def printed_lines(element_type, content):
+    """Number of lines the element takes on the page (0 for elements that are not printed)"""
+    if element_type not in WIDTHS:
+        return 0
+    return _wrap_count(_printable(element_type, content), WIDTHS[element_type])
+
+def _block(paragraph, render, marked):
+    """
+    Returns (kinds, rows, dialogue, keep, marks) for a paragraph of (type,
+    content, line number): the element type of every printed line, the
+    (column, text) rows (None when only counting), whether it is a dialogue
+    block, whether it must be kept with the next block (a scene header) and
+    whether each row comes from a line in marked (None when nothing is marked).
+    """
+    kinds = []
+    rows = [] if render else None
+    marks = [] if render and marked else None
+    for element_type, content, line in paragraph:
+        text = _printable(element_type, content)
+        if render:
+            for row in _wrap(text, WIDTHS[element_type]):
+                kinds.append(element_type)
+                rows.append((_column(element_type, row), row))
+            if marks is not None:
+                marks.extend((line in marked,) * (len(rows) - len(marks)))
+        else:
+            kinds.extend((element_type,) * _wrap_count(text, WIDTHS[element_type]))
+    return kinds, rows, paragraph[0][0] == CHARACTER, paragraph[-1][0] == HEADER, marks
+
+def _blocks(lines, render, marked=None):
+    """
+    Returns (title fields, blocks) for an iterable of raw lines, one block per
+    paragraph; marked is a set of 0-based line numbers to carry a revision mark
+    """
+    title = {}
+    key = None
+    blocks = []
+    paragraph = []
+
+    for number, (element_type, content, _line) in enumerate(fountain_parser.classify_lines(lines)):
+        if element_type == BLANK or element_type == PAGE_BREAK:
+            if paragraph:
+                blocks.append(_block(paragraph, render, marked))
+                paragraph = []
+            if element_type == PAGE_BREAK:
+                blocks.append(_PAGE_BREAK_BLOCK)
+        elif element_type == TITLE:
+            match = _TITLE_KEY_RE.match(content)
+            if match:
+                key = match.group(1).strip().lower()
+                value = match.group(2).strip()
+                title[key] = [value] if value else []
+            elif key is not None:
+                title[key].append(content)
+        elif element_type not in _UNPRINTED:
+            paragraph.append((element_type, content, number))
+
+    if paragraph:
+        blocks.append(_block(paragraph, render, marked))
+    return title, blocks
+
+def _split(kinds, start, free, dialogue):
+    """
+    Where to break a block that does not fit: the index of the first line for
+    the next page, or 0 when the whole block should move to the next page.
+    free is the number of lines left on this page.
+    """
+    size = len(kinds)
+    if dialogue:
+        # Keep a line for (MORE), and never end on a cue or parenthetical
+        stop = min(start + free - 1, size - 1)
+        while stop > start and kinds[stop - 1] in _HOLD_TOGETHER:
+            stop -= 1
+        if stop <= start or (start == 0 and stop < 2):
+            return 0
+        return stop
+    # Action and friends: at least two lines on either side of the break
+    stop = min(start + free, size - 2)
+    return stop if stop - start >= 2 else 0
+
+def _layout(blocks, page_lines):
+    """
+    Returns (pages, lines used on the last page). A page is a list of
+    (block index, first line, stop line) segments.
+    """
+    pages = []
+    page = []
+    used = 0
+    count = len(blocks)
+
+    for i, (kinds, _rows, dialogue, keep, _marks) in enumerate(blocks):
+        if kinds is None:
+            if page:
+                pages.append(page)
+                page, used = [], 0
+            continue
+
+        size = len(kinds)
+        start = 0
+        while True:
+            # A continued dialogue block starts with the cue again
+            extra = 1 if dialogue and start else 0
+            height = size - start + extra
+            space = 1 if page else 0
+            free = page_lines - used - space
+            need = height
+            if keep and i + 1 < count and blocks[i + 1][0]:
+                need += 1 + min(2, len(blocks[i + 1][0]))
+            if need <= free:
+                page.append((i, start, size))
+                used += space + height
+                break
+
+            stop = _split(kinds, start, free - extra, dialogue) if free > extra + 1 else 0
+            if not stop and not page:
+                # Taller than a whole page with no good break: cut where the page ends
+                stop = start + max(free - extra - (1 if dialogue else 0), 1)
+            if stop:
+                page.append((i, start, stop))
+                start = stop
+            pages.append(page)
+            page, used = [], 0
+
+    if page:
+        pages.append(page)
+    return pages, used
+
+def _render(blocks, pages):
+    """Returns (rows of every page, indices of the marked rows of every page)"""
+    more_column = len(fountain_parser.INDENTS[CHARACTER])
+    rendered = []
+    revised = []
+    for page in pages:
+        rows = []
+        page_marks = []
+        for i, start, stop in page:
+            kinds, block_rows, dialogue, _keep, marks = blocks[i]
+            if rows:
+                rows.append(_BLANK_ROW)
+            if dialogue and start:
+                column, cue = block_rows[0]
+                rows.append((column, cue if cue.endswith(CONTD.strip()) else cue + CONTD))
+            if marks is not None:
+                page_marks.extend(len(rows) + k for k, mark in enumerate(marks[start:stop]) if mark)
+            rows.extend(block_rows[start:stop])
+            if dialogue and stop < len(kinds):
+                rows.append((more_column, MORE))
+        rendered.append(rows)
+        revised.append(page_marks)
+    return rendered, revised
+
+def paginate(lines, page_lines=LINES_PER_PAGE, marked=None):
+    """
+    Lays out an iterable of raw lines, returns a Paginated. marked is a set of
+    0-based line numbers whose printed rows get a revision mark.
+    """
+    title, blocks = _blocks(lines, render=True, marked=marked)
+    pages, _used = _layout(blocks, page_lines)
+    return Paginated(title, *_render(blocks, pages))
+
+def count_pages(lines, page_lines=LINES_PER_PAGE):
+    """
+    Returns a PageEstimate for an iterable of raw lines. Same layout as
+    paginate(), but no printed line is built.
+    """
+    _title, blocks = _blocks(lines, render=False)
+    pages, used = _layout(blocks, page_lines)
+    if not pages:
+        return PageEstimate(0, 0.0)
+    return PageEstimate(len(pages), len(pages) - 1 + used / page_lines)
@@ -0,0 +1,539 @@
+"""
+Pure-Python Fountain classifier shared by the parser, the formatter,
+scene sync and export.
+
+Nothing in here imports bpy, so the logic can be used and timed outside Blender.
+"""
+
+import mmap
+import os
+import re
+import stat
+import zlib
+from array import array
+from itertools import chain, islice
+
+HEADER = "HEADER"
+ACTION = "ACTION"
+CHARACTER = "CHARACTER"
+DIALOGUE = "DIALOGUE"
+PARENTHETICAL = "PARENTHETICAL"
+TRANSITION = "TRANSITION"
+CENTERED = "CENTERED"
+LYRIC = "LYRIC"
+SECTION = "SECTION"
+SYNOPSIS = "SYNOPSIS"
+NOTE = "NOTE"
+BONEYARD = "BONEYARD"
+PAGE_BREAK = "PAGE_BREAK"
+TITLE = "TITLE"
+BLANK = "BLANK"
+
+# Visual indentation applied in the Text Editor (standard courier layout)
+INDENTS = {
+    HEADER: "",
+    ACTION: "",
+    CHARACTER: " " * 22,
+    DIALOGUE: " " * 10,
+    PARENTHETICAL: " " * 16,
+    TRANSITION: " " * 42,
+    CENTERED: " " * 20,
+    LYRIC: " " * 10,
+    SECTION: "",
+    SYNOPSIS: "",
+    NOTE: "",
+    BONEYARD: "",
+    PAGE_BREAK: "",
+    TITLE: "",
+    BLANK: "",
+}
+
+# Title page values continued on the next lines must be indented
+TITLE_INDENT = " " * 4
+
+_HEADER_RE = re.compile(r"(?:INT\.?/EXT|INT|EXT|EST|I/E)[. ]", re.IGNORECASE)
+_CENTERED_RE = re.compile(r">\s*(.*?)\s*<$")
+_NOTE_RE = re.compile(r"\[\[(.*)\]\]$")
+_PAGE_BREAK_RE = re.compile(r"={3,}$")
+# A title page is only recognised when the script opens with one of these keys
+_TITLE_START_RE = re.compile(
+    r"(?:title|credit|authors?|source|draft date|date|contact|copyright|notes|revision)\s*:",
+    re.IGNORECASE,
+)
+_TITLE_KEY_RE = re.compile(r"[^\s:][^:]*:")
+
+def _cue(line):
+    """The cue text if line looks like a character cue (upper case name, any extension), else None"""
+    if line.endswith("^"):
+        # Dual dialogue marker
+        line = line[:-1].rstrip()
+    paren = line.find("(")
+    if paren == 0:
+        return None
+    return line if (line[:paren] if paren > 0 else line).isupper() else None
+
+def is_scene_header(line):
+    s = line.strip()
+    return bool(_HEADER_RE.match(s)) or (len(s) > 1 and s[0] == "." and s[1] != ".")
+
+def is_character(line):
+    # Basic heuristic: Uppercase name (extensions may be lower case) and not a scene header
+    s = line.strip()
+    return s.startswith("@") or (_cue(s) is not None and not is_scene_header(s))
+
+def is_parenthetical(line):
+    s = line.strip()
+    return s.startswith("(") and s.endswith(")")
+
+def is_title_start(line):
+    """True if line opens a title page (Title:, Credit:, Author: and the other standard keys)"""
+    return bool(_TITLE_START_RE.match(line.strip()))
+
+def is_transition(line):
+    s = line.strip()
+    # Forced transition or standard "TO:" ending
+    if s.startswith(">"): return not s.endswith("<")
+    return s.isupper() and s.endswith("TO:")
+
+# Handlers for lines whose first character can start a specific element.
+# Each takes (line, prev_blank, in_dialogue) and returns (type, content), or
+# None to fall through to the context rules in classify_lines.
+
+def _forced_action(line, prev_blank, in_dialogue):
+    return ACTION, line[1:]
+
+def _forced_character(line, prev_blank, in_dialogue):
+    return CHARACTER, (_cue(line[1:]) or line[1:].rstrip("^").rstrip())
+
+def _lyric(line, prev_blank, in_dialogue):
+    return LYRIC, line[1:].lstrip()
+
+def _section(line, prev_blank, in_dialogue):
+    # Keeps the leading #s: their count is the section depth
+    return SECTION, line
+
+def _synopsis_or_page_break(line, prev_blank, in_dialogue):
+    if _PAGE_BREAK_RE.match(line):
+        return PAGE_BREAK, ""
+    return SYNOPSIS, line[1:].lstrip()
+
+def _forced_header(line, prev_blank, in_dialogue):
+    # ".." starts an ellipsis, not a forced heading
+    if not in_dialogue and len(line) > 1 and line[1] != ".":
+        return HEADER, line[1:].lstrip()
+    return None
+
+def _centered_or_transition(line, prev_blank, in_dialogue):
+    match = _CENTERED_RE.match(line)
+    if match:
+        return CENTERED, match.group(1)
+    return TRANSITION, line[1:].lstrip()
+
+def _note(line, prev_blank, in_dialogue):
+    match = _NOTE_RE.match(line)
+    if match:
+        return NOTE, match.group(1).strip()
+    if line.startswith("[[") and "]]" not in line:
+        # Opens a note that continues on the next lines
+        return NOTE, line[2:].strip()
+    return None
+
+def _boneyard(line, prev_blank, in_dialogue):
+    if line.startswith("/*"):
+        return BONEYARD, line
+    return None
+
+def _parenthetical(line, prev_blank, in_dialogue):
+    if in_dialogue and line.endswith(")"):
+        return PARENTHETICAL, line
+    return None
+
+def _scene_heading(line, prev_blank, in_dialogue):
+    if prev_blank and _HEADER_RE.match(line):
+        return HEADER, line
+    return None
+
+# O(1) dispatch on the first character of a stripped line
+_DISPATCH = {
+    "!": _forced_action,
+    "@": _forced_character,
+    "~": _lyric,
+    "#": _section,
+    "=": _synopsis_or_page_break,
+    ".": _forced_header,
+    ">": _centered_or_transition,
+    "[": _note,
+    "/": _boneyard,
+    "(": _parenthetical,
+}
+for _c in "IiEe":
+    _DISPATCH[_c] = _scene_heading
+
+# Elements after which the next line is still part of the dialogue block
+_DIALOGUE_TYPES = frozenset((CHARACTER, DIALOGUE, PARENTHETICAL, LYRIC))
+
+_BLANK_ELEMENT = (BLANK, "", "")
+
+def _claimed(content):
+    # A first-character handler would take the line, whatever its context
+    return content[:1] in _DISPATCH and (content[0] not in "IiEe" or bool(_HEADER_RE.match(content)))
+
+def fountain_line(element_type, content, after_blank=True, followed=True):
+    """
+    The Fountain source line that classify_lines reads back as (element_type,
+    content): the inverse of the classifier, adding forcing markup (!, @, ., >)
+    only where the context rules would read the content as something else.
+    after_blank: the line follows an empty line; followed: a non-empty line
+    comes next (a cue needs one). Title, section, note and boneyard lines are
+    their own content.
+    """
+    if element_type == HEADER:
+        plain = after_blank and _HEADER_RE.match(content)
+        return content if plain else "." + content
+    if element_type == CHARACTER:
+        plain = (
+            followed and after_blank and not _claimed(content) and not is_transition(content)
+            and _cue(content) is not None and not is_scene_header(content)
+        )
+        return content if plain else "@" + content
+    if element_type == ACTION:
+        if _claimed(content) or (after_blank and (is_character(content) or is_transition(content))):
+            return "!" + content
+        return content
+    if element_type == TRANSITION:
+        plain = after_blank and is_transition(content) and not _claimed(content)
+        return content if plain else "> " + content
+    if element_type == CENTERED:
+        return f"> {content} <"
+    if element_type == LYRIC:
+        return "~" + content
+    if element_type == SYNOPSIS:
+        return "= " + content
+    if element_type == NOTE:
+        return f"[[{content}]]"
+    if element_type == PAGE_BREAK:
+        return "==="
+    # DIALOGUE, PARENTHETICAL, SECTION, BONEYARD, TITLE
+    return content
+
+def classify_lines(lines, title_page=True):
+    """
+    Tokenizes an iterable of raw lines following the Fountain spec, in a single pass.
+    Yields one (type, content, line) tuple per input line: line is the stripped
+    source (markup kept, as written back by the formatter and export) and content
+    is the element text with markup such as @, ~, >, = or [[ ]] removed.
+    Empty lines yield (BLANK, "", ""), except inside a boneyard or note, so a
+    BLANK always marks a point where the tokenizer state is reset.
+
+    Each line is stripped exactly once; the look-behind (previous line empty,
+    inside dialogue, boneyard or note) is carried forward and the one line of
+    look-ahead a character cue needs is kept from the previous iteration.
+    Pass title_page=False when lines do not start at the top of the script.
+    """
+    iterator = iter(lines)
+    first = next(iterator, None)
+    if first is None:
+        return
+
+    line = first.strip()
+    prev_blank = True
+    in_dialogue = False
+    in_boneyard = False
+    in_note = False
+    in_title = title_page and bool(_TITLE_START_RE.match(line))
+    dispatch = _DISPATCH.get
+
+    # The end of the input behaves like an empty line
+    for raw_next in chain(iterator, ("",)):
+        next_line = raw_next.strip()
+
+        # Boneyard and notes are ignored for context, so they leave the state alone.
+        # They come first so that BLANK is only ever yielded where the state resets.
+        if in_boneyard:
+            if "*/" in line:
+                in_boneyard = False
+            yield BONEYARD, line, line
+
+        elif in_note:
+            end = line.find("]]")
+            if end >= 0:
+                in_note = False
+                yield NOTE, line[:end].strip(), line
+            else:
+                yield NOTE, line, line
+
+        elif not line:
+            prev_blank = True
+            in_dialogue = in_title = False
+            yield _BLANK_ELEMENT
+
+        elif in_title:
+            yield TITLE, line, line
+
+        else:
+            handler = dispatch(line[0])
+            token = handler(line, prev_blank, in_dialogue) if handler else None
+
+            if token is not None:
+                element_type = token[0]
+                if element_type == BONEYARD:
+                    in_boneyard = "*/" not in line[2:]
+                elif element_type == NOTE:
+                    in_note = line.startswith("[[") and "]]" not in line
+                else:
+                    prev_blank = False
+                    if element_type != LYRIC:
+                        in_dialogue = element_type in _DIALOGUE_TYPES
+                yield element_type, token[1], line
+
+            # Context rules for lines no first-character handler claimed
+            elif in_dialogue:
+                prev_blank = False
+                yield DIALOGUE, line, line
+            elif prev_blank and line.isupper() and line.endswith("TO:"):
+                prev_blank = False
+                yield TRANSITION, line, line
+            else:
+                cue = _cue(line) if prev_blank and next_line else None
+                prev_blank = False
+                if cue:
+                    in_dialogue = True
+                    yield CHARACTER, cue, line
+                else:
+                    yield ACTION, line, line
+
+        line = next_line
+
+def parse_elements(raw_content):
+    """
+    Parses raw text into a list of (type, content) tuples.
+    Types: HEADER, ACTION, CHARACTER, DIALOGUE, PARENTHETICAL, TRANSITION,
+    CENTERED, LYRIC, SECTION, SYNOPSIS, NOTE, BONEYARD, PAGE_BREAK, TITLE
+    """
+    return [(t, c) for t, c, _line in classify_lines(raw_content.splitlines()) if t != BLANK]
+
+def indent_line(element_type, line):
+    """The visually indented form of a stripped line classified as element_type"""
+    if element_type == TITLE and not _TITLE_KEY_RE.match(line):
+        return TITLE_INDENT + line
+    return INDENTS[element_type] + line
+
+def format_lines(lines, title_page=True):
+    """Yields the visually indented form of each raw line (markup is kept)"""
+    for element_type, _content, line in classify_lines(lines, title_page):
+        yield indent_line(element_type, line)
+
+def export_lines(lines):
+    """Yields each line with the visual indentation removed, ready for a .fountain file"""
+    # Fountain format is remarkably resilient.
+    # "                      HERO" -> "HERO" (Valid Character)
+    # "          (beat)" -> "(beat)" (Valid Parenthetical)
+    # Only title page values continued on a new line must stay indented.
+    for element_type, _content, line in classify_lines(lines):
+        yield indent_line(element_type, line) if element_type == TITLE else line
+
+def format_chunks(lines, size=4096):
+    """Yields lists of up to size formatted lines, consuming lines lazily"""
+    formatted = format_lines(lines)
+    while True:
+        chunk = list(islice(formatted, size))
+        if not chunk:
+            return
+        yield chunk
+
+def read_lines(filepath, use_mmap=False):
+    """
+    Yields the lines of a UTF-8 file without reading it into memory first.
+    With use_mmap the file is memory-mapped and lines are decoded straight from
+    the OS page cache instead of going through a read buffer.
+    """
+    if not use_mmap:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            yield from f
+        return
+
+    with open(filepath, 'rb') as f:
+        try:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return
+        with source:
+            for line in iter(source.readline, b""):
+                yield line.decode("utf-8")
+
+def write_lines(f, lines):
+    """Streams export_lines(lines) to an open file handle without building the whole file in memory"""
+    f.writelines(line + "\n" for line in export_lines(lines))
+
+def export_chunks(lines, size=4096):
+    """Yields export_lines(lines) as strings of up to size newline-terminated lines"""
+    exported = export_lines(lines)
+    while True:
+        chunk = list(islice(exported, size))
+        if not chunk:
+            return
+        yield "".join([line + "\n" for line in chunk])
+
+def _signed(crc):
+    # IDProperty ints are signed 32 bit
+    return crc - (1 << 32) if crc >= 1 << 31 else crc
+
+def content_hash(chunks, previous=0):
+    """
+    CRC32 of an iterable of strings as one signed 32 bit int, e.g. a whole text
+    block; continues from previous, the content_hash of the strings before them.
+    """
+    crc = previous
+    for chunk in chunks:
+        crc = zlib.crc32(chunk.encode("utf-8"), crc)
+    return _signed(crc)
+
+def stripped_hash(lines):
+    """
+    Hash of lines with their indentation and trailing empty lines removed: the
+    same for a formatted text and the .fountain file saved from or imported into
+    it, since export only strips lines. Trailing empty lines are left out on
+    purpose: a formatted text always ends with the empty line after the last
+    newline, which the file does not have, and they mean nothing in Fountain.
+    So a save that would only add or drop trailing empty lines is skipped, and
+    the watcher does not reload a file for them.
+    """
+    digest = StrippedHash()
+    iterator = iter(lines)
+    while True:
+        chunk = list(islice(iterator, 4096))
+        if not chunk:
+            return digest.digest()
+        digest.update(chunk)
+
+class StrippedHash:
+    """stripped_hash() of lines fed in chunks, e.g. while they are written somewhere else"""
+
+    def __init__(self):
+        self.crc = 0
+        # Newlines since the last non-empty line, dropped if only empty lines follow
+        self.owed = 0
+        self.started = False
+
+    def update(self, lines):
+        joined = "\n".join([line.strip() for line in lines])
+        if self.started:
+            joined = "\n" + joined
+        self.started = True
+        body = joined.rstrip("\n")
+        if body:
+            self.crc = zlib.crc32(("\n" * self.owed + body).encode("utf-8"), self.crc)
+            self.owed = len(joined) - len(body)
+        else:
+            self.owed += len(joined)
+
+    def digest(self):
+        return _signed(self.crc)
+
+def file_lines(content):
+    """The lines of a .fountain file's content, as text.as_string().split("\\n") gave them when saved"""
+    lines = content.split("\n")
+    if len(lines) > 1 and content.endswith("\n"):
+        # Saving ends every line with a newline, the last one included
+        lines.pop()
+    return lines
+
+def _fsync_directory(directory):
+    # The rename is only durable once the directory entry itself is on disk
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on Windows, where the rename is durable already
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_atomic(filepath, chunks):
+    """
+    Writes an iterable of strings to filepath through a temporary file in the
+    same directory that is flushed to disk and then renamed over it, so a
+    failed or interrupted save, or a crash right after it, never leaves a
+    truncated file behind. A symlink is followed, so the file it points to is
+    replaced and the link kept. An existing file keeps its permissions.
+    """
+    directory, name = os.path.split(os.path.realpath(filepath))
+    filepath = os.path.join(directory, name)
+    temp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        # Created like open() would, so the umask applies
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        with open(fd, "w", encoding="utf-8") as f:
+            f.writelines(chunks)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(filepath).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+def line_hashes(lines):
+    """
+    CRC32 of every line as an array('i') of signed 32 bit ints, so they fit in an
+    IDProperty int array. Hashing runs through map/array and comparing two arrays
+    is a memcmp, so the per-line cost stays in C.
+    """
+    unsigned = array("I", map(zlib.crc32, map(str.encode, lines)))
+    signed = array("i")
+    signed.frombytes(unsigned.tobytes())
+    return signed
+
+def line_hash(line):
+    return line_hashes((line,))[0]
+
+def _common_prefix(old, new, limit):
+    # Binary search with slice comparisons, each one a memcmp on array('i')
+    if old[:limit] == new[:limit]:
+        return limit
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if old[lo:mid + 1] == new[lo:mid + 1]:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def _common_suffix(old, new, limit):
+    old_len = len(old)
+    new_len = len(new)
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[old_len - mid:] == new[new_len - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def changed_range(old_hashes, new_hashes):
+    """
+    Compares two per-line hash lists by common prefix and suffix.
+    Returns (start, old_stop, new_stop) so that old[start:old_stop] was replaced
+    by new[start:new_stop], or None if nothing changed.
+    """
+    if old_hashes == new_hashes:
+        return None
+
+    old_len = len(old_hashes)
+    new_len = len(new_hashes)
+    start = _common_prefix(old_hashes, new_hashes, min(old_len, new_len))
+    tail = _common_suffix(old_hashes, new_hashes, min(old_len, new_len) - start)
+    return start, old_len - tail, new_len - tail
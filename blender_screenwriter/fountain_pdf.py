@@ -0,0 +1,134 @@
+"""
+Minimal PDF writer for paginated scripts (see fountain_paginate).
+US Letter, 12pt Courier from the PDF standard fonts, so nothing is embedded
+and no dependency is needed. Pure Python, no bpy.
+"""
+
+import zlib
+from . import fountain_paginate
+
+PAGE_WIDTH = 612    # points, 8.5 in
+PAGE_HEIGHT = 792   # points, 11 in
+FONT_SIZE = 12
+LINE_HEIGHT = 12    # 6 lines per inch
+CHAR_WIDTH = 7.2    # Courier 12pt, 10 characters per inch
+LEFT_MARGIN = 108   # 1.5 in, room for binding
+TOP_MARGIN = 72
+PAGE_NUMBER_Y = PAGE_HEIGHT - 36 - FONT_SIZE
+# Revision asterisks go in the right margin, two characters past the text
+REVISION_MARK = "*"
+REVISION_MARK_X = LEFT_MARGIN + (fountain_paginate.PAGE_COLUMNS + 2) * CHAR_WIDTH
+
+# Title page fields, centered in the upper half, the rest go bottom left
+_TITLE_CENTERED = ("title", "credit", "author", "authors", "source")
+
+def _escape(text):
+    data = text.encode("cp1252", "replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+def _show(x, y, text):
+    return b"1 0 0 1 %.1f %.1f Tm (%s) Tj\n" % (x, y, _escape(text))
+
+def _page_stream(rows, number, revised=(), revision=""):
+    """
+    Content stream for one body page; number is printed from page 2 on. The
+    rows at the indices in revised get a revision mark, and a page with
+    marks is headed with the revision name.
+    """
+    parts = [b"BT\n/F1 %d Tf\n" % FONT_SIZE]
+    y = PAGE_HEIGHT - TOP_MARGIN - FONT_SIZE
+    for column, text in rows:
+        if text:
+            parts.append(_show(LEFT_MARGIN + column * CHAR_WIDTH, y, text))
+        y -= LINE_HEIGHT
+    top = PAGE_HEIGHT - TOP_MARGIN - FONT_SIZE
+    for index in revised:
+        parts.append(_show(REVISION_MARK_X, top - index * LINE_HEIGHT, REVISION_MARK))
+    if revised and revision:
+        parts.append(_show(LEFT_MARGIN, PAGE_NUMBER_Y, revision))
+    if number > 1:
+        label = f"{number}."
+        right = LEFT_MARGIN + fountain_paginate.PAGE_COLUMNS * CHAR_WIDTH
+        parts.append(_show(right - len(label) * CHAR_WIDTH, PAGE_NUMBER_Y, label))
+    parts.append(b"ET\n")
+    return b"".join(parts)
+
+def _title_stream(title):
+    parts = [b"BT\n/F1 %d Tf\n" % FONT_SIZE]
+    center = LEFT_MARGIN + fountain_paginate.PAGE_COLUMNS * CHAR_WIDTH / 2
+    y = PAGE_HEIGHT * 0.6
+    for key in _TITLE_CENTERED:
+        for value in title.get(key, ()):
+            parts.append(_show(center - len(value) * CHAR_WIDTH / 2, y, value))
+            y -= LINE_HEIGHT
+        if key in title:
+            y -= LINE_HEIGHT
+    rest = [value for key, values in title.items() if key not in _TITLE_CENTERED for value in values]
+    y = TOP_MARGIN + LINE_HEIGHT * len(rest)
+    for value in rest:
+        parts.append(_show(LEFT_MARGIN, y, value))
+        y -= LINE_HEIGHT
+    parts.append(b"ET\n")
+    return b"".join(parts)
+
+def pdf_bytes(paginated, compress=True, revision=""):
+    """
+    Returns a complete PDF file for a fountain_paginate.Paginated; revision
+    heads the pages with revision marks, e.g. "Blue Revision - 2026-10-17"
+    """
+    streams = []
+    if paginated.title:
+        streams.append(_title_stream(paginated.title))
+    streams += [
+        _page_stream(rows, number, revised, revision)
+        for number, (rows, revised) in enumerate(zip(paginated.pages, paginated.revised), 1)
+    ]
+
+    # 1 catalog, 2 page tree, 3 font, 4 info, then a page and its contents per page
+    objects = [None] * (4 + 2 * len(streams))
+    kids = []
+    for i, stream in enumerate(streams):
+        page_id, contents_id = 5 + 2 * i, 6 + 2 * i
+        kids.append(b"%d 0 R" % page_id)
+        objects[page_id - 1] = (
+            b"<< /Type /Page /Parent 2 0 R /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R >> >> >>" % contents_id
+        )
+        if compress:
+            data = zlib.compress(stream)
+            objects[contents_id - 1] = b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(data), data)
+        else:
+            objects[contents_id - 1] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d /MediaBox [0 0 %d %d] >>" % (
+        b" ".join(kids), len(kids), PAGE_WIDTH, PAGE_HEIGHT,
+    )
+    objects[2] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"
+    title = " ".join(paginated.title.get("title", ()))
+    objects[3] = b"<< /Title (%s) /Producer (Blender Screenwriter) >>" % _escape(title)
+
+    out = [b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"]
+    offset = len(out[0])
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        chunk = b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        offsets.append(offset)
+        out.append(chunk)
+        offset += len(chunk)
+
+    out.append(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.extend(b"%010d 00000 n \n" % o for o in offsets)
+    out.append(b"trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, offset))
+    return b"".join(out)
+
+def write_pdf(filepath, lines, marked=None, revision=""):
+    """
+    Paginates an iterable of raw lines and writes it to filepath as PDF,
+    returns the page count. Lines whose 0-based number is in marked get a
+    revision asterisk, and their pages are headed with revision.
+    """
+    paginated = fountain_paginate.paginate(lines, marked=marked)
+    with open(filepath, "wb") as f:
+        f.write(pdf_bytes(paginated, revision=revision))
+    return len(paginated.pages)
@@ -0,0 +1,159 @@
+"""
+Opt-in instrumentation: wall time, lines processed and optionally memory
+allocated by wrapped functions, kept in a ring buffer, with an optional
+cProfile of the same calls. Pure Python, no bpy.
+
+Nothing is wrapped until Recorder.instrument() is called, and uninstrument()
+puts the original functions back: while instrumentation is off the hot paths
+run exactly the code they would without this module.
+"""
+
+import cProfile
+import functools
+import json
+import time
+import tracemalloc
+from collections import deque, namedtuple
+
+DEFAULT_CAPACITY = 1000
+
+# started: wall clock (time.time()); allocated: net bytes still allocated after
+# the call, peak: highest bytes allocated during it (0 without tracking);
+# failed: the call raised
+Sample = namedtuple("Sample", "name started seconds lines allocated peak failed")
+
+# Per name over the samples in the buffer, in seconds and bytes
+Summary = namedtuple("Summary", "name calls seconds mean max lines allocated peak")
+
+def count_lines(args, result):
+    """Lines processed by a call: those of its first text block or string argument"""
+    for arg in args[:2]:
+        if isinstance(arg, str):
+            return arg.count("\n") + 1
+        lines = getattr(arg, "lines", None)
+        if lines is not None:
+            return len(lines)
+    return 0
+
+class Recorder:
+    """Wraps functions to record a Sample per call into a ring buffer"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.samples = deque(maxlen=capacity)
+        # Total samples ever recorded, so views can tell the buffer changed
+        self.recorded = 0
+        self.profiler = None
+        self._depth = 0
+        self._patched = []          # (owner, attribute name, original)
+        self._started_tracing = False
+
+    @property
+    def enabled(self):
+        return bool(self._patched)
+
+    def resize(self, capacity):
+        if capacity != self.samples.maxlen:
+            self.samples = deque(self.samples, maxlen=capacity)
+
+    def clear(self):
+        self.samples.clear()
+        self.recorded += 1
+        if self.profiler is not None:
+            self.profiler = cProfile.Profile()
+
+    def set_track_allocations(self, track):
+        """Starts or stops tracemalloc (only stopping it if it was started here)"""
+        if track and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        elif not track and self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def set_profiling(self, profiling):
+        """Collects a cProfile of the outermost wrapped calls while profiling"""
+        if profiling and self.profiler is None:
+            self.profiler = cProfile.Profile()
+        elif not profiling:
+            self.profiler = None
+
+    def call(self, func, name, lines, args, kwargs):
+        outermost = self._depth == 0
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            if outermost:
+                tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        profiler = self.profiler if outermost else None
+        result = None
+        failed = True
+        self._depth += 1
+        started = time.time()
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            seconds = time.perf_counter() - start
+            self._depth -= 1
+            allocated = peak = 0
+            if tracing:
+                # A nested call's peak is measured from its outermost caller's start
+                current, peak = tracemalloc.get_traced_memory()
+                allocated = current - before
+                peak = max(0, peak - before)
+            self.samples.append(Sample(name, started, seconds, lines(args, result), allocated, peak, failed))
+            self.recorded += 1
+
+    def wrap(self, func, name, lines=count_lines):
+        """func recording a Sample named name per call; lines(args, result) counts the lines processed"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.call(func, name, lines, args, kwargs)
+        return wrapper
+
+    def instrument(self, owner, attribute, name, lines=count_lines):
+        """Replaces owner.attribute (a module function or a method) by its wrapped version"""
+        original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+        setattr(owner, attribute, self.wrap(original, name, lines))
+        self._patched.append((owner, attribute, original))
+
+    def uninstrument(self):
+        """Puts back every function replaced by instrument()"""
+        while self._patched:
+            owner, attribute, original = self._patched.pop()
+            setattr(owner, attribute, original)
+
+def summarize(samples):
+    """Summary per name, most total time first"""
+    totals = {}
+    for sample in samples:
+        entry = totals.get(sample.name)
+        if entry is None:
+            totals[sample.name] = [1, sample.seconds, sample.seconds, sample.lines, sample.allocated, sample.peak]
+            continue
+        entry[0] += 1
+        entry[1] += sample.seconds
+        entry[2] = max(entry[2], sample.seconds)
+        entry[3] += sample.lines
+        entry[4] += sample.allocated
+        entry[5] = max(entry[5], sample.peak)
+    summaries = [
+        Summary(name, calls, seconds, seconds / calls, longest, lines, allocated, peak)
+        for name, (calls, seconds, longest, lines, allocated, peak) in totals.items()
+    ]
+    summaries.sort(key=lambda s: -s.seconds)
+    return summaries
+
+def dumps(samples):
+    """The samples and their summary as JSON, one sample per line"""
+    samples = list(samples)
+    lines = ['{"summary": ' + json.dumps([s._asdict() for s in summarize(samples)]) + ',', ' "samples": [']
+    lines.append(",\n".join("  " + json.dumps(s._asdict()) for s in samples))
+    lines.append(" ]}\n")
+    return "\n".join(lines)
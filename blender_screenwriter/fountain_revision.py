@@ -0,0 +1,201 @@
+"""
+Revision snapshots of a script and the structural diff between two drafts:
+which scenes were added, removed, changed or moved, and which lines carry a
+revision mark. Pure Python, no bpy.
+
+A snapshot keeps one hash per element (a non-blank line, with its type) per
+scene, not the text itself. Drafts are compared scene hash first; only scenes
+whose hash differs are diffed element by element.
+"""
+
+import json
+import zlib
+from collections import namedtuple
+from . import fountain_diff, fountain_parser, fountain_scenes
+
+# Standard order of revision page colours
+COLORS = (
+    "White", "Blue", "Pink", "Yellow", "Green", "Goldenrod",
+    "Buff", "Salmon", "Cherry", "Tan",
+)
+
+ADDED = "ADDED"
+REMOVED = "REMOVED"
+CHANGED = "CHANGED"
+MOVED = "MOVED"
+
+# header: stripped scene header ("" for what comes before the first one),
+# line: 0-based line of the header, hash: CRC32 over the element hashes,
+# elements: element hashes in order, lines: 0-based line of each element
+SceneSnapshot = namedtuple("SceneSnapshot", "header line hash elements lines")
+
+# name: revision name (a page colour), created: date string, scenes: SceneSnapshot
+# list (lines are not stored, so they are empty for a loaded snapshot)
+Revision = namedtuple("Revision", "name created scenes")
+
+# status: ADDED, REMOVED, CHANGED or MOVED; header: scene header in the new
+# draft (the old one when REMOVED); line: its line in the new draft (None when
+# REMOVED); old_header: the header it had in the old draft (None when ADDED);
+# lines: number of marked lines in the scene
+SceneChange = namedtuple("SceneChange", "status header line old_header lines")
+
+# scenes: SceneChange list in new draft order, removed scenes where they
+# used to be; marked: sorted 0-based lines of the new draft to mark
+RevisionDiff = namedtuple("RevisionDiff", "scenes marked")
+
+def element_hash(element_type, line):
+    # The stripped line rather than the content, so forcing marks count as edits
+    return zlib.crc32(line.encode("utf-8"), zlib.crc32(element_type.encode("ascii")))
+
+def _scene(header, line, elements, lines):
+    crc = 0
+    for value in elements:
+        crc = zlib.crc32(value.to_bytes(4, "little"), crc)
+    return SceneSnapshot(header, line, crc, elements, lines)
+
+def snapshot(lines):
+    """SceneSnapshot list for an iterable of raw lines, in one classifier pass"""
+    scenes = []
+    header, header_line = "", 0
+    elements, element_lines = [], []
+    blank = fountain_parser.BLANK
+    scene_header = fountain_parser.HEADER
+
+    for i, (element_type, content, line) in enumerate(fountain_parser.classify_lines(lines)):
+        if element_type == blank:
+            continue
+        if element_type == scene_header:
+            if header or elements:
+                scenes.append(_scene(header, header_line, elements, element_lines))
+            header, header_line = content, i
+            elements, element_lines = [], []
+        elements.append(element_hash(element_type, line))
+        element_lines.append(i)
+
+    if header or elements:
+        scenes.append(_scene(header, header_line, elements, element_lines))
+    return scenes
+
+def dumps_revisions(revisions):
+    return json.dumps([
+        {
+            "name": revision.name,
+            "created": revision.created,
+            "scenes": [[scene.header, scene.line, scene.hash, scene.elements] for scene in revision.scenes],
+        }
+        for revision in revisions
+    ])
+
+def loads_revisions(data):
+    """Revision list from dumps_revisions output, [] if unreadable"""
+    try:
+        return [
+            Revision(item["name"], item["created"], [
+                SceneSnapshot(header, line, crc, elements, [])
+                for header, line, crc, elements in item["scenes"]
+            ])
+            for item in json.loads(data)
+        ]
+    except (TypeError, ValueError, KeyError):
+        return []
+
+def next_color(revisions):
+    """Name for the next revision: the colour after the last one, cycling"""
+    if not revisions:
+        return COLORS[0]
+    try:
+        return COLORS[(COLORS.index(revisions[-1].name) + 1) % len(COLORS)]
+    except ValueError:
+        return COLORS[len(revisions) % len(COLORS)]
+
+def _changed_elements(old, new):
+    """Indices of the elements of new to mark against old: inserted and replaced ones, next to deletions"""
+    marked = set()
+    for old_start, old_stop, new_start, new_stop in fountain_diff.hunks(old.elements, new.elements):
+        if new_stop > new_start:
+            marked.update(range(new_start, new_stop))
+        elif new.elements:
+            # Only deleted: mark where the text used to be
+            marked.add(min(new_start, len(new.elements) - 1))
+    return marked
+
+def _pair(old_scenes, new_scenes, old_unmatched, new_unmatched, old_gaps, new_gaps):
+    """
+    Pairs scenes the hash diff left unmatched, as {new index: old index}:
+    same body first (moved), then same header, then in order within a gap
+    (a scene whose header and body both changed still lines up with its old self)
+    """
+    pairs = {}
+    left = set(old_unmatched)
+    for key in (lambda scene: scene.hash, lambda scene: fountain_scenes.scene_name(scene.header)):
+        candidates = {}
+        for i in old_unmatched:
+            if i in left:
+                candidates.setdefault(key(old_scenes[i]), []).append(i)
+        for j in new_unmatched:
+            if j not in pairs:
+                found = candidates.get(key(new_scenes[j]))
+                if found:
+                    pairs[j] = found.pop(0)
+                    left.discard(pairs[j])
+
+    by_gap = {}
+    for i in old_unmatched:
+        if i in left:
+            by_gap.setdefault(old_gaps[i], []).append(i)
+    for j in new_unmatched:
+        if j not in pairs:
+            found = by_gap.get(new_gaps[j])
+            if found:
+                pairs[j] = found.pop(0)
+                left.discard(pairs[j])
+    return pairs, left
+
+def diff(old_scenes, new_scenes):
+    """RevisionDiff from the old draft to the new one, both SceneSnapshot lists"""
+    # Unchanged scenes cost one hash comparison each
+    matches = fountain_diff.patience_matches(
+        [scene.hash for scene in old_scenes], [scene.hash for scene in new_scenes],
+    )
+    # Gap k lies between match k - 1 and match k
+    old_gaps, new_gaps = {}, {}
+    old_unmatched, new_unmatched = [], []
+    i = j = 0
+    for gap, (match_i, match_j) in enumerate(matches + [(len(old_scenes), len(new_scenes))]):
+        for index in range(i, match_i):
+            old_gaps[index] = gap
+            old_unmatched.append(index)
+        for index in range(j, match_j):
+            new_gaps[index] = gap
+            new_unmatched.append(index)
+        i, j = match_i + 1, match_j + 1
+    pairs, removed = _pair(old_scenes, new_scenes, old_unmatched, new_unmatched, old_gaps, new_gaps)
+
+    changes = []
+    marked = []
+    removed = sorted(removed)
+    position = 0
+    for j in new_unmatched:
+        # Removed scenes are listed where they used to be
+        while position < len(removed) and old_gaps[removed[position]] <= new_gaps[j]:
+            old = old_scenes[removed[position]]
+            changes.append(SceneChange(REMOVED, old.header, None, old.header, 0))
+            position += 1
+        new = new_scenes[j]
+        old_index = pairs.get(j)
+        if old_index is None:
+            changes.append(SceneChange(ADDED, new.header, new.line, None, len(new.lines)))
+            marked.extend(new.lines)
+            continue
+        old = old_scenes[old_index]
+        if old.hash == new.hash:
+            changes.append(SceneChange(MOVED, new.header, new.line, old.header, 0))
+            continue
+        elements = _changed_elements(old, new)
+        changes.append(SceneChange(CHANGED, new.header, new.line, old.header, len(elements)))
+        marked.extend(new.lines[k] for k in elements)
+    for index in removed[position:]:
+        old = old_scenes[index]
+        changes.append(SceneChange(REMOVED, old.header, None, old.header, 0))
+
+    return RevisionDiff(changes, sorted(marked))
@@ -0,0 +1,101 @@
+"""
+Scene index for a script: one entry per scene header, used by scene sync to
+find what changed since the last sync without touching unchanged scenes.
+Pure Python, no bpy.
+"""
+
+import json
+import zlib
+from collections import namedtuple
+from . import fountain_parser
+
+# Max length for a Blender ID name is 63 chars
+MAX_NAME = 63
+
+# header: stripped header text, line: 0-based line index, ordinal: 0-based scene
+# number, hash: CRC32 of the scene body (the stripped lines up to the next header)
+SceneEntry = namedtuple("SceneEntry", "header line ordinal hash")
+
+def scene_name(header):
+    return header.strip()[:MAX_NAME]
+
+def scene_names(entries):
+    """Unique scene names in script order (identical headers share one scene)"""
+    return list(dict.fromkeys(scene_name(e.header) for e in entries))
+
+def source_hash(raw_content):
+    """Hash of the whole script, compared first so an unedited script costs one CRC"""
+    return zlib.crc32(raw_content.encode("utf-8"))
+
+def build_index(lines):
+    """Returns a list of SceneEntry for an iterable of raw lines, in one classifier pass"""
+    entries = []
+    header = None
+    line_index = ordinal = body = 0
+    crc32 = zlib.crc32
+
+    for i, (element_type, content, _line) in enumerate(fountain_parser.classify_lines(lines)):
+        if element_type == fountain_parser.HEADER:
+            if header is not None:
+                entries.append(SceneEntry(header, line_index, ordinal, body))
+                ordinal += 1
+            header, line_index, body = content, i, 0
+        elif header is not None and content:
+            # Stripped content, so re-indenting a scene does not count as a change
+            body = crc32(content.encode("utf-8"), crc32(b"\n", body))
+
+    if header is not None:
+        entries.append(SceneEntry(header, line_index, ordinal, body))
+    return entries
+
+def dumps_index(source, entries):
+    return json.dumps({"source": source, "scenes": [list(e) for e in entries]})
+
+def loads_index(data):
+    """Returns (source hash, entries) from dumps_index output, or (None, []) if unreadable"""
+    try:
+        index = json.loads(data)
+        return index["source"], [SceneEntry(*e) for e in index["scenes"]]
+    except (TypeError, ValueError, KeyError):
+        return None, []
+
+def _scene_hashes(entries):
+    # Identical headers share one Blender scene, so fold their bodies into one hash
+    hashes = {}
+    for entry in entries:
+        name = scene_name(entry.header)
+        hashes[name] = zlib.crc32(entry.hash.to_bytes(4, "little"), hashes.get(name, 0))
+    return hashes
+
+def diff_index(old_entries, new_entries):
+    """
+    Compares two indexes by scene name.
+    Returns (created, renamed, orphaned, changed):
+    created: names new in this sync; renamed: (old name, new name) pairs whose
+    body is unchanged; orphaned: names no longer in the script; changed: names
+    present in both whose scene body changed.
+    """
+    old = _scene_hashes(old_entries)
+    new = _scene_hashes(new_entries)
+
+    added = [name for name in new if name not in old]
+    removed = [name for name in old if name not in new]
+    changed = [name for name in new if name in old and old[name] != new[name]]
+
+    # A header edit keeps the body, so match leftovers by body hash
+    removed_by_hash = {}
+    for name in removed:
+        removed_by_hash.setdefault(old[name], []).append(name)
+
+    created = []
+    renamed = []
+    for name in added:
+        candidates = removed_by_hash.get(new[name])
+        if candidates:
+            renamed.append((candidates.pop(0), name))
+        else:
+            created.append(name)
+
+    renamed_from = {old_name for old_name, _ in renamed}
+    orphaned = [name for name in removed if name not in renamed_from]
+    return created, renamed, orphaned, changed
@@ -0,0 +1,181 @@
+"""
+Inverted index over the Fountain texts of a .blend: characters, locations,
+times of day and words, each mapped to the scenes and lines they occur in.
+Every text is indexed on its own, so an edit only re-indexes that text.
+Pure Python, no bpy.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from . import fountain_parser, fountain_stats
+
+_WORD_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+# key:"quoted value", key:value, @"QUOTED NAME", @NAME, "quoted words" or a word
+_TERM_RE = re.compile(r'(?:(\w+):|(@))?(?:"([^"]*)"?|(\S+))')
+
+# Element types whose words are not part of the script
+_UNINDEXED = frozenset((fountain_parser.BLANK, fountain_parser.BONEYARD, fountain_parser.PAGE_BREAK))
+
+# Prefixes of query terms, see parse_query
+QUERY_KEYS = {
+    "character": "characters", "c": "characters", "@": "characters",
+    "location": "locations", "l": "locations",
+    "time": "times", "t": "times",
+}
+
+# line: line index of the scene header
+SceneInfo = namedtuple("SceneInfo", "line header location time_of_day day_night")
+# All terms are upper case (characters, locations, times) or lower case (words)
+Query = namedtuple("Query", "characters locations times words")
+# scene: ordinal of the scene in its text, -1 before the first header;
+# line: first line in the scene matching the query (its header if only scene terms were given)
+Hit = namedtuple("Hit", "text scene header line")
+
+def words(content):
+    """The lower case words of a line, for indexing and queries alike"""
+    return _WORD_RE.findall(content.lower())
+
+def parse_query(string):
+    """
+    Parses a query such as  @MARIA time:NIGHT location:"MARIA'S KITCHEN" letter
+    into a Query: character:/c:/@, location:/l: and time:/t: terms filter scenes,
+    the other words must all occur in the scene. Unknown keys count as words.
+    """
+    terms = {"characters": [], "locations": [], "times": [], "words": []}
+    for match in _TERM_RE.finditer(string):
+        key, at, quoted, value = match.groups()
+        value = quoted if quoted is not None else value
+        field = QUERY_KEYS.get((key or at or "").lower())
+        if field is None:
+            if key:
+                value = f"{key}:{value}"
+            terms["words"].extend(words(value))
+        elif value.strip():
+            terms[field].append(" ".join(value.split()).upper())
+    return Query(**{field: tuple(values) for field, values in terms.items()})
+
+class TextIndex:
+    """
+    Postings of one text: scene infos in order, and for each character (their
+    cues), word and location or time (their scenes) a sorted list of lines or
+    scene ordinals.
+    """
+    __slots__ = ("scenes", "starts", "characters", "locations", "times", "words")
+
+    def __init__(self, lines):
+        self.scenes = []
+        self.starts = array("i")
+        self.characters = {}
+        self.locations = {}
+        self.times = {}
+        self.words = {}
+
+        characters = self.characters
+        postings = self.words
+        for i, (element_type, content, _line) in enumerate(fountain_parser.classify_lines(lines)):
+            if element_type in _UNINDEXED:
+                continue
+            if element_type == fountain_parser.HEADER:
+                self._add_scene(i, content)
+            elif element_type == fountain_parser.CHARACTER:
+                characters.setdefault(fountain_stats.character_name(content).upper(), array("i")).append(i)
+            for word in words(content):
+                lines_of = postings.get(word)
+                if lines_of is None:
+                    postings[word] = array("i", (i,))
+                elif lines_of[-1] != i:
+                    lines_of.append(i)
+
+    def _add_scene(self, line, header):
+        ordinal = len(self.scenes)
+        _int_ext, location, time_of_day = fountain_stats.parse_header(header)
+        day_night = fountain_stats.day_night(time_of_day)
+        self.scenes.append(SceneInfo(line, header, location.upper(), time_of_day, day_night))
+        self.starts.append(line)
+        self.locations.setdefault(location.upper(), []).append(ordinal)
+        for time in {time_of_day, day_night} - {""}:
+            self.times.setdefault(time, []).append(ordinal)
+
+    def scene_of(self, line):
+        """Ordinal of the scene line is in, -1 before the first header"""
+        return bisect_right(self.starts, line) - 1
+
+    def _scenes_of(self, lines):
+        # scene ordinal -> first of lines in it
+        first = {}
+        for line in lines:
+            first.setdefault(self.scene_of(line), line)
+        return first
+
+    def search(self, query):
+        """[(scene ordinal, line)] of the scenes matching every term of query"""
+        # scene ordinal -> line to show; None until a term restricted the scenes
+        matches = None
+        for terms, postings in ((query.characters, self.characters), (query.words, self.words)):
+            for term in terms:
+                found = self._scenes_of(postings.get(term, ()))
+                if matches is None:
+                    matches = found
+                else:
+                    matches = {scene: line for scene, line in matches.items() if scene in found}
+                if not matches:
+                    return []
+
+        scene_filters = [
+            {scene for location, scenes in self.locations.items() if term in location for scene in scenes}
+            for term in query.locations
+        ]
+        scene_filters += [set(self.times.get(term, ())) for term in query.times]
+        if scene_filters:
+            allowed = set.intersection(*scene_filters)
+            if matches is None:
+                matches = {scene: self.scenes[scene].line for scene in allowed}
+            else:
+                matches = {scene: line for scene, line in matches.items() if scene in allowed}
+
+        return sorted((matches or {}).items())
+
+class SearchIndex:
+    """TextIndex per text name, rebuilt only for texts whose content changed"""
+    __slots__ = ("texts",)
+
+    def __init__(self):
+        # text name -> (key, hash of the content, TextIndex)
+        self.texts = {}
+
+    def update(self, name, key, read):
+        """
+        Indexes the text again unless key, a cheap value that changes whenever
+        its content may have, is the one it was indexed with. read() returns the
+        content, only called when key changed; the index is kept if the content
+        did not change after all. Returns True if the text was indexed again.
+        """
+        cached = self.texts.get(name)
+        if cached is not None and cached[0] == key:
+            return False
+        raw_content = read()
+        content_hash = hash(raw_content)
+        if cached is not None and cached[1] == content_hash:
+            self.texts[name] = (key, content_hash, cached[2])
+            return False
+        self.texts[name] = (key, content_hash, TextIndex(raw_content.split("\n")))
+        return True
+
+    def retain(self, names):
+        """Drops the texts not in names (deleted or no longer Fountain)"""
+        for name in set(self.texts) - set(names):
+            del self.texts[name]
+
+    def search(self, query):
+        """Hits for a Query in every indexed text, by text name then line"""
+        hits = []
+        if not any(query):
+            return hits
+        for name in sorted(self.texts):
+            index = self.texts[name][2]
+            for scene, line in index.search(query):
+                header = index.scenes[scene].header if scene >= 0 else ""
+                hits.append(Hit(name, scene, header, line))
+        return hits
@@ -0,0 +1,218 @@
+"""
+Script statistics for scheduling: words per character, scene lengths in
+eighths of a page and INT/EXT, DAY/NIGHT breakdowns. Built on
+fountain_document.ScriptDocument, one pass per scene, and
+incremental: scenes whose source did not change are taken from a cache.
+Pure Python, no bpy.
+"""
+
+import csv
+import math
+import re
+import zlib
+from collections import Counter, namedtuple
+from . import fountain_document, fountain_paginate, fountain_scenes
+from .fountain_parser import HEADER, CHARACTER, DIALOGUE, PARENTHETICAL, LYRIC
+
+# Scene lengths are counted in eighths of a page
+EIGHTHS_PER_PAGE = 8
+
+_INT_EXT_RE = re.compile(r"\.?(INT\.?/EXT|EXT\.?/INT|I/E|INT|EXT|EST)\b\.?\s*", re.IGNORECASE)
+_CUE_EXTENSION_RE = re.compile(r"\s*\([^)]*\)")
+_SCENE_NUMBER_RE = re.compile(r"\s*#[^#\s]+#$")
+
+DAY_TIMES = frozenset(("DAY", "MORNING", "AFTERNOON", "NOON", "DAWN", "SUNRISE"))
+NIGHT_TIMES = frozenset(("NIGHT", "EVENING", "DUSK", "SUNSET", "MIDNIGHT"))
+
+# Counted per scene; ordinal and line are where the scene is now, the rest only
+# depends on the scene's own source. characters: {name: (speeches, words)}
+SceneStats = namedtuple(
+    "SceneStats",
+    "ordinal line header int_ext location time_of_day day_night eighths words dialogue_words characters",
+)
+CharacterStats = namedtuple("CharacterStats", "speeches words scenes")
+
+# source: hash of the script, scenes: SceneStats (the text before the first
+# header is only in the totals), characters: {name: CharacterStats} by words,
+# totals: dict of script wide counts, recomputed: scenes not taken from the cache
+ScriptStats = namedtuple("ScriptStats", "source scenes characters totals recomputed")
+
+def parse_header(header):
+    """Returns (INT/EXT/INT-EXT or "", location, time of day) for a scene header"""
+    header = _SCENE_NUMBER_RE.sub("", header).strip()
+    match = _INT_EXT_RE.match(header)
+    if match:
+        prefix = match.group(1).upper()
+        int_ext = "INT" if prefix == "INT" else "EXT" if prefix in ("EXT", "EST") else "INT/EXT"
+        rest = header[match.end():]
+    else:
+        int_ext, rest = "", header
+    location, dash, time_of_day = rest.rpartition(" - ")
+    if not dash:
+        location, time_of_day = rest, ""
+    return int_ext, location.strip(" .-"), time_of_day.strip().upper()
+
+def day_night(time_of_day):
+    if time_of_day in DAY_TIMES:
+        return "DAY"
+    if time_of_day in NIGHT_TIMES:
+        return "NIGHT"
+    return "OTHER" if time_of_day else ""
+
+def character_name(cue):
+    """The character a cue belongs to, extensions such as (V.O.) or (CONT'D) removed"""
+    return _CUE_EXTENSION_RE.sub("", cue).strip()
+
+def format_eighths(eighths):
+    """12 -> '1 4/8'"""
+    pages, rest = divmod(eighths, EIGHTHS_PER_PAGE)
+    if not rest:
+        return str(pages)
+    return f"{pages} {rest}/8" if pages else f"{rest}/8"
+
+def _scene_stats(document, first, stop):
+    """SceneStats for elements first to stop of document (ordinal and line left at 0)"""
+    types = document.types
+    lines = document.lines
+    type_names = fountain_document.TYPES
+    printed_lines = fountain_paginate.printed_lines
+
+    header = document.content(first) if type_names[types[first]] == HEADER else ""
+    int_ext, location, time_of_day = parse_header(header) if header else ("", "", "")
+
+    words = dialogue_words = height = 0
+    characters = {}
+    speaker = None
+    previous_line = -2
+
+    for i in range(first, stop):
+        element_type = type_names[types[i]]
+        content = document.content(i)
+        printed = printed_lines(element_type, content)
+        if not printed:
+            continue
+        if lines[i] - previous_line > 1:
+            # A new paragraph: the blank line before it, and the end of any speech
+            height += 1
+            speaker = None
+        previous_line = lines[i]
+        height += printed
+
+        count = len(content.split())
+        words += count
+        if element_type == CHARACTER:
+            speaker = character_name(content)
+            speeches, spoken = characters.get(speaker, (0, 0))
+            characters[speaker] = (speeches + 1, spoken)
+        elif speaker is not None and (element_type == DIALOGUE or element_type == LYRIC):
+            speeches, spoken = characters[speaker]
+            characters[speaker] = (speeches, spoken + count)
+            dialogue_words += count
+        elif element_type != PARENTHETICAL:
+            speaker = None
+
+    lines_per_eighth = fountain_paginate.LINES_PER_PAGE / EIGHTHS_PER_PAGE
+    eighths = max(1, math.ceil(height / lines_per_eighth)) if height else 0
+    return SceneStats(
+        0, 0, header, int_ext, location, time_of_day, day_night(time_of_day),
+        eighths, words, dialogue_words, characters,
+    )
+
+def analyze(document, cache=None):
+    """
+    Returns ScriptStats for a fountain_document.ScriptDocument.
+    cache ({scene source hash: SceneStats}) is read for unchanged scenes and
+    left holding the scenes of this document, so pass the same dict back for
+    the next version of the script.
+    """
+    if cache is None:
+        cache = {}
+    source = document.source
+    starts = document.starts
+    count = len(document)
+    headers = document.indices(HEADER)
+    crc32 = zlib.crc32
+
+    prologue = _scene_stats(document, 0, headers[0] if headers else count)
+    scenes = []
+    fresh = {}
+    recomputed = 0
+    for ordinal, (first, stop) in enumerate(zip(headers, headers[1:] + [count])):
+        end = starts[stop] if stop < count else len(source)
+        key = crc32(source[starts[first]:end].encode("utf-8"))
+        scene = cache.get(key) or fresh.get(key)
+        if scene is None:
+            scene = _scene_stats(document, first, stop)
+            recomputed += 1
+        fresh[key] = scene
+        scenes.append(scene._replace(ordinal=ordinal, line=document.lines[first]))
+    cache.clear()
+    cache.update(fresh)
+
+    return ScriptStats(
+        fountain_scenes.source_hash(source), scenes, _characters(prologue, scenes),
+        _totals(prologue, scenes), recomputed,
+    )
+
+def _characters(prologue, scenes):
+    speeches = Counter()
+    words = Counter()
+    appearances = Counter()
+    for scene in [prologue] + scenes:
+        for name, (scene_speeches, scene_words) in scene.characters.items():
+            speeches[name] += scene_speeches
+            words[name] += scene_words
+            appearances[name] += 1
+    ranked = sorted(speeches, key=lambda name: (-words[name], -speeches[name], name))
+    return {name: CharacterStats(speeches[name], words[name], appearances[name]) for name in ranked}
+
+def _totals(prologue, scenes):
+    return {
+        "scenes": len(scenes),
+        "eighths": prologue.eighths + sum(scene.eighths for scene in scenes),
+        "words": prologue.words + sum(scene.words for scene in scenes),
+        "dialogue_words": prologue.dialogue_words + sum(scene.dialogue_words for scene in scenes),
+        "int_ext": dict(Counter(scene.int_ext or "OTHER" for scene in scenes)),
+        "day_night": dict(Counter(scene.day_night or "OTHER" for scene in scenes)),
+        "time_of_day": dict(Counter(scene.time_of_day for scene in scenes if scene.time_of_day)),
+    }
+
+def stats_dict(stats):
+    """ScriptStats as plain JSON-ready data"""
+    return {
+        "totals": dict(stats.totals, pages=format_eighths(stats.totals["eighths"])),
+        "characters": [
+            {"name": name, "speeches": c.speeches, "words": c.words, "scenes": c.scenes}
+            for name, c in stats.characters.items()
+        ],
+        "scenes": [
+            {
+                "number": scene.ordinal + 1,
+                "line": scene.line + 1,
+                "header": scene.header,
+                "int_ext": scene.int_ext,
+                "location": scene.location,
+                "time_of_day": scene.time_of_day,
+                "day_night": scene.day_night,
+                "eighths": scene.eighths,
+                "length": format_eighths(scene.eighths),
+                "words": scene.words,
+                "dialogue_words": scene.dialogue_words,
+                "characters": {name: {"speeches": s, "words": w} for name, (s, w) in scene.characters.items()},
+            }
+            for scene in stats.scenes
+        ],
+    }
+
+CSV_FIELDS = (
+    "number", "line", "header", "int_ext", "location", "time_of_day", "day_night",
+    "eighths", "length", "words", "dialogue_words", "characters",
+)
+
+def write_csv(f, stats):
+    """One row per scene, for a stripboard or scheduling spreadsheet"""
+    writer = csv.writer(f)
+    writer.writerow(CSV_FIELDS)
+    for scene in stats_dict(stats)["scenes"]:
+        scene["characters"] = ", ".join(scene["characters"])
+        writer.writerow([scene[field] for field in CSV_FIELDS])
@@ -0,0 +1,73 @@
+"""
+Estimated screen time per scene and the layout of a master timeline with one
+strip per scene header, back to back. Pure Python, no bpy.
+"""
+
+import json
+from collections import namedtuple
+from . import fountain_scenes, fountain_stats
+
+# One page is one minute of screen time
+SECONDS_PER_EIGHTH = 60 / fountain_stats.EIGHTHS_PER_PAGE
+# No strip shorter than this, whatever the estimate
+MIN_SECONDS = 1.0
+
+# key: (scene name, occurrence of that name so far), start/length: frames
+Slot = namedtuple("Slot", "key start length")
+
+def scene_seconds(scene, method='EIGHTHS', words_per_minute=150):
+    """
+    Estimated screen time of a fountain_stats.SceneStats:
+    'EIGHTHS' counts a page a minute, 'WORDS' reads every word at words_per_minute.
+    """
+    if method == 'WORDS':
+        seconds = scene.words * 60.0 / words_per_minute
+    else:
+        seconds = scene.eighths * SECONDS_PER_EIGHTH
+    return max(seconds, MIN_SECONDS)
+
+def layout(scenes, fps, method='EIGHTHS', words_per_minute=150, frame_start=1):
+    """Returns a Slot per scene of a ScriptStats, in script order, starting at frame_start"""
+    slots = []
+    occurrences = {}
+    frame = frame_start
+    for scene in scenes:
+        name = fountain_scenes.scene_name(scene.header)
+        occurrence = occurrences.get(name, 0)
+        occurrences[name] = occurrence + 1
+        length = max(1, round(scene_seconds(scene, method, words_per_minute) * fps))
+        slots.append(Slot((name, occurrence), frame, length))
+        frame += length
+    return slots
+
+def diff_layout(old_slots, new_slots):
+    """
+    Compares two layouts by key. Returns (created, changed, moved, removed):
+    created/changed/moved are new Slots (changed: its length differs, moved: only
+    its start), removed are old Slots. Slots in neither list are untouched.
+    """
+    old = {slot.key: slot for slot in old_slots}
+    new_keys = {slot.key for slot in new_slots}
+    created = []
+    changed = []
+    moved = []
+    for slot in new_slots:
+        previous = old.get(slot.key)
+        if previous is None:
+            created.append(slot)
+        elif previous.length != slot.length:
+            changed.append(slot)
+        elif previous.start != slot.start:
+            moved.append(slot)
+    removed = [slot for slot in old_slots if slot.key not in new_keys]
+    return created, changed, moved, removed
+
+def dumps_layout(slots):
+    return json.dumps([[slot.key[0], slot.key[1], slot.start, slot.length] for slot in slots])
+
+def loads_layout(data):
+    """Returns the Slots stored by dumps_layout, or [] if unreadable"""
+    try:
+        return [Slot((name, occurrence), start, length) for name, occurrence, start, length in json.loads(data)]
+    except (TypeError, ValueError):
+        return []
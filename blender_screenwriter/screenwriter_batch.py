@@ -0,0 +1,196 @@
+import argparse
+import os
+import sys
+import time
+from array import array
+import bpy
+from . import fountain_batch
+from . import fountain_io
+from . import fountain_parser
+
+def create_text(result, text=None):
+    """Creates a text block from a formatted FileResult, or refills text with it (main thread only)"""
+    if text is None:
+        text = bpy.data.texts.new(name=os.path.basename(result.filepath))
+    else:
+        text.clear()
+    text.write(result.content)
+    text.filepath = result.filepath
+    hashes = array("i")
+    hashes.frombytes(result.hashes)
+    text[fountain_io.LINE_HASHES_KEY] = hashes.tolist()
+    source = fountain_parser.content_hash((result.content,))
+    text[fountain_io.FORMAT_HASH_KEY] = source
+    if fountain_io.LINE_TYPES_KEY in text:
+        del text[fountain_io.LINE_TYPES_KEY]
+    fountain_io.disable_syntax_highlight(text)
+    text["screenwriter_init"] = True
+    # In sync with the file, as after SCREENWRITER_OT_import_fountain
+    fountain_io.set_save_stamp(text, result.filepath, result.digest, st=result.stat, source=source)
+    if fountain_io.EXTERNAL_CHANGE_KEY in text:
+        del text[fountain_io.EXTERNAL_CHANGE_KEY]
+    return text
+
+def import_files(paths, use_mmap=False, max_workers=0):
+    """Formats paths in parallel and creates their text blocks. Returns (results, seconds)."""
+    start = time.perf_counter()
+    results = []
+    for result in fountain_batch.run(fountain_batch.format_file, [(p, use_mmap) for p in paths], max_workers):
+        if not result.error:
+            create_text(result)
+        results.append(result)
+    return results, time.perf_counter() - start
+
+def export_filenames(names):
+    """
+    .fountain file names for text names, each used once: texts "A" and
+    "A.fountain" would both be saved as A.fountain, so the later ones get a
+    Blender-style number (A.001.fountain). Compared case-insensitively, as
+    some file systems do.
+    """
+    used = set()
+    filenames = []
+    for name in names:
+        name = os.path.basename(name)
+        if name.lower().endswith(".fountain"):
+            stem, filename = name[:-len(".fountain")], name
+        else:
+            stem, filename = name, name + ".fountain"
+        number = 0
+        while filename.lower() in used:
+            number += 1
+            filename = f"{stem}.{number:03d}.fountain"
+        used.add(filename.lower())
+        filenames.append(filename)
+    return filenames
+
+def export_texts(texts, directory, max_workers=0):
+    """Writes texts to directory as .fountain files in parallel. Returns (results, seconds)."""
+    start = time.perf_counter()
+    jobs = []
+    for text, filename in zip(texts, export_filenames([t.name for t in texts])):
+        # as_string() must run here, workers cannot touch bpy data
+        jobs.append((os.path.join(directory, filename), text.as_string()))
+    results = list(fountain_batch.run(fountain_batch.export_file, jobs, max_workers))
+    return results, time.perf_counter() - start
+
+def print_report(results, elapsed):
+    for line in fountain_batch.report_lines(results, elapsed):
+        print(line)
+
+class SCREENWRITER_OT_batch_import_fountain(bpy.types.Operator):
+    """Import every Fountain file in a directory, formatting them in parallel"""
+    bl_idname = "screenwriter.batch_import_fountain"
+    bl_label = "Batch Import Fountain"
+
+    directory: bpy.props.StringProperty(subtype='DIR_PATH')
+    pattern: bpy.props.StringProperty(
+        name="Pattern",
+        description="Files to import from the directory",
+        default="*.fountain",
+    )
+    use_mmap: bpy.props.BoolProperty(
+        name="Memory-Map Files",
+        description="Classify each file straight from a memory map",
+        default=False,
+    )
+    max_workers: bpy.props.IntProperty(
+        name="Workers",
+        description="Processes to format with (0 for one per CPU)",
+        default=0,
+        min=0,
+    )
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        paths = fountain_batch.collect_paths(self.directory, self.pattern)
+        if not paths:
+            self.report({'WARNING'}, f"No files matching {self.pattern} in {self.directory}")
+            return {'CANCELLED'}
+
+        results, elapsed = import_files(paths, self.use_mmap, self.max_workers)
+        print_report(results, elapsed)
+
+        failed = sum(1 for r in results if r.error)
+        summary = fountain_batch.report_lines(results, elapsed)[-1]
+        self.report({'WARNING'} if failed else {'INFO'}, f"Imported {summary}, {failed} failed")
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_batch_export_fountain(bpy.types.Operator):
+    """Export every Fountain text block to a directory in parallel"""
+    bl_idname = "screenwriter.batch_export_fountain"
+    bl_label = "Batch Export Fountain"
+
+    directory: bpy.props.StringProperty(subtype='DIR_PATH')
+    max_workers: bpy.props.IntProperty(
+        name="Workers",
+        description="Processes to export with (0 for one per CPU)",
+        default=0,
+        min=0,
+    )
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        texts = [t for t in bpy.data.texts if fountain_io.is_fountain_text(t)]
+        if not texts:
+            self.report({'WARNING'}, "No Fountain text blocks to export.")
+            return {'CANCELLED'}
+
+        results, elapsed = export_texts(texts, self.directory, self.max_workers)
+        print_report(results, elapsed)
+
+        failed = sum(1 for r in results if r.error)
+        summary = fountain_batch.report_lines(results, elapsed)[-1]
+        self.report({'WARNING'} if failed else {'INFO'}, f"Exported {summary}, {failed} failed")
+        return {'FINISHED'}
+
+def main(argv=None):
+    """Headless entry point, see screenwriter_headless.py"""
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(
+        prog="blender --background [file.blend] --python screenwriter_headless.py --",
+        description="Batch import/export of .fountain files",
+    )
+    parser.add_argument("--import", dest="source", help="directory or glob of .fountain files to import")
+    parser.add_argument("--export", dest="directory", help="directory to export every Fountain text block to")
+    parser.add_argument("--save", help=".blend file to save after importing")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--mmap", action="store_true", help="memory-map files while importing")
+    args = parser.parse_args(argv)
+
+    if not args.source and not args.directory:
+        parser.error("nothing to do: pass --import and/or --export")
+
+    if args.source:
+        paths = fountain_batch.collect_paths(args.source)
+        results, elapsed = import_files(paths, args.mmap, args.workers)
+        print_report(results, elapsed)
+        if args.save:
+            bpy.ops.wm.save_as_mainfile(filepath=os.path.abspath(args.save))
+
+    if args.directory:
+        os.makedirs(args.directory, exist_ok=True)
+        texts = [t for t in bpy.data.texts if fountain_io.is_fountain_text(t)]
+        results, elapsed = export_texts(texts, args.directory, args.workers)
+        print_report(results, elapsed)
+
+classes = [
+    SCREENWRITER_OT_batch_import_fountain,
+    SCREENWRITER_OT_batch_export_fountain,
+]
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in classes:
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,167 @@
+import bpy
+from . import fountain_breakdown, fountain_scenes, screenwriter_scenes
+
+# Script hash and {scene name: breakdown hash} from the last breakdown (JSON, see fountain_breakdown.dumps_index)
+BREAKDOWN_KEY = "screenwriter_breakdown"
+# On the breakdown collection of a scene: the name of the scene it belongs to
+BREAKDOWN_SCENE_KEY = "screenwriter_breakdown_scene"
+# On the breakdown collection of a scene: the name of the text it was filled from
+BREAKDOWN_TEXT_KEY = "screenwriter_breakdown_text"
+# On asset collections created by the add-on: the kind of asset
+ASSET_KIND_KEY = "screenwriter_asset"
+
+# Placeholder empty of a new asset collection, by kind
+EMPTY_DISPLAY = {
+    fountain_breakdown.CHARACTERS: 'SINGLE_ARROW',
+    fountain_breakdown.LOCATIONS: 'CIRCLE',
+    fountain_breakdown.PROPS: 'CUBE',
+}
+
+def _breakdown_collection(scene):
+    """The collection holding the breakdown of scene, or None"""
+    for child in scene.collection.children:
+        if BREAKDOWN_SCENE_KEY in child:
+            return child
+    return None
+
+def _owned(scene, text):
+    return scene.get(screenwriter_scenes.TEXT_KEY) == text.name
+
+def _filled_from(scene, text):
+    """The breakdown collection of scene if it was filled from text, else None"""
+    container = _breakdown_collection(scene)
+    if container is not None and container.get(BREAKDOWN_TEXT_KEY) == text.name:
+        return container
+    return None
+
+def _filled(scenes, names, text):
+    """True if every scene named in names exists and, if it belongs to text, was filled from it"""
+    for name in names:
+        scene = scenes.get(name)
+        if scene is None or (_owned(scene, text) and _filled_from(scene, text) is None):
+            return False
+    return True
+
+def _create_assets(names):
+    """
+    Creates the shared collection, with a placeholder empty, of every
+    (kind, asset name) in names not in bpy.data yet, in one pass. Collections
+    that exist (linked from an asset library, or made by hand) are reused as
+    they are. Returns ({asset name: collection}, number created).
+    """
+    collections = bpy.data.collections
+    existing = {collection.name: collection for collection in collections}
+    created = 0
+    for kind, name in names:
+        if name in existing:
+            continue
+        collection = collections.new(name)
+        collection[ASSET_KIND_KEY] = kind
+        empty = bpy.data.objects.new(name, None)
+        empty.empty_display_type = EMPTY_DISPLAY[kind]
+        collection.objects.link(empty)
+        existing[name] = collection
+        created += 1
+    return existing, created
+
+def _apply(text, scene, container, breakdown, collections):
+    """Links exactly the asset collections of breakdown into container"""
+    if container is None:
+        container = bpy.data.collections.new("BD " + scene.name)
+        scene.collection.children.link(container)
+    container[BREAKDOWN_SCENE_KEY] = scene.name
+    container[BREAKDOWN_TEXT_KEY] = text.name
+
+    wanted = {name: collections[name] for _kind, name in fountain_breakdown.assets(breakdown)}
+    for child in list(container.children):
+        if child.name not in wanted:
+            container.children.unlink(child)
+    linked = {child.name for child in container.children}
+    for name, collection in wanted.items():
+        if name not in linked:
+            container.children.link(collection)
+
+    scene["screenwriter_int_ext"] = breakdown.int_ext
+    scene["screenwriter_location"] = breakdown.location
+    scene["screenwriter_time_of_day"] = breakdown.time_of_day
+    scene["screenwriter_day_night"] = breakdown.day_night
+    scene["screenwriter_notes"] = "\n".join(breakdown.notes)
+
+def breakdown_scenes(text):
+    """
+    Fills the synced scenes that belong to text (see screenwriter_scenes.sync_scenes)
+    with its breakdown: each scene gets a collection linking the shared
+    collections of its location, characters and props, and properties for its
+    time of day and notes. Only scenes whose breakdown changed since the last
+    run (or that lost their breakdown collection) are touched, and every missing
+    asset is created in one batch before any scene is. Returns (scenes updated, assets created, scenes unchanged).
+    """
+    raw_content = text.as_string()
+    source = fountain_scenes.source_hash(raw_content)
+    old_source, old_hashes = fountain_breakdown.loads_index(text.get(BREAKDOWN_KEY, ""))
+    scenes = bpy.data.scenes
+
+    if source == old_source and _filled(scenes, old_hashes, text):
+        # Script unchanged since the last breakdown: no need to parse it again
+        return 0, 0, len(old_hashes)
+
+    breakdowns = fountain_breakdown.breakdown(raw_content.split("\n"))
+
+    hashes = {}
+    pending = []
+    unchanged = 0
+    for breakdown in breakdowns:
+        # Kept for scenes not synced yet too, so syncing them later is noticed
+        hashes[breakdown.name] = fountain_breakdown.breakdown_hash(breakdown)
+        scene = scenes.get(breakdown.name)
+        if scene is None or not _owned(scene, text):
+            # Not synced (or deleted by hand), or filled by the text it belongs to
+            continue
+        if _filled_from(scene, text) is not None and old_hashes.get(breakdown.name) == hashes[breakdown.name]:
+            unchanged += 1
+            continue
+        pending.append((scene, _breakdown_collection(scene), breakdown))
+
+    created = 0
+    if pending:
+        names = dict.fromkeys(
+            asset for _scene, _container, breakdown in pending for asset in fountain_breakdown.assets(breakdown)
+        )
+        collections, created = _create_assets(names)
+        for scene, container, breakdown in pending:
+            _apply(text, scene, container, breakdown, collections)
+
+    text[BREAKDOWN_KEY] = fountain_breakdown.dumps_index(source, hashes)
+    return len(pending), created, unchanged
+
+class SCREENWRITER_OT_breakdown_scenes(bpy.types.Operator):
+    """Sync scenes, then give each one placeholder collections for its location, characters and props"""
+    bl_idname = "screenwriter.breakdown_scenes"
+    bl_label = "Breakdown to Scenes"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        text = getattr(context, "edit_text", None)
+        if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+             text = context.space_data.text
+
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        if screenwriter_scenes.sync_scenes(text) is None:
+            self.report({'WARNING'}, "No scene headers found.")
+            return {'CANCELLED'}
+
+        updated, created, unchanged = breakdown_scenes(text)
+        self.report(
+            {'INFO'},
+            f"Breakdown: updated {updated} scenes ({unchanged} unchanged), created {created} assets.",
+        )
+        return {'FINISHED'}
+
+def register():
+    bpy.utils.register_class(SCREENWRITER_OT_breakdown_scenes)
+
+def unregister():
+    bpy.utils.unregister_class(SCREENWRITER_OT_breakdown_scenes)
@@ -0,0 +1,29 @@
+"""
+Headless batch jobs, for example:
+
+    blender --background --python screenwriter_headless.py -- sync episodes/ --save season.blend --json
+    blender --background --python screenwriter_headless.py -- --import episodes/ --save season.blend
+    blender --background season.blend --python screenwriter_headless.py -- --export out/
+
+Arguments starting with a command (see fountain_cli.COMMANDS) run the command
+line interface, with Blender's bpy available for sync; the exit status is
+Blender's. Otherwise they are the batch import/export options of
+screenwriter_batch.main.
+
+Nothing runs at import time, so worker processes that re-import this file stay idle.
+"""
+
+import importlib
+import os
+import sys
+
+if __name__ == "__main__":
+    # Run as a script: import the add-on package from the directory this file is in
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.dirname(package_dir))
+    package = importlib.import_module(os.path.basename(package_dir))
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    cli = importlib.import_module(package.__name__ + ".fountain_cli")
+    if argv and argv[0] in cli.COMMANDS:
+        sys.exit(cli.main(argv, prog="blender --background [file.blend] --python screenwriter_headless.py --"))
+    importlib.import_module(package.__name__ + ".screenwriter_batch").main(argv)
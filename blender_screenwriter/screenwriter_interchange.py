@@ -0,0 +1,159 @@
+import os
+import time
+from xml.etree.ElementTree import ParseError
+import bpy
+from bpy_extras.io_utils import ImportHelper, ExportHelper
+from . import fountain_fdx, fountain_io, fountain_json, fountain_parser
+
+def import_script(context, filepath, lines):
+    """
+    Creates a Fountain text block named after filepath and streams an iterable
+    of Fountain lines into it, formatted. The text is removed again if reading
+    fails part way. Returns the text.
+    """
+    name = os.path.splitext(os.path.basename(filepath))[0] + ".fountain"
+    text = bpy.data.texts.new(name=name)
+    try:
+        fountain_io.write_formatted(text, lines)
+    except BaseException:
+        bpy.data.texts.remove(text)
+        raise
+    fountain_io.disable_syntax_highlight(text)
+    text["screenwriter_init"] = True
+
+    if hasattr(context, "space_data") and context.space_data.type == 'TEXT_EDITOR':
+         context.space_data.text = text
+    return text
+
+def export_script(text, filepath, chunks):
+    """Writes chunks(lines of text) to filepath atomically, returns the number of lines"""
+    lines = text.as_string().split("\n")
+    fountain_parser.write_atomic(filepath, chunks(lines))
+    return len(lines)
+
+class SCREENWRITER_OT_import_fdx(bpy.types.Operator, ImportHelper):
+    """Import a Final Draft (.fdx) script as a Fountain text"""
+    bl_idname = "screenwriter.import_fdx"
+    bl_label = "Import Final Draft"
+    filename_ext = ".fdx"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.fdx",
+        options={'HIDDEN'},
+        maxlen=255,
+    )
+
+    def execute(self, context):
+        start = time.perf_counter()
+        try:
+            text = import_script(context, self.filepath, fountain_fdx.read_fdx(self.filepath))
+        except (OSError, ParseError) as e:
+            self.report({'ERROR'}, f"Failed to import Final Draft file: {str(e)}")
+            return {'CANCELLED'}
+
+        seconds = time.perf_counter() - start
+        self.report({'INFO'}, f"Imported {len(text.lines)} lines from {self.filepath} in {seconds * 1000:.0f} ms")
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_export_fdx(bpy.types.Operator, ExportHelper):
+    """Export current text as a Final Draft (.fdx) script"""
+    bl_idname = "screenwriter.export_fdx"
+    bl_label = "Export Final Draft"
+    filename_ext = ".fdx"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.fdx",
+        options={'HIDDEN'},
+        maxlen=255,
+    )
+
+    def execute(self, context):
+        text = getattr(context, "edit_text", None)
+        if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+             text = context.space_data.text
+
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        start = time.perf_counter()
+        try:
+            lines = export_script(text, self.filepath, fountain_fdx.fdx_chunks)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to export Final Draft file: {str(e)}")
+            return {'CANCELLED'}
+
+        seconds = time.perf_counter() - start
+        self.report({'INFO'}, f"Exported {lines} lines to {self.filepath} in {seconds * 1000:.0f} ms")
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_import_json(bpy.types.Operator, ImportHelper):
+    """Import a JSON element dump as a Fountain text"""
+    bl_idname = "screenwriter.import_json"
+    bl_label = "Import Script Elements"
+    filename_ext = ".json"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.json",
+        options={'HIDDEN'},
+        maxlen=255,
+    )
+
+    def execute(self, context):
+        start = time.perf_counter()
+        try:
+            text = import_script(context, self.filepath, fountain_json.read_json(self.filepath))
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Failed to import script elements: {str(e)}")
+            return {'CANCELLED'}
+
+        seconds = time.perf_counter() - start
+        self.report({'INFO'}, f"Imported {len(text.lines)} lines from {self.filepath} in {seconds * 1000:.0f} ms")
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_export_json(bpy.types.Operator, ExportHelper):
+    """Export every element of the current text as JSON (type, text, Fountain source, line, scene)"""
+    bl_idname = "screenwriter.export_json"
+    bl_label = "Export Script Elements"
+    filename_ext = ".json"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.json",
+        options={'HIDDEN'},
+        maxlen=255,
+    )
+
+    def execute(self, context):
+        text = getattr(context, "edit_text", None)
+        if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+             text = context.space_data.text
+
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        start = time.perf_counter()
+        try:
+            lines = export_script(text, self.filepath, fountain_json.json_chunks)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to export script elements: {str(e)}")
+            return {'CANCELLED'}
+
+        seconds = time.perf_counter() - start
+        self.report({'INFO'}, f"Exported {lines} lines to {self.filepath} in {seconds * 1000:.0f} ms")
+        return {'FINISHED'}
+
+classes = [
+    SCREENWRITER_OT_import_fdx,
+    SCREENWRITER_OT_export_fdx,
+    SCREENWRITER_OT_import_json,
+    SCREENWRITER_OT_export_json,
+]
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
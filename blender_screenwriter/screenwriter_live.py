@@ -0,0 +1,261 @@
+import time
+import bpy
+from . import fountain_io, fountain_lines, fountain_parser
+from . import screenwriter_ops, screenwriter_prefs
+
+# Seconds between checks of the active text for edits
+POLL_INTERVAL = 0.1
+# Seconds until the next tick while a paragraph is only partly formatted
+RESUME_INTERVAL = 0.01
+# Lines of the watched text compared with its LineTypes cache per idle tick
+CHECK_LINES = 512
+
+_state = {
+    "text": None,       # name of the text being watched
+    "signature": None,  # (line count, current line index, current line body)
+    "edited_line": -1,  # line index of the last edit waiting to be formatted
+    "edited_at": 0.0,
+    "job": None,        # paragraph formatting generator in progress
+    "window": None,     # (start, stop) of the lines the edits waiting to be formatted classified again
+    "seen": {},         # text name -> signature, of every Fountain text shown
+    "checked": 0,       # next line of the watched text to compare with its cache
+    "undo_steps": 0,    # undo/redo steps so far, of any text: part of edit_signature()
+}
+# text name -> edits noticed so far, part of edit_signature()
+_edits = {}
+
+def _signature(text):
+    return len(text.lines), text.current_line_index, text.current_line.body
+
+def find_active_text():
+    """
+    Returns (area, text) for the Text Editor the user works in, or (None,
+    None). Only Fountain texts count: a Python script is never live formatted.
+    The editor of the context comes first when there is one; else the one
+    whose text changed since the last call, else the one watched so far,
+    else the first found.
+    """
+    wm = bpy.context.window_manager
+    if not wm:
+        return None, None
+    editors = []
+    area = getattr(bpy.context, "area", None)
+    if area is not None and area.type == 'TEXT_EDITOR':
+        editors.append(area)
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type == 'TEXT_EDITOR' and area not in editors:
+                editors.append(area)
+    editors = [
+        (area, area.spaces.active.text) for area in editors
+        if area.spaces.active.text and fountain_io.is_fountain_text(area.spaces.active.text)
+    ]
+
+    previous = _state["seen"]
+    seen = _state["seen"] = {text.name: _signature(text) for _area, text in editors}
+    for area, text in editors:
+        if previous.get(text.name, seen[text.name]) != seen[text.name]:
+            return area, text
+    for area, text in editors:
+        if text.name == _state["text"]:
+            return area, text
+    return editors[0] if editors else (None, None)
+
+def redraw_text_editors():
+    """Tags every Text Editor for redraw, e.g. after sidebar values were updated from a timer"""
+    wm = bpy.context.window_manager
+    if not wm:
+        return
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type == 'TEXT_EDITOR':
+                area.tag_redraw()
+
+def note_edit(text):
+    """Counts an edit of text that its line count and cursor line may not show"""
+    _edits[text.name] = _edits.get(text.name, 0) + 1
+
+def edit_signature(text):
+    """
+    Cheap stand-in for the content of text, for caches checked from draw():
+    typing changes the line count or the cursor line, and the add-on's own
+    rewrites (format, reload) change the stored format hash. Edits elsewhere
+    (Replace All, a paste away from the cursor) are counted by note_edit()
+    once the live formatter finds them, undo and redo by their handlers.
+    Never reads the whole text, so a redraw costs the same however long the
+    script is.
+    """
+    line = text.current_line
+    return (
+        len(text.lines), text.current_line_index, line.body if line else "",
+        text.get(fountain_io.FORMAT_HASH_KEY), _edits.get(text.name, 0), _state["undo_steps"],
+    )
+
+def _changed_line(text):
+    """
+    Compares the next CHECK_LINES lines of text with its LineTypes cache,
+    round robin. Returns the first one that differs, or -1: an edit away from
+    the cursor that the signature did not show.
+    """
+    cache = screenwriter_ops.cached_line_types(text)
+    lines = text.lines
+    if cache is None or len(cache) != len(lines):
+        return -1
+    start = _state["checked"] if _state["checked"] < len(lines) else 0
+    stop = min(len(lines), start + CHECK_LINES)
+    hashes = cache.hashes
+    line_hash = fountain_parser.line_hash
+    for i in range(start, stop):
+        if hashes[i] != line_hash(lines[i].body):
+            _state["checked"] = i
+            return i
+    _state["checked"] = stop
+    return -1
+
+def _indent_width(body):
+    return len(body) - len(body.lstrip())
+
+def format_paragraph(text, line_index, window=None):
+    """
+    Generator that re-formats the paragraph around line_index, plus the window
+    of lines the edit made classify differently (e.g. a /* opening a boneyard),
+    yielding after every line so the caller can stop at any point. Paragraphs end at BLANK
+    lines of the LineTypes cache, where the classifier resets: an empty line
+    inside a boneyard or a multi-line note is not one. When the cache has to be
+    built first, that is done a chunk per step too (see screenwriter_ops.seed_steps).
+    """
+    types, edited = screenwriter_ops.update_line_types(text, line_index, rebuild=False)
+    if types is None:
+        for _ in screenwriter_ops.seed_steps(text):
+            yield
+        # Built from the text as it is now: the edit is in it already, and
+        # the window was found with a cache that is gone
+        types, edited = screenwriter_ops.update_line_types(text, line_index, rebuild=False)
+        window = None
+        if types is None:
+            return
+    yield
+    codes = types.codes
+    if line_index >= len(codes):
+        return
+
+    start = line_index
+    while start > 0 and codes[start - 1] != fountain_lines.BLANK_CODE:
+        start -= 1
+        yield
+    stop = line_index
+    while stop < len(codes) and codes[stop] != fountain_lines.BLANK_CODE:
+        stop += 1
+        yield
+    for other in (window, edited):
+        if other is not None:
+            start = min(start, other[0])
+            stop = min(max(stop, other[1]), len(codes))
+
+    lines = text.lines
+    for i in range(start, stop):
+        old_line = lines[i].body
+        new_line = fountain_parser.indent_line(types.type(i), old_line.strip())
+        if new_line != old_line:
+            current = text.current_line_index == i
+            character = text.current_character
+            lines[i].body = new_line
+            # Re-indenting keeps the type: only the hash changes
+            types.hashes[i] = fountain_parser.line_hash(new_line)
+            if current:
+                # Keep the cursor on the same character when the indentation changes
+                shift = _indent_width(new_line) - _indent_width(old_line)
+                text.cursor_set(i, character=min(len(new_line), max(0, character + shift)))
+        yield
+
+def _run_job(deadline):
+    """Advances the pending job until it finishes or the deadline passes. Returns True when done."""
+    job = _state["job"]
+    for _ in job:
+        if time.perf_counter() >= deadline:
+            return False
+    _state["job"] = None
+    return True
+
+def live_format_tick():
+    """bpy.app.timers callback: detects edits, debounces them and formats within the time budget"""
+    prefs = screenwriter_prefs.get_preferences()
+    if prefs is None or not prefs.use_live_format:
+        _state["job"] = None
+        return None
+
+    started = time.perf_counter()
+    deadline = started + prefs.live_format_budget / 1000.0
+
+    area, text = find_active_text()
+    if text is None:
+        _state["job"] = None
+        return POLL_INTERVAL
+
+    signature = _signature(text)
+    if text.name != _state["text"]:
+        # Switched texts: start watching, and build its line types in the background
+        _state.update(
+            text=text.name, signature=signature, edited_line=-1, window=None, checked=0,
+            job=screenwriter_ops.seed_steps(text),
+        )
+        return RESUME_INTERVAL
+
+    previous = _state["signature"]
+    edited = -1
+    if signature != previous:
+        _state["signature"] = signature
+        # Moving the cursor alone is not an edit
+        if previous is None or signature[0] != previous[0] or signature[1] == previous[1]:
+            edited = text.current_line_index
+    elif _state["job"] is None and _state["edited_line"] < 0:
+        # Idle: look for edits made away from the cursor
+        edited = _changed_line(text)
+    if edited >= 0:
+        # Kept in step edit by edit, while the edit's position is known
+        _types, window = screenwriter_ops.update_line_types(text, edited, rebuild=False)
+        if window is not None:
+            old = _state["window"] or window
+            _state["window"] = (min(old[0], window[0]), max(old[1], window[1]))
+        note_edit(text)
+        _state["edited_line"] = edited
+        _state["edited_at"] = started
+        _state["job"] = None
+        return POLL_INTERVAL
+
+    if _state["job"] is None:
+        if _state["edited_line"] < 0 or started - _state["edited_at"] < prefs.live_format_delay:
+            return POLL_INTERVAL
+        _state["job"] = format_paragraph(text, _state["edited_line"], _state["window"])
+        _state.update(edited_line=-1, window=None)
+
+    done = _run_job(deadline)
+    # Our own writes must not count as the next edit
+    _state["signature"] = _state["seen"][text.name] = _signature(text)
+    area.tag_redraw()
+    return POLL_INTERVAL if done else RESUME_INTERVAL
+
+@bpy.app.handlers.persistent
+def undo_redo_handler(*_args):
+    """undo_post/redo_post handler: any text may have changed"""
+    _state["undo_steps"] += 1
+
+def update_timer():
+    """Starts the live formatting timer if it is enabled and not already running"""
+    if not bpy.app.timers.is_registered(live_format_tick):
+        bpy.app.timers.register(live_format_tick, first_interval=POLL_INTERVAL, persistent=True)
+
+def register():
+    # The tick stops itself when live formatting is disabled in the preferences
+    update_timer()
+    bpy.app.handlers.undo_post.append(undo_redo_handler)
+    bpy.app.handlers.redo_post.append(undo_redo_handler)
+
+def unregister():
+    if bpy.app.timers.is_registered(live_format_tick):
+        bpy.app.timers.unregister(live_format_tick)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if undo_redo_handler in handlers:
+            handlers.remove(undo_redo_handler)
+    _state.update(text=None, signature=None, edited_line=-1, window=None, job=None, seen={}, checked=0)
+    _edits.clear()
@@ -0,0 +1,224 @@
+import time
+from array import array
+from collections import namedtuple
+from itertools import islice
+import bpy
+from . import fountain_io, fountain_parser, screenwriter_live, screenwriter_prefs
+
+# Seconds until the next tick while texts are left to format
+RESUME_INTERVAL = 0.01
+# Lines classified between two checks of the time budget
+CHUNK_LINES = 512
+# Time budget per tick (seconds) when the preferences are not available
+DEFAULT_BUDGET = 0.005
+
+# Load-time cost of one text: lines formatted, seconds from queued to started,
+# seconds spent formatting it (summed over ticks) and the number of ticks
+LoadTiming = namedtuple("LoadTiming", "name lines waited seconds ticks")
+
+_state = {
+    "queue": [],       # names of texts waiting to be formatted, in load order
+    "queued_at": 0.0,
+    "job": None,       # format_job generator of the text in progress
+    "current": None,   # [name, lines, waited, seconds, ticks] of the text in progress
+    "handler": 0.0,    # seconds the load handler itself took
+}
+# LoadTiming of every text formatted since the last file was opened
+timings = []
+
+def _write_lines(text, start, new_lines):
+    """
+    Replaces as many lines of text as there are new_lines, from line start, in
+    one write. The cursor stays where it was.
+    """
+    lines = text.lines
+    stop = start + len(new_lines)
+    cursor = text.current_line_index, text.current_character
+    if stop < len(lines):
+        # From the start of line start to the start of line stop
+        text.select_set(start, 0, stop, 0)
+        text.write("".join([line + "\n" for line in new_lines]))
+    else:
+        text.select_set(start, 0, stop - 1, len(lines[stop - 1].body))
+        text.write("\n".join(new_lines))
+    text.cursor_set(cursor[0], character=cursor[1])
+
+def format_job(name):
+    """
+    Generator formatting the text called name, yielding between chunks of
+    CHUNK_LINES lines. The text is read with a single as_string(); each step
+    classifies one chunk and writes back the lines whose indentation changed
+    in a single write. The job starts over from a fresh read if the text was
+    edited between two steps. Yields the number of lines once they are known.
+    """
+    while True:
+        text = bpy.data.texts.get(name)
+        if text is None or text.get("screenwriter_init"):
+            return
+        raw_content = text.as_string()
+        lines = raw_content.split("\n")
+        signature = screenwriter_live.edit_signature(text)
+        yield len(lines)
+        text = bpy.data.texts.get(name)
+        if text is None or text.get("screenwriter_init"):
+            return
+        if fountain_io.is_formatted(text, raw_content):
+            # Formatted before, only the tag was missing
+            text["screenwriter_init"] = True
+            return
+
+        formatted = fountain_parser.format_lines(lines)
+        hashes = array("i")
+        crc = 0
+        edited = False
+        for start in range(0, len(lines), CHUNK_LINES):
+            yield None
+            # Looked up again: the text may have been removed or renamed between ticks
+            text = bpy.data.texts.get(name)
+            if text is None or text.get("screenwriter_init"):
+                return
+            if screenwriter_live.edit_signature(text) != signature:
+                edited = True
+                break
+
+            chunk = list(islice(formatted, CHUNK_LINES))
+            changed = [i for i, line in enumerate(chunk, start) if line != lines[i]]
+            if changed:
+                _write_lines(text, changed[0], chunk[changed[0] - start:changed[-1] + 1 - start])
+                signature = screenwriter_live.edit_signature(text)
+            hashes.extend(fountain_parser.line_hashes(chunk))
+            crc = fountain_parser.content_hash((("\n" if start else "") + "\n".join(chunk),), crc)
+        if edited:
+            continue
+
+        text[fountain_io.LINE_HASHES_KEY] = hashes.tolist()
+        text[fountain_io.FORMAT_HASH_KEY] = crc
+        # Classified again, once, by the next incremental format
+        if fountain_io.LINE_TYPES_KEY in text:
+            del text[fountain_io.LINE_TYPES_KEY]
+        fountain_io.disable_syntax_highlight(text)
+        text["screenwriter_init"] = True
+        return
+
+def _visible_text_names():
+    wm = bpy.context.window_manager
+    names = set()
+    for window in wm.windows if wm else ():
+        for area in window.screen.areas:
+            if area.type == 'TEXT_EDITOR' and area.spaces.active.text:
+                names.add(area.spaces.active.text.name)
+    return names
+
+def _next_name():
+    """Takes the next text to format off the queue, those shown in a Text Editor first"""
+    queue = _state["queue"]
+    if not queue:
+        return None
+    visible = _visible_text_names()
+    for i, name in enumerate(queue):
+        if name in visible:
+            return queue.pop(i)
+    return queue.pop(0)
+
+def run_queue(budget=None):
+    """
+    Formats queued texts until the queue is empty or budget seconds passed
+    (no limit for None). Returns True when the queue is done.
+    """
+    started = time.perf_counter()
+    deadline = None if budget is None else started + budget
+    ticked = set()
+    while True:
+        if _state["job"] is None:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return not _state["queue"]
+            name = _next_name()
+            if name is None:
+                return True
+            _state["job"] = format_job(name)
+            _state["current"] = [name, 0, started - _state["queued_at"], 0.0, 0]
+
+        current = _state["current"]
+        if current[0] not in ticked:
+            ticked.add(current[0])
+            current[4] += 1
+        step_started = time.perf_counter()
+        finished = True
+        for lines in _state["job"]:
+            if lines is not None:
+                current[1] = lines
+            if deadline is not None and time.perf_counter() >= deadline:
+                finished = False
+                break
+        current[3] += time.perf_counter() - step_started
+        if not finished:
+            return False
+
+        timings.append(LoadTiming(*current))
+        _state["job"] = _state["current"] = None
+
+def report_lines():
+    """Human readable load-time cost per text block"""
+    lines = []
+    for timing in timings:
+        lines.append(
+            f"  {timing.name}: {timing.lines} lines in {timing.seconds * 1000:.1f} ms "
+            f"over {timing.ticks} ticks, started after {timing.waited * 1000:.1f} ms"
+        )
+    total = sum(timing.seconds for timing in timings)
+    lines.append(
+        f"Screenwriter: formatted {len(timings)} texts on load in {total * 1000:.1f} ms "
+        f"(load handler {_state['handler'] * 1000:.2f} ms)"
+    )
+    return lines
+
+def print_report():
+    """Prints report_lines() when timings are recorded (see the add-on preferences)"""
+    prefs = screenwriter_prefs.get_preferences()
+    if prefs is None or not prefs.use_instrumentation:
+        return
+    for line in report_lines():
+        print(line)
+
+def load_format_tick():
+    """bpy.app.timers callback: formats queued texts within the per-tick time budget"""
+    prefs = screenwriter_prefs.get_preferences()
+    budget = prefs.load_format_budget / 1000.0 if prefs else DEFAULT_BUDGET
+    done = run_queue(budget)
+    screenwriter_live.redraw_text_editors()
+    if not done:
+        return RESUME_INTERVAL
+    print_report()
+    return None
+
+def queue_texts(texts):
+    """
+    Queues texts for formatting after the current file finished loading; in
+    background mode, where timers do not run, formats them right away.
+    """
+    started = time.perf_counter()
+    # A new file was opened: whatever was left of the previous one is gone
+    _state.update(queue=[text.name for text in texts], queued_at=started, job=None, current=None)
+    timings.clear()
+    if not texts:
+        _state["handler"] = time.perf_counter() - started
+        return
+
+    if bpy.app.background:
+        run_queue()
+        _state["handler"] = time.perf_counter() - started
+        print_report()
+        return
+    if not bpy.app.timers.is_registered(load_format_tick):
+        bpy.app.timers.register(load_format_tick, first_interval=0.0)
+    _state["handler"] = time.perf_counter() - started
+
+def register():
+    # Nothing to set up: the timer is only started by queue_texts
+    pass
+
+def unregister():
+    if bpy.app.timers.is_registered(load_format_tick):
+        bpy.app.timers.unregister(load_format_tick)
+    _state.update(queue=[], job=None, current=None)
+    timings.clear()
@@ -1,5 +1,16 @@
 import bpy
+from . import fountain_io, fountain_lines, fountain_parser, screenwriter_prefs
 
+# text name -> fountain_lines.LineTypes
+_line_types = {}
+# text name -> _seed generator building its LineTypes, while in progress
+_seeding = {}
+# Lines classified per step while a LineTypes cache is built in the background
+SEED_LINES = 256
+# text name -> (line index, body, element type) of the last line Tab formatted
+_intents = {}
+# (keymap, keymap item) pairs added by the add-on
+addon_keymaps = []
 
 def get_current_line(text):
     if not text:
@@ -11,6 +22,124 @@ def set_line_text(text, content):
         return
     text.lines[text.current_line_index].body = content
 
+def _located_edit(cache, text, index):
+    """
+    (start, old_stop, new_stop) of the edit that added or removed lines, if it
+    ended on line index (typing, Enter, Backspace, a paste at the cursor):
+    checked against the cached hashes of the lines just before and after it.
+    None if the edit happened elsewhere.
+    """
+    lines = text.lines
+    delta = len(lines) - len(cache)
+    if delta > 0:
+        # Line start was split into the lines up to index
+        start = index - delta
+        old_stop = start + 1
+    else:
+        # Lines index to old_stop were joined into line index
+        start = index
+        old_stop = index + 1 - delta
+    new_stop = old_stop + delta
+    if start < 0 or old_stop > len(cache) or new_stop > len(lines):
+        return None
+    hashes = cache.hashes
+    line_hash = fountain_parser.line_hash
+    if start > 0 and hashes[start - 1] != line_hash(lines[start - 1].body):
+        return None
+    if new_stop < len(lines) and hashes[old_stop] != line_hash(lines[new_stop].body):
+        return None
+    return start, old_stop, new_stop
+
+def update_line_types(text, index, rebuild=True):
+    """
+    Brings the LineTypes cache of text up to date, assuming the edit since the
+    last call ended on line index: only the lines around it are hashed. When
+    lines were added or removed somewhere else, or there is no cache yet, the
+    whole text is classified again, unless rebuild is False: then the cache is
+    dropped and (None, None) returned, see seed_steps. Returns (cache, (start,
+    stop) range of the lines classified again, or None).
+    """
+    cache = _line_types.get(text.name)
+    lines = text.lines
+    if cache is not None and len(cache) != len(lines):
+        edit = _located_edit(cache, text, index)
+        if edit is not None:
+            return cache, cache.edit(fountain_io.LineBodies(text), *edit)
+        cache = None
+    if cache is None:
+        _line_types.pop(text.name, None)
+        if not rebuild:
+            return None, None
+        cache = _line_types[text.name] = fountain_lines.LineTypes()
+        # as_string() is one call into Blender, iterating text.lines is one per line
+        return cache, cache.update(text.as_string().split("\n"))
+    if not 0 <= index < len(cache) or cache.hashes[index] == fountain_parser.line_hash(lines[index].body):
+        return cache, None
+    return cache, cache.edit(fountain_io.LineBodies(text), index, index + 1, index + 1)
+
+def cached_line_types(text):
+    """The LineTypes cache of text as last brought up to date, or None"""
+    return _line_types.get(text.name)
+
+def _seed(name):
+    # Starts over whenever lines are added or removed in between two steps
+    while True:
+        text = bpy.data.texts.get(name)
+        if text is None:
+            return
+        count = len(text.lines)
+        cache = fountain_lines.LineTypes()
+        for _ in cache.fill(fountain_io.LineBodies(text), SEED_LINES):
+            yield
+            text = bpy.data.texts.get(name)
+            if text is None:
+                return
+            if len(text.lines) != count:
+                break
+        else:
+            # Unless an operator built one in the meantime
+            _line_types.setdefault(name, cache)
+            return
+
+def seed_steps(text):
+    """
+    Generator yielding until the LineTypes cache of text exists, classifying
+    SEED_LINES lines per step, so a timer can build it within its time budget.
+    Progress is kept when the generator is dropped: the next one resumes it.
+    """
+    name = text.name
+    if name in _line_types:
+        return
+    seed = _seeding.get(name)
+    if seed is None:
+        seed = _seeding[name] = _seed(name)
+    # Not "yield from": closing this generator must not close the seed
+    for _ in seed:
+        yield
+    _seeding.pop(name, None)
+
+def line_types(text, indices=None):
+    """The LineTypes cache of text, brought up to date for edits of the lines at indices (default: the current line)"""
+    cache = None
+    for index in (text.current_line_index,) if indices is None else indices:
+        cache, _window = update_line_types(text, index)
+    return cache
+
+def line_break(text, indent=None):
+    """
+    Breaks the current line with Blender's line break, auto-indent included,
+    or with the new line indented by indent. Keeps the LineTypes cache in step
+    without hashing the whole text.
+    """
+    index = text.current_line_index
+    bpy.ops.text.line_break()
+    if indent is not None:
+        text.current_line.body = indent
+        text.cursor_set(index + 1, character=len(indent))
+    cache = _line_types.get(text.name)
+    if cache is not None and len(cache) + 1 == len(text.lines):
+        cache.edit(fountain_io.LineBodies(text), index, index + 1, index + 2)
+
 def clean_text(text_body):
     """Strip whitespace and surrounding parentheses"""
     body = text_body.strip()
@@ -18,6 +147,25 @@ def clean_text(text_body):
     body = body.lstrip("(").rstrip(")")
     return body.strip()
 
+def format_line(element_type, body):
+    """body formatted as element_type by hand: case, parentheses and indentation"""
+    content = clean_text(body)
+    if element_type in (fountain_parser.HEADER, fountain_parser.CHARACTER, fountain_parser.TRANSITION):
+        content = content.upper()
+    elif element_type == fountain_parser.PARENTHETICAL:
+        content = "(" + content + ")"
+    return fountain_parser.INDENTS[element_type] + content
+
+def format_current_line(context, element_type):
+    text = context.edit_text
+    if not text:
+        return {'CANCELLED'}
+
+    fix_view_settings(context)
+    line = get_current_line(text)
+    set_line_text(text, format_line(element_type, line.body))
+    return {'FINISHED'}
+
 class SCREENWRITER_OT_format_header(bpy.types.Operator):
     """Format current line as Scene Header"""
     bl_idname = "screenwriter.format_header"
@@ -25,17 +173,7 @@ class SCREENWRITER_OT_format_header(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        text = context.edit_text
-        if not text:
-             return {'CANCELLED'}
-        
-        fix_view_settings(context)
-        line = get_current_line(text)
-        content = clean_text(line.body).upper()
-        
-        set_line_text(text, content)
-        
-        return {'FINISHED'}
+        return format_current_line(context, fountain_parser.HEADER)
 
 class SCREENWRITER_OT_format_action(bpy.types.Operator):
     """Format current line as Action"""
@@ -44,14 +182,7 @@ class SCREENWRITER_OT_format_action(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        text = context.edit_text
-        if not text: return {'CANCELLED'}
-        
-        fix_view_settings(context)
-        line = get_current_line(text)
-        content = clean_text(line.body)
-        set_line_text(text, content)
-        return {'FINISHED'}
+        return format_current_line(context, fountain_parser.ACTION)
 
 class SCREENWRITER_OT_format_character(bpy.types.Operator):
     """Format current line as Character"""
@@ -60,23 +191,16 @@ class SCREENWRITER_OT_format_character(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        text = context.edit_text
-        if not text: return {'CANCELLED'}
-        
-        fix_view_settings(context)
-        line = get_current_line(text)
-        # 22 spaces is roughly center for character in standard courier
-        indent = " " * 22 
-        content = indent + clean_text(line.body).upper()
-        set_line_text(text, content)
-        return {'FINISHED'}
+        return format_current_line(context, fountain_parser.CHARACTER)
 
 def fix_view_settings(context):
     """Disable syntax highlighting for screenplay look"""
     try:
         # Try to access current space
-        if context.space_data and context.space_data.type == 'TEXT_EDITOR':
-            context.space_data.show_syntax_highlight = False
+        space = context.space_data
+        # Only write when needed: every write tags the editor for redraw
+        if space and space.type == 'TEXT_EDITOR' and space.show_syntax_highlight:
+            space.show_syntax_highlight = False
     except:
         pass # Better safe than sorry to avoid crash
 
@@ -87,16 +211,7 @@ class SCREENWRITER_OT_format_dialogue(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        text = context.edit_text
-        if not text: return {'CANCELLED'}
-        
-        fix_view_settings(context)
-        line = get_current_line(text)
-        # 10 spaces for dialogue
-        indent = " " * 10 
-        content = indent + clean_text(line.body)
-        set_line_text(text, content)
-        return {'FINISHED'}
+        return format_current_line(context, fountain_parser.DIALOGUE)
 
 class SCREENWRITER_OT_format_parenthetical(bpy.types.Operator):
     """Format current line as Parenthetical"""
@@ -105,20 +220,7 @@ class SCREENWRITER_OT_format_parenthetical(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        text = context.edit_text
-        if not text: return {'CANCELLED'}
-        
-        fix_view_settings(context)
-        line = get_current_line(text)
-        content = clean_text(line.body)
-        
-        # Add parens
-        content = "(" + content + ")"
-            
-        # 16 spaces for parenthetical
-        indent = " " * 16
-        set_line_text(text, indent + content)
-        return {'FINISHED'}
+        return format_current_line(context, fountain_parser.PARENTHETICAL)
 
 class SCREENWRITER_OT_format_transition(bpy.types.Operator):
     """Format current line as Transition"""
@@ -126,21 +228,74 @@ class SCREENWRITER_OT_format_transition(bpy.types.Operator):
     bl_label = "Transition"
     bl_options = {'REGISTER', 'UNDO'}
 
+    def execute(self, context):
+        return format_current_line(context, fountain_parser.TRANSITION)
+
+def _use_screenplay_keys(context):
+    text = getattr(context, "edit_text", None)
+    if not text or not fountain_io.is_fountain_text(text):
+        return False
+    prefs = screenwriter_prefs.get_preferences(context)
+    return prefs is not None and prefs.use_screenplay_keys
+
+class SCREENWRITER_OT_cycle_element(bpy.types.Operator):
+    """Turn the current line into the next element type (Action, Character, Parenthetical, Dialogue, Transition, Scene Header)"""
+    bl_idname = "screenwriter.cycle_element"
+    bl_label = "Cycle Element Type"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return _use_screenplay_keys(context)
+
     def execute(self, context):
         text = context.edit_text
-        if not text: return {'CANCELLED'}
-        
+        index = text.current_line_index
+        body = text.current_line.body
+
+        types = line_types(text, (index - 1, index))
+        intent = _intents.get(text.name)
+        if intent is not None and intent[:2] == (index, body):
+            # Tab again on a line we just formatted: continue from what we made it
+            current = intent[2]
+        else:
+            current = types.type(index) if body.strip() else fountain_parser.BLANK
+        element_type = fountain_lines.next_type(current, types.type(index - 1))
+
         fix_view_settings(context)
-        line = get_current_line(text)
-        
-        # Transitions are uppercase and right-aligned (approx 42 spaces)
-        indent = " " * 42
-        content = indent + clean_text(line.body).upper()
-        
-        # Ensure it ends with TO:? Standard convention but maybe user wants freedom
-        # Let's just enforce case and indent
-        
-        set_line_text(text, content)
+        new_body = format_line(element_type, body)
+        set_line_text(text, new_body)
+        # Inside the parentheses of an empty parenthetical, else at the end
+        empty = element_type == fountain_parser.PARENTHETICAL and new_body.endswith("()")
+        text.cursor_set(index, character=len(new_body) - 1 if empty else len(new_body))
+        _intents[text.name] = (index, new_body, element_type)
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_smart_enter(bpy.types.Operator):
+    """New line that starts the next element: dialogue after a cue, a new paragraph after anything else"""
+    bl_idname = "screenwriter.smart_enter"
+    bl_label = "Smart Enter"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        return _use_screenplay_keys(context)
+
+    def execute(self, context):
+        text = context.edit_text
+        body = text.current_line.body
+        if text.current_character < len(body) or not body.strip():
+            # Splitting a line or adding empty lines: a plain line break
+            line_break(text)
+            return {'FINISHED'}
+
+        index = text.current_line_index
+        types = line_types(text, (index - 1, index))
+        if fountain_lines.starts_dialogue(types.type(index), types.type(index - 1), body):
+            line_break(text, fountain_parser.INDENTS[fountain_parser.DIALOGUE])
+        else:
+            line_break(text, "")
+            line_break(text, "")
         return {'FINISHED'}
 
 classes = [
@@ -150,12 +305,31 @@ classes = [
     SCREENWRITER_OT_format_dialogue,
     SCREENWRITER_OT_format_parenthetical,
     SCREENWRITER_OT_format_transition,
+    SCREENWRITER_OT_cycle_element,
+    SCREENWRITER_OT_smart_enter,
 ]
 
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
 
+    # Only Fountain texts: for other texts poll() fails and the keys work as usual
+    keyconfig = bpy.context.window_manager.keyconfigs.addon
+    if keyconfig:
+        keymap = keyconfig.keymaps.new(name="Text", space_type='TEXT_EDITOR')
+        for idname, key in (
+            (SCREENWRITER_OT_cycle_element.bl_idname, 'TAB'),
+            (SCREENWRITER_OT_smart_enter.bl_idname, 'RET'),
+        ):
+            addon_keymaps.append((keymap, keymap.keymap_items.new(idname, key, 'PRESS')))
+
 def unregister():
+    for keymap, item in addon_keymaps:
+        keymap.keymap_items.remove(item)
+    addon_keymaps.clear()
+
     for cls in classes:
         bpy.utils.unregister_class(cls)
+    _line_types.clear()
+    _seeding.clear()
+    _intents.clear()
@@ -0,0 +1,188 @@
+import functools
+import bpy
+from . import fountain_outline, fountain_parser, screenwriter_live
+
+# Seconds after the last edit before the outline is brought up to date
+OUTLINE_DELAY = 0.3
+# Lines kept visible above the line jumped to
+SCROLL_MARGIN = 3
+
+# text name -> fountain_outline.Outline
+_outlines = {}
+# text name -> (edit signature, hash of the content) the outline was last updated from
+_keys = {}
+# Names of texts with an update scheduled
+_pending = set()
+
+ICONS = {
+    fountain_parser.HEADER: "SEQUENCE",
+    fountain_parser.SECTION: "BOOKMARKS",
+    fountain_parser.SYNOPSIS: "TEXT",
+}
+
+class SCREENWRITER_PG_outline_item(bpy.types.PropertyGroup):
+    # Placeholder: the list only needs one item per entry, what it shows comes
+    # from the cached Outline so nothing is written per entry on every edit
+    pass
+
+def refresh_outline(text):
+    """Brings the outline of text up to date now and sizes its list to match"""
+    raw_content = text.as_string()
+    outline = _outlines.get(text.name)
+    if outline is None:
+        outline = _outlines[text.name] = fountain_outline.Outline()
+    key = hash(raw_content)
+    if _keys.get(text.name, (None, None))[1] != key:
+        outline.update(raw_content.split("\n"))
+    _keys[text.name] = (screenwriter_live.edit_signature(text), key)
+
+    items = text.screenwriter_outline
+    while len(items) < len(outline):
+        items.add()
+    while len(items) > len(outline):
+        items.remove(len(items) - 1)
+    return outline
+
+def _refresh(name):
+    _pending.discard(name)
+    text = bpy.data.texts.get(name)
+    if text is not None:
+        refresh_outline(text)
+        screenwriter_live.redraw_text_editors()
+    return None
+
+def cached_outline(text):
+    """
+    Outline of text as last updated, or None before the first update. Never
+    reads the whole text, so it is safe to call from draw(): when its edit
+    signature changed, an update is scheduled on a timer and the previous
+    outline is returned until then.
+    """
+    outline = _outlines.get(text.name)
+    key = _keys.get(text.name)
+    if (outline is None or key is None or key[0] != screenwriter_live.edit_signature(text)) and text.name not in _pending:
+        _pending.add(text.name)
+        delay = 0.0 if outline is None else OUTLINE_DELAY
+        bpy.app.timers.register(functools.partial(_refresh, text.name), first_interval=delay)
+    return outline
+
+def jump_to_line(context, text, line):
+    """Puts the cursor of text at the start of line and scrolls the editors showing it there"""
+    text.cursor_set(line)
+    screen = getattr(context, "screen", None)
+    for area in screen.areas if screen else ():
+        if area.type == 'TEXT_EDITOR' and area.spaces.active.text == text:
+            area.spaces.active.top = max(0, line - SCROLL_MARGIN)
+            area.tag_redraw()
+
+def _jump_to_active(self, context):
+    # self is the text whose outline list got a new active item
+    outline = _outlines.get(self.name)
+    if outline is not None and 0 <= self.screenwriter_outline_index < len(outline):
+        jump_to_line(context, self, outline.entries[self.screenwriter_outline_index].line)
+
+class SCREENWRITER_UL_outline(bpy.types.UIList):
+    """Scene headers, sections and synopses of the text, from the cached outline"""
+    bl_idname = "SCREENWRITER_UL_outline"
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        outline = _outlines.get(data.name)
+        if outline is None or index >= len(outline):
+            return
+        entry = outline.entries[index]
+        row = layout.row(align=True)
+        if entry.level > 1:
+            row.separator(factor=entry.level - 1)
+        row.label(text=entry.title, icon=ICONS[entry.element_type])
+        # Also jumps when the item is already the active one
+        op = row.operator(SCREENWRITER_OT_jump_to_line.bl_idname, text=str(entry.line + 1), emboss=False)
+        op.line = entry.line
+
+    def filter_items(self, context, data, propname):
+        outline = _outlines.get(data.name)
+        if not self.filter_name or outline is None:
+            return [], []
+        pattern = self.filter_name.lower()
+        flags = [self.bitflag_filter_item if pattern in entry.title.lower() else 0 for entry in outline.entries]
+        flags += [0] * (len(getattr(data, propname)) - len(flags))
+        return flags, []
+
+def draw_outline(layout, text, rows=8):
+    """The Outline section of the sidebar; only reads the cached outline"""
+    box = layout.box()
+    row = box.row(align=True)
+    row.label(text="Outline", icon="OUTLINER")
+    row.operator(SCREENWRITER_OT_jump_scene.bl_idname, text="", icon="TRIA_UP").step = -1
+    row.operator(SCREENWRITER_OT_jump_scene.bl_idname, text="", icon="TRIA_DOWN").step = 1
+    if cached_outline(text) is None:
+        box.label(text="Indexing...")
+        return
+    box.template_list(
+        SCREENWRITER_UL_outline.bl_idname, "", text, "screenwriter_outline",
+        text, "screenwriter_outline_index", rows=rows,
+    )
+
+def _get_text(context):
+    text = getattr(context, "edit_text", None)
+    if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+         text = context.space_data.text
+    return text
+
+class SCREENWRITER_OT_jump_to_line(bpy.types.Operator):
+    """Move the cursor to this line"""
+    bl_idname = "screenwriter.jump_to_line"
+    bl_label = "Jump to Line"
+
+    line: bpy.props.IntProperty(name="Line", min=0)
+
+    def execute(self, context):
+        text = _get_text(context)
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        jump_to_line(context, text, min(self.line, len(text.lines) - 1))
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_jump_scene(bpy.types.Operator):
+    """Move the cursor to the next or previous scene header"""
+    bl_idname = "screenwriter.jump_scene"
+    bl_label = "Jump to Scene"
+
+    step: bpy.props.IntProperty(name="Direction", default=1, min=-1, max=1)
+
+    def execute(self, context):
+        text = _get_text(context)
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        # Incremental: after an edit only the edited lines are classified again
+        outline = refresh_outline(text)
+        index = outline.find(text.current_line_index, self.step or 1)
+        if index < 0:
+            return {'CANCELLED'}
+        jump_to_line(context, text, outline.entries[index].line)
+        return {'FINISHED'}
+
+classes = [
+    SCREENWRITER_PG_outline_item,
+    SCREENWRITER_UL_outline,
+    SCREENWRITER_OT_jump_to_line,
+    SCREENWRITER_OT_jump_scene,
+]
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.Text.screenwriter_outline = bpy.props.CollectionProperty(type=SCREENWRITER_PG_outline_item)
+    bpy.types.Text.screenwriter_outline_index = bpy.props.IntProperty(default=-1, update=_jump_to_active)
+
+def unregister():
+    del bpy.types.Text.screenwriter_outline_index
+    del bpy.types.Text.screenwriter_outline
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    _outlines.clear()
+    _keys.clear()
+    _pending.clear()
@@ -0,0 +1,98 @@
+import functools
+import bpy
+from bpy_extras.io_utils import ExportHelper
+from . import fountain_paginate, fountain_pdf, screenwriter_live, screenwriter_revision
+
+# Seconds after the last edit before the page estimate is counted again
+ESTIMATE_DELAY = 0.5
+
+# text name -> (edit signature, hash of the content it was counted for, PageEstimate)
+_estimates = {}
+# Names of texts with a recount scheduled
+_pending = set()
+
+def _text_lines(text):
+    # as_string() is one call into Blender, iterating text.lines is one per line
+    return text.as_string().split("\n")
+
+def _recount(name):
+    _pending.discard(name)
+    text = bpy.data.texts.get(name)
+    if text is not None:
+        raw_content = text.as_string()
+        key = hash(raw_content)
+        cached = _estimates.get(name)
+        if cached is not None and cached[1] == key:
+            # Only the cursor moved
+            estimate = cached[2]
+        else:
+            estimate = fountain_paginate.count_pages(raw_content.split("\n"))
+            screenwriter_live.redraw_text_editors()
+        _estimates[name] = (screenwriter_live.edit_signature(text), key, estimate)
+    return None
+
+def page_estimate(text):
+    """
+    PageEstimate for text as last counted, or None before the first count.
+    Cheap enough to call from draw(): nothing is read or counted here; when the
+    edit signature of text changed, a timer counts again (ESTIMATE_DELAY after
+    the edit) and the previous count is returned until then.
+    """
+    cached = _estimates.get(text.name)
+    if (cached is None or cached[0] != screenwriter_live.edit_signature(text)) and text.name not in _pending:
+        _pending.add(text.name)
+        delay = 0.0 if cached is None else ESTIMATE_DELAY
+        bpy.app.timers.register(functools.partial(_recount, text.name), first_interval=delay)
+    return cached[2] if cached else None
+
+class SCREENWRITER_OT_export_pdf(bpy.types.Operator, ExportHelper):
+    """Export current text as a paginated screenplay PDF"""
+    bl_idname = "screenwriter.export_pdf"
+    bl_label = "Export PDF"
+    filename_ext = ".pdf"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.pdf",
+        options={'HIDDEN'},
+        maxlen=255,
+    )
+
+    revision_marks: bpy.props.BoolProperty(
+        name="Revision Marks",
+        description="Mark lines changed since the last revision snapshot with asterisks in the margin",
+        default=True,
+    )
+
+    def execute(self, context):
+        text = getattr(context, "edit_text", None)
+        if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+             text = context.space_data.text
+
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        marked = None
+        label = ""
+        if self.revision_marks:
+            result = screenwriter_revision.compute_diff(text)
+            if result is not None:
+                marked = set(result.marked)
+                label = screenwriter_revision.revision_label(screenwriter_revision.get_revisions(text)[-1])
+
+        try:
+            pages = fountain_pdf.write_pdf(self.filepath, _text_lines(text), marked, label)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to export PDF: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Exported {pages} pages to {self.filepath}")
+        return {'FINISHED'}
+
+def register():
+    bpy.utils.register_class(SCREENWRITER_OT_export_pdf)
+
+def unregister():
+    bpy.utils.unregister_class(SCREENWRITER_OT_export_pdf)
+    _estimates.clear()
+    _pending.clear()
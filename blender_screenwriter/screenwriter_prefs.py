@@ -0,0 +1,118 @@
+import bpy
+
+
+def _update_live_format(self, context):
+    from . import screenwriter_live
+    screenwriter_live.update_timer()
+
+def _update_file_watcher(self, context):
+    from . import screenwriter_watch
+    screenwriter_watch.update_timer()
+
+def _update_instrumentation(self, context):
+    from . import screenwriter_profile
+    screenwriter_profile.apply_preferences(context)
+
+class ScreenwriterPreferences(bpy.types.AddonPreferences):
+    bl_idname = __package__
+
+    use_live_format: bpy.props.BoolProperty(
+        name="Live Formatting",
+        description="Re-format the paragraph being edited while you type",
+        default=False,
+        update=_update_live_format,
+    )
+    live_format_delay: bpy.props.FloatProperty(
+        name="Delay",
+        description="Seconds without edits before the current paragraph is re-formatted",
+        default=0.4,
+        min=0.0,
+        max=5.0,
+        subtype='TIME_ABSOLUTE',
+        unit='TIME_ABSOLUTE',
+    )
+    live_format_budget: bpy.props.FloatProperty(
+        name="Time Budget (ms)",
+        description="Maximum time live formatting may spend per timer tick, so typing never stutters",
+        default=2.0,
+        min=0.1,
+        max=50.0,
+    )
+
+    load_format_budget: bpy.props.FloatProperty(
+        name="Load Time Budget (ms)",
+        description="Maximum time per timer tick spent formatting the texts of a file just opened",
+        default=5.0,
+        min=0.5,
+        max=100.0,
+    )
+    use_file_watcher: bpy.props.BoolProperty(
+        name="Watch Files",
+        description="Reload the lines of linked .fountain files that were changed in another editor",
+        default=True,
+        update=_update_file_watcher,
+    )
+    use_screenplay_keys: bpy.props.BoolProperty(
+        name="Screenplay Keys",
+        description="In Fountain texts, Tab cycles the element type of the current line "
+                    "and Enter starts the element that usually follows it",
+        default=True,
+    )
+
+    use_instrumentation: bpy.props.BoolProperty(
+        name="Record Timings",
+        description="Time every Screenwriter operator and the parse/format functions "
+                    "(off: nothing is wrapped and there is no overhead)",
+        default=False,
+        update=_update_instrumentation,
+    )
+    instrumentation_capacity: bpy.props.IntProperty(
+        name="Timings Kept",
+        description="Number of most recent calls kept",
+        default=1000,
+        min=10,
+        max=100000,
+        update=_update_instrumentation,
+    )
+    track_allocations: bpy.props.BoolProperty(
+        name="Memory",
+        description="Also record memory allocated by each call (tracemalloc, slows everything down)",
+        default=False,
+        update=_update_instrumentation,
+    )
+    profile_calls: bpy.props.BoolProperty(
+        name="Profile Calls",
+        description="Collect a cProfile of the timed calls, for export",
+        default=False,
+        update=_update_instrumentation,
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        col = layout.column()
+        col.prop(self, "use_live_format")
+        sub = col.column()
+        sub.active = self.use_live_format
+        sub.prop(self, "live_format_delay")
+        sub.prop(self, "live_format_budget")
+        col.prop(self, "use_screenplay_keys")
+        col.prop(self, "load_format_budget")
+        col.prop(self, "use_file_watcher")
+        col.prop(self, "use_instrumentation")
+        sub = col.column()
+        sub.active = self.use_instrumentation
+        sub.prop(self, "instrumentation_capacity")
+        sub.prop(self, "track_allocations")
+        sub.prop(self, "profile_calls")
+
+def get_preferences(context=None):
+    """Returns the add-on preferences, or None while the add-on is not fully enabled"""
+    context = context or bpy.context
+    addon = context.preferences.addons.get(__package__)
+    return addon.preferences if addon else None
+
+def register():
+    bpy.utils.register_class(ScreenwriterPreferences)
+
+def unregister():
+    bpy.utils.unregister_class(ScreenwriterPreferences)
@@ -0,0 +1,207 @@
+import sys
+import bpy
+from bpy_extras.io_utils import ExportHelper
+from . import fountain_io, fountain_profile, screenwriter_prefs
+
+# fountain_io functions timed along with every operator
+FUNCTIONS = (
+    "parse_fountain_elements",
+    "format_text_block",
+    "format_text_block_incremental",
+    "write_formatted",
+    "write_fountain_file",
+    "save_fountain_file",
+)
+# Rows of the Performance panel
+MAX_SHOWN = 12
+
+recorder = fountain_profile.Recorder()
+
+# (recorder.recorded, summaries) as last drawn
+_summary = [None, []]
+
+def _operator_lines(args, result):
+    # args is (operator, context): count the lines of the text it ran on
+    context = args[1] if len(args) > 1 else None
+    text = getattr(context, "edit_text", None)
+    if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+         text = context.space_data.text
+    try:
+        return len(text.lines) if text else 0
+    except ReferenceError:
+        # The operator removed the text
+        return 0
+
+def operator_classes():
+    """Every operator class of the add-on"""
+    for name, module in list(sys.modules.items()):
+        if not name.startswith(__package__ + ".") or module is None:
+            continue
+        for value in vars(module).values():
+            if (
+                isinstance(value, type) and issubclass(value, bpy.types.Operator)
+                and value.__module__ == name and "execute" in value.__dict__
+            ):
+                yield value
+
+def enable():
+    """Wraps every operator's execute and the FUNCTIONS of fountain_io"""
+    if recorder.enabled:
+        return
+    for cls in operator_classes():
+        recorder.instrument(cls, "execute", cls.bl_idname, _operator_lines)
+    for name in FUNCTIONS:
+        recorder.instrument(fountain_io, name, "fountain_io." + name)
+
+def disable():
+    """Restores the original functions: no overhead at all remains"""
+    recorder.uninstrument()
+    recorder.set_profiling(False)
+    recorder.set_track_allocations(False)
+
+def apply_preferences(context=None):
+    prefs = screenwriter_prefs.get_preferences(context)
+    if prefs is None or not prefs.use_instrumentation:
+        disable()
+        return None
+    recorder.resize(prefs.instrumentation_capacity)
+    recorder.set_track_allocations(prefs.track_allocations)
+    recorder.set_profiling(prefs.profile_calls)
+    enable()
+    return None
+
+def _summaries():
+    # Summarized again only when something was recorded since the last draw
+    if _summary[0] != recorder.recorded:
+        _summary[0] = recorder.recorded
+        _summary[1] = fountain_profile.summarize(recorder.samples)
+    return _summary[1]
+
+def _size(count):
+    if abs(count) >= 1 << 20:
+        return f"{count / (1 << 20):.1f} MB"
+    return f"{count / 1024:.0f} KB"
+
+class SCREENWRITER_PT_performance(bpy.types.Panel):
+    """Timings of the add-on's operators, recorded while instrumentation is on"""
+    bl_label = "Performance"
+    bl_idname = "SCREENWRITER_PT_performance"
+    bl_space_type = 'TEXT_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = "Screenwriter"
+    bl_parent_id = "SCREENWRITER_PT_main_panel"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        prefs = screenwriter_prefs.get_preferences(context)
+        if prefs is None:
+            return
+        layout.prop(prefs, "use_instrumentation")
+        if not prefs.use_instrumentation:
+            return
+        row = layout.row(align=True)
+        row.prop(prefs, "track_allocations", toggle=True)
+        row.prop(prefs, "profile_calls", toggle=True)
+
+        summaries = _summaries()
+        if not summaries:
+            layout.label(text="Run an operator to record it")
+        else:
+            col = layout.column(align=True)
+            for summary in summaries[:MAX_SHOWN]:
+                name = summary.name.rpartition(".")[2]
+                row = col.row()
+                row.label(text=name)
+                row.label(text=f"{summary.calls}x {summary.mean * 1000:.1f} ms (max {summary.max * 1000:.1f})")
+                if prefs.track_allocations:
+                    row.label(text=_size(summary.peak))
+            if len(summaries) > MAX_SHOWN:
+                col.label(text=f"... {len(summaries) - MAX_SHOWN} more")
+            col.label(text=f"{len(recorder.samples)} of the last {recorder.samples.maxlen} calls")
+
+        row = layout.row(align=True)
+        row.operator(SCREENWRITER_OT_export_performance.bl_idname, text="JSON", icon="EXPORT")
+        sub = row.row(align=True)
+        sub.enabled = recorder.profiler is not None
+        sub.operator(SCREENWRITER_OT_export_profile.bl_idname, text="cProfile", icon="EXPORT")
+        row.operator(SCREENWRITER_OT_clear_performance.bl_idname, text="", icon="TRASH")
+
+class SCREENWRITER_OT_clear_performance(bpy.types.Operator):
+    """Forget every recorded timing and the collected profile"""
+    bl_idname = "screenwriter.clear_performance"
+    bl_label = "Clear Timings"
+
+    def execute(self, context):
+        recorder.clear()
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_export_performance(bpy.types.Operator, ExportHelper):
+    """Export the recorded timings, per call and summarized, as JSON"""
+    bl_idname = "screenwriter.export_performance"
+    bl_label = "Export Timings"
+    filename_ext = ".json"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.json",
+        options={'HIDDEN'},
+        maxlen=255,
+    )
+
+    def execute(self, context):
+        try:
+            with open(self.filepath, "w", encoding="utf-8") as f:
+                f.write(fountain_profile.dumps(recorder.samples))
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to export timings: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Exported {len(recorder.samples)} timings to {self.filepath}")
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_export_profile(bpy.types.Operator, ExportHelper):
+    """Export the profile of the recorded calls, for pstats or snakeviz"""
+    bl_idname = "screenwriter.export_profile"
+    bl_label = "Export Profile"
+    filename_ext = ".prof"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.prof",
+        options={'HIDDEN'},
+        maxlen=255,
+    )
+
+    def execute(self, context):
+        if recorder.profiler is None:
+            self.report({'ERROR'}, "Turn on Profile Calls in the Performance panel first.")
+            return {'CANCELLED'}
+
+        try:
+            recorder.profiler.dump_stats(self.filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to export profile: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Exported profile to {self.filepath}")
+        return {'FINISHED'}
+
+classes = [
+    SCREENWRITER_PT_performance,
+    SCREENWRITER_OT_clear_performance,
+    SCREENWRITER_OT_export_performance,
+    SCREENWRITER_OT_export_profile,
+]
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    # The preferences are only readable once the add-on is enabled
+    bpy.app.timers.register(apply_preferences, first_interval=0.0)
+
+def unregister():
+    if bpy.app.timers.is_registered(apply_preferences):
+        bpy.app.timers.unregister(apply_preferences)
+    disable()
+    recorder.clear()
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
@@ -0,0 +1,178 @@
+import functools
+import time
+import bpy
+from . import fountain_revision, screenwriter_live, screenwriter_outline
+
+# Seconds after the last edit before the diff against the last revision is redone
+DIFF_DELAY = 1.0
+# Changed scenes listed in the sidebar
+MAX_SHOWN = 20
+
+# Revision snapshots of the text, oldest first (JSON, see fountain_revision.dumps_revisions)
+REVISIONS_KEY = "screenwriter_revisions"
+
+ICONS = {
+    fountain_revision.ADDED: "ADD",
+    fountain_revision.REMOVED: "REMOVE",
+    fountain_revision.CHANGED: "GREASEPENCIL",
+    fountain_revision.MOVED: "SORTSIZE",
+}
+
+# text name -> (edit signature, hash of the content, RevisionDiff against the last revision)
+_diffs = {}
+# Names of texts with a diff scheduled
+_pending = set()
+
+def _text_lines(text):
+    return text.as_string().split("\n")
+
+def get_revisions(text):
+    """Revision snapshots of text, oldest first"""
+    return fountain_revision.loads_revisions(text.get(REVISIONS_KEY, ""))
+
+def take_snapshot(text, name=""):
+    """Records the current draft of text as a new revision, returns it"""
+    revisions = get_revisions(text)
+    revision = fountain_revision.Revision(
+        name or fountain_revision.next_color(revisions),
+        time.strftime("%Y-%m-%d"),
+        fountain_revision.snapshot(_text_lines(text)),
+    )
+    revisions.append(revision)
+    text[REVISIONS_KEY] = fountain_revision.dumps_revisions(revisions)
+    _diffs.pop(text.name, None)
+    return revision
+
+def compute_diff(text):
+    """RevisionDiff of text against its last revision now, or None without revisions; cached"""
+    revisions = get_revisions(text)
+    if not revisions:
+        _diffs.pop(text.name, None)
+        return None
+    raw_content = text.as_string()
+    key = hash(raw_content)
+    cached = _diffs.get(text.name)
+    if cached is not None and cached[1] == key:
+        # Only the cursor moved
+        result = cached[2]
+    else:
+        result = fountain_revision.diff(revisions[-1].scenes, fountain_revision.snapshot(raw_content.split("\n")))
+    _diffs[text.name] = (screenwriter_live.edit_signature(text), key, result)
+    return result
+
+def revision_label(revision):
+    return f"{revision.name} Revision - {revision.created}"
+
+def _recompute(name):
+    _pending.discard(name)
+    text = bpy.data.texts.get(name)
+    if text is not None:
+        compute_diff(text)
+        screenwriter_live.redraw_text_editors()
+    return None
+
+def cached_diff(text):
+    """
+    RevisionDiff of text as last computed, or None. Never reads the whole text,
+    so it is safe to call from draw(): when its edit signature changed, a new
+    diff is scheduled on a timer and the previous one is returned until then.
+    """
+    cached = _diffs.get(text.name)
+    if (cached is None or cached[0] != screenwriter_live.edit_signature(text)) and text.name not in _pending:
+        _pending.add(text.name)
+        delay = 0.0 if cached is None else DIFF_DELAY
+        bpy.app.timers.register(functools.partial(_recompute, text.name), first_interval=delay)
+    return cached[2] if cached else None
+
+def draw_revisions(layout, text):
+    """The Revisions section of the sidebar; only reads the cached diff"""
+    box = layout.box()
+    row = box.row(align=True)
+    row.label(text="Revisions", icon="RECOVER_LAST")
+    row.operator(SCREENWRITER_OT_snapshot_revision.bl_idname, text="", icon="ADD")
+    if REVISIONS_KEY not in text:
+        box.label(text="No snapshot yet")
+        return
+    row.operator(SCREENWRITER_OT_clear_revisions.bl_idname, text="", icon="TRASH")
+
+    result = cached_diff(text)
+    if result is None:
+        box.label(text="Comparing...")
+        return
+    changed = [change for change in result.scenes if change.status != fountain_revision.MOVED]
+    box.label(text=f"{len(changed)} scenes changed, {len(result.marked)} lines marked")
+    col = box.column(align=True)
+    for change in result.scenes[:MAX_SHOWN]:
+        label = change.header or "(before the first scene)"
+        if change.line is None:
+            col.label(text=label, icon=ICONS[change.status])
+            continue
+        op = col.operator(
+            screenwriter_outline.SCREENWRITER_OT_jump_to_line.bl_idname,
+            text=label, icon=ICONS[change.status], emboss=False,
+        )
+        op.line = change.line
+    if len(result.scenes) > MAX_SHOWN:
+        col.label(text=f"... {len(result.scenes) - MAX_SHOWN} more")
+
+class SCREENWRITER_OT_snapshot_revision(bpy.types.Operator):
+    """Record the current draft as a revision; later changes are listed and marked with asterisks in the PDF"""
+    bl_idname = "screenwriter.snapshot_revision"
+    bl_label = "Snapshot Revision"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    name: bpy.props.StringProperty(
+        name="Name",
+        description="Revision name, the next page colour when empty",
+    )
+
+    def execute(self, context):
+        text = getattr(context, "edit_text", None)
+        if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+             text = context.space_data.text
+
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        revision = take_snapshot(text, self.name.strip())
+        self.report({'INFO'}, f"Recorded {revision_label(revision)} ({len(revision.scenes)} scenes)")
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_clear_revisions(bpy.types.Operator):
+    """Forget every revision snapshot of the current text"""
+    bl_idname = "screenwriter.clear_revisions"
+    bl_label = "Clear Revisions"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_confirm(self, event)
+
+    def execute(self, context):
+        text = getattr(context, "edit_text", None)
+        if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+             text = context.space_data.text
+
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        if REVISIONS_KEY in text:
+            del text[REVISIONS_KEY]
+        _diffs.pop(text.name, None)
+        return {'FINISHED'}
+
+classes = [
+    SCREENWRITER_OT_snapshot_revision,
+    SCREENWRITER_OT_clear_revisions,
+]
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+def unregister():
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    _diffs.clear()
+    _pending.clear()
@@ -1,5 +1,106 @@
 import bpy
-from . import fountain_io
+from . import fountain_scenes
+
+# Scene index from the last sync (JSON, see fountain_scenes.dumps_index)
+SCENE_INDEX_KEY = "screenwriter_scene_index"
+# On each synced scene: name of the text it belongs to
+TEXT_KEY = "screenwriter_text"
+# On a scene whose header was removed from its text
+ORPHAN_KEY = "screenwriter_orphan"
+
+def scene_users(text):
+    """{scene name: names of the texts using it} from the last sync of every other text"""
+    users = {}
+    for other in bpy.data.texts:
+        if other.name == text.name or SCENE_INDEX_KEY not in other:
+            continue
+        _source, entries = fountain_scenes.loads_index(other[SCENE_INDEX_KEY])
+        for name in fountain_scenes.scene_names(entries):
+            users.setdefault(name, set()).add(other.name)
+    return users
+
+def sync_scenes(text):
+    """
+    Creates, renames and flags Blender scenes to match the scene headers of text.
+    Identical headers in several texts share one scene, which belongs to the
+    first text that synced it; a scene another text still uses is never
+    renamed or flagged.
+    Returns (number of scenes created, [(old name, new name)] renamed, orphaned
+    scene names), or None when the text has no scene headers.
+    """
+    raw_content = text.as_string()
+    source = fountain_scenes.source_hash(raw_content)
+    old_source, old_entries = fountain_scenes.loads_index(text.get(SCENE_INDEX_KEY, ""))
+    
+    if source == old_source and old_entries:
+        # Script unchanged since the last sync: no need to parse it again
+        entries = old_entries
+    else:
+        entries = fountain_scenes.build_index(raw_content.splitlines())
+    
+    if not entries:
+        return None
+
+    created, renamed, orphaned, _changed = fountain_scenes.diff_index(old_entries, entries)
+    scenes = bpy.data.scenes
+    
+    # Scenes deleted by hand since the last sync are created again
+    synced = set(created).union(new_name for _, new_name in renamed)
+    created += [
+        name for name in fountain_scenes.scene_names(entries)
+        if name not in synced and scenes.get(name) is None
+    ]
+    created_count = 0
+    applied = []
+    flagged = []
+    # {scene name: other texts using it}, only looked up once an existing scene is touched
+    users = None
+
+    def other_users(name):
+        nonlocal users
+        if users is None:
+            users = scene_users(text)
+        return users.get(name, ())
+    
+    for old_name, new_name in renamed:
+        scene = scenes.get(old_name)
+        if scene is None or scenes.get(new_name) is not None or other_users(old_name):
+            # Renamed away, clashing with an existing scene or still used by
+            # another text: sync it as a new one
+            created.append(new_name)
+            if scene is not None:
+                orphaned.append(old_name)
+            continue
+        scene.name = new_name
+        applied.append((old_name, new_name))
+    
+    for scene_name in created:
+        scene = scenes.get(scene_name)
+        if scene is None:
+            scene = scenes.new(name=scene_name)
+            created_count += 1
+        elif scene.get(TEXT_KEY) not in (None, text.name) and scene[TEXT_KEY] in other_users(scene_name):
+            # Shared with the text it belongs to, which keeps it
+            continue
+        scene[TEXT_KEY] = text.name
+        if ORPHAN_KEY in scene:
+            del scene[ORPHAN_KEY]
+    
+    for scene_name in orphaned:
+        # Never delete: the scene may already hold layout work
+        scene = scenes.get(scene_name)
+        if scene is None:
+            continue
+        others = other_users(scene_name)
+        if not others:
+            scene[ORPHAN_KEY] = True
+            flagged.append(scene_name)
+        elif scene.get(TEXT_KEY) == text.name:
+            # Handed over to a text that still uses it
+            scene[TEXT_KEY] = min(others)
+
+    text[SCENE_INDEX_KEY] = fountain_scenes.dumps_index(source, entries)
+    return created_count, applied, flagged
 
 class SCREENWRITER_OT_sync_scenes(bpy.types.Operator):
     """Create Blender Scenes from Script Headers"""
@@ -16,30 +117,17 @@ class SCREENWRITER_OT_sync_scenes(bpy.types.Operator):
             self.report({'ERROR'}, "No active text.")
             return {'CANCELLED'}
             
-        # Parse data
-        elements = fountain_io.parse_fountain_elements(text.as_string())
-        
-        headers = [c for (t, c) in elements if t == "HEADER"]
-        
-        if not headers:
+        result = sync_scenes(text)
+        if result is None:
             self.report({'WARNING'}, "No scene headers found.")
             return {'CANCELLED'}
 
-        created_count = 0
-        existing_scenes = {s.name for s in bpy.data.scenes}
-        
-        for header in headers:
-            # Sanitize name?
-            scene_name = header.strip()
-            # Max length for blender name is 63 chars usually
-            scene_name = scene_name[:63]
-            
-            if scene_name not in existing_scenes:
-                bpy.data.scenes.new(name=scene_name)
-                created_count += 1
-                existing_scenes.add(scene_name)
-        
-        self.report({'INFO'}, f"Synced: Created {created_count} new scenes.")
+        created_count, renamed, orphaned = result
+        self.report(
+            {'INFO'},
+            f"Synced: Created {created_count} new scenes, renamed {len(renamed)}, "
+            f"flagged {len(orphaned)} orphaned.",
+        )
         return {'FINISHED'}
 
 def register():
@@ -0,0 +1,113 @@
+import bpy
+from . import fountain_io, fountain_search, screenwriter_live, screenwriter_outline
+
+# Results listed in the sidebar; the count shows how many there are in all
+MAX_SHOWN = 30
+
+# Built on the first search; each search re-indexes only the texts edited since
+_index = fountain_search.SearchIndex()
+# Hits of the last search, in sidebar order
+_results = []
+
+def refresh_index():
+    """Brings the index up to date with every Fountain text; returns the number re-indexed"""
+    names = []
+    updated = 0
+    for text in bpy.data.texts:
+        if fountain_io.is_fountain_text(text):
+            names.append(text.name)
+            # Only texts whose edit signature changed are read
+            updated += _index.update(text.name, screenwriter_live.edit_signature(text), text.as_string)
+    _index.retain(names)
+    return updated
+
+def search(query):
+    """Hits for a query string (see fountain_search.parse_query) across all Fountain texts"""
+    refresh_index()
+    return _index.search(fountain_search.parse_query(query))
+
+def _run_search(self, context):
+    # self is the window manager, whose search field was confirmed
+    _results[:] = search(self.screenwriter_search) if self.screenwriter_search.strip() else []
+
+def draw_search(layout, context):
+    """The Search section of the sidebar; only reads the results of the last search"""
+    wm = context.window_manager
+    box = layout.box()
+    row = box.row(align=True)
+    row.prop(wm, "screenwriter_search", text="", icon="VIEWZOOM")
+    row.operator(SCREENWRITER_OT_search.bl_idname, text="", icon="FILE_REFRESH")
+    if not wm.screenwriter_search.strip():
+        return
+    if not _results:
+        box.label(text="No matching scenes")
+        return
+
+    texts = {hit.text for hit in _results}
+    box.label(text=f"{len(_results)} scenes in {len(texts)} texts")
+    col = box.column(align=True)
+    for index, hit in enumerate(_results[:MAX_SHOWN]):
+        label = hit.header or "(before the first scene)"
+        if len(texts) > 1:
+            label = f"{hit.text}: {label}"
+        op = col.operator(SCREENWRITER_OT_open_search_result.bl_idname, text=label, emboss=False)
+        op.index = index
+    if len(_results) > MAX_SHOWN:
+        col.label(text=f"... {len(_results) - MAX_SHOWN} more, refine the search")
+
+class SCREENWRITER_OT_search(bpy.types.Operator):
+    """Search every Fountain text: @NAME or character:, location:, time: terms and words, e.g. @MARIA time:NIGHT"""
+    bl_idname = "screenwriter.search"
+    bl_label = "Search Scripts"
+
+    def execute(self, context):
+        wm = context.window_manager
+        _run_search(wm, context)
+        if wm.screenwriter_search.strip():
+            self.report({'INFO'}, f"{len(_results)} matching scenes")
+        return {'FINISHED'}
+
+class SCREENWRITER_OT_open_search_result(bpy.types.Operator):
+    """Show this scene in the Text Editor"""
+    bl_idname = "screenwriter.open_search_result"
+    bl_label = "Open Search Result"
+
+    index: bpy.props.IntProperty(min=0)
+
+    def execute(self, context):
+        if self.index >= len(_results):
+            return {'CANCELLED'}
+        hit = _results[self.index]
+        text = bpy.data.texts.get(hit.text)
+        if text is None:
+            self.report({'ERROR'}, f"Text '{hit.text}' no longer exists.")
+            return {'CANCELLED'}
+
+        space = getattr(context, "space_data", None)
+        if space and space.type == 'TEXT_EDITOR' and space.text != text:
+            space.text = text
+        # Lines may have moved since the search when the text was edited
+        screenwriter_outline.jump_to_line(context, text, min(hit.line, len(text.lines) - 1))
+        return {'FINISHED'}
+
+classes = [
+    SCREENWRITER_OT_search,
+    SCREENWRITER_OT_open_search_result,
+]
+
+def register():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+    bpy.types.WindowManager.screenwriter_search = bpy.props.StringProperty(
+        name="Search",
+        description="@NAME or character:NAME, location:, time: (DAY, NIGHT...) and words; "
+                    "quote values with spaces",
+        update=_run_search,
+    )
+
+def unregister():
+    del bpy.types.WindowManager.screenwriter_search
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+    _index.texts.clear()
+    _results.clear()
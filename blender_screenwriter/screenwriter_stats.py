@@ -0,0 +1,148 @@
+import functools
+import json
+import bpy
+from bpy_extras.io_utils import ExportHelper
+from . import fountain_document, fountain_stats, screenwriter_live
+
+# Seconds after the last edit before the statistics are counted again
+STATS_DELAY = 1.0
+
+# text name -> (edit signature, hash of the content, ScriptStats)
+_stats = {}
+# text name -> {scene source hash: SceneStats}, so a recount only redoes edited scenes
+_scene_caches = {}
+# Names of texts with a recount scheduled
+_pending = set()
+
+def compute_stats(text, raw_content=None):
+    """Counts the statistics of text now, reusing the scenes that did not change, and caches them"""
+    if raw_content is None:
+        raw_content = text.as_string()
+    document = fountain_document.ScriptDocument(raw_content)
+    stats = fountain_stats.analyze(document, _scene_caches.setdefault(text.name, {}))
+    _stats[text.name] = (screenwriter_live.edit_signature(text), hash(raw_content), stats)
+    return stats
+
+def _recount(name):
+    _pending.discard(name)
+    text = bpy.data.texts.get(name)
+    if text is not None:
+        raw_content = text.as_string()
+        cached = _stats.get(name)
+        if cached is not None and cached[1] == hash(raw_content):
+            # Only the cursor moved
+            _stats[name] = (screenwriter_live.edit_signature(text),) + cached[1:]
+        else:
+            compute_stats(text, raw_content)
+            screenwriter_live.redraw_text_editors()
+    return None
+
+def cached_stats(text):
+    """
+    ScriptStats for text as last counted, or None before the first count. Never
+    reads the whole text, so it is safe to call from draw(): when its edit
+    signature changed, a recount is scheduled on a timer and the previous values
+    are returned until then.
+    """
+    cached = _stats.get(text.name)
+    if (cached is None or cached[0] != screenwriter_live.edit_signature(text)) and text.name not in _pending:
+        _pending.add(text.name)
+        delay = 0.0 if cached is None else STATS_DELAY
+        bpy.app.timers.register(functools.partial(_recount, text.name), first_interval=delay)
+    return cached[2] if cached else None
+
+def draw_stats(layout, text, characters=5):
+    """The Statistics section of the sidebar; only reads cached values"""
+    box = layout.box()
+    box.label(text="Statistics", icon="INFO")
+    stats = cached_stats(text)
+    if stats is None:
+        box.label(text="Counting...")
+        return
+
+    totals = stats.totals
+    col = box.column(align=True)
+    col.label(text=f"{totals['scenes']} scenes, {fountain_stats.format_eighths(totals['eighths'])} pages")
+    col.label(text=f"{totals['words']} words, {totals['dialogue_words']} in dialogue")
+    int_ext = totals["int_ext"]
+    col.label(text=f"INT {int_ext.get('INT', 0)}  EXT {int_ext.get('EXT', 0)}  INT/EXT {int_ext.get('INT/EXT', 0)}")
+    day_night = totals["day_night"]
+    col.label(text=f"DAY {day_night.get('DAY', 0)}  NIGHT {day_night.get('NIGHT', 0)}  OTHER {day_night.get('OTHER', 0)}")
+
+    if stats.characters:
+        col.separator()
+        for name, character in list(stats.characters.items())[:characters]:
+            row = col.row()
+            row.label(text=name)
+            row.label(text=f"{character.words} words, {character.scenes} sc.")
+
+    row = box.row(align=True)
+    row.operator(SCREENWRITER_OT_export_stats.bl_idname, text="CSV").file_format = 'CSV'
+    row.operator(SCREENWRITER_OT_export_stats.bl_idname, text="JSON").file_format = 'JSON'
+
+class SCREENWRITER_OT_export_stats(bpy.types.Operator, ExportHelper):
+    """Export scene and character statistics of the current text"""
+    bl_idname = "screenwriter.export_stats"
+    bl_label = "Export Statistics"
+    filename_ext = ".csv"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.csv;*.json",
+        options={'HIDDEN'},
+        maxlen=255,
+    )
+
+    file_format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('CSV', "CSV", "One row per scene, for scheduling spreadsheets"),
+            ('JSON', "JSON", "Totals, characters and scenes"),
+        ],
+        default='CSV',
+    )
+
+    def check(self, context):
+        self.filename_ext = "." + self.file_format.lower()
+        return super().check(context)
+
+    def invoke(self, context, event):
+        self.filename_ext = "." + self.file_format.lower()
+        return super().invoke(context, event)
+
+    def execute(self, context):
+        text = getattr(context, "edit_text", None)
+        if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+             text = context.space_data.text
+
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        raw_content = text.as_string()
+        cached = _stats.get(text.name)
+        if cached is not None and cached[1] == hash(raw_content):
+            stats = cached[2]
+        else:
+            stats = compute_stats(text, raw_content)
+
+        try:
+            with open(self.filepath, "w", encoding="utf-8", newline="") as f:
+                if self.file_format == 'JSON':
+                    json.dump(fountain_stats.stats_dict(stats), f, indent=1, ensure_ascii=False)
+                else:
+                    fountain_stats.write_csv(f, stats)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to export statistics: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Exported statistics of {len(stats.scenes)} scenes to {self.filepath}")
+        return {'FINISHED'}
+
+def register():
+    bpy.utils.register_class(SCREENWRITER_OT_export_stats)
+
+def unregister():
+    bpy.utils.unregister_class(SCREENWRITER_OT_export_stats)
+    _stats.clear()
+    _scene_caches.clear()
+    _pending.clear()
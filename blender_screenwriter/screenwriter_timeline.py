@@ -0,0 +1,197 @@
+import os
+import bpy
+from . import fountain_timeline, screenwriter_scenes, screenwriter_stats
+
+# Timeline layout from the last sync (JSON, see fountain_timeline.dumps_layout)
+TIMELINE_KEY = "screenwriter_timeline"
+# On the master scene: name of the text it was built from
+MASTER_KEY = "screenwriter_master"
+# On each strip: the slot key it was created for
+STRIP_SCENE_KEY = "screenwriter_scene"
+STRIP_OCCURRENCE_KEY = "screenwriter_occurrence"
+# On each synced scene: the frame count the sync last gave it
+FRAMES_KEY = "screenwriter_frames"
+
+STRIP_CHANNEL = 1
+
+def _strips(editor):
+    # Blender 4.4 renamed sequence_editor.sequences to strips
+    return editor.strips if hasattr(editor, "strips") else editor.sequences
+
+def master_scene(text):
+    """The scene holding the timeline of text, created on first use"""
+    for scene in bpy.data.scenes:
+        if scene.get(MASTER_KEY) == text.name:
+            return scene
+    scene = bpy.data.scenes.new(name=f"{os.path.splitext(text.name)[0]} Timeline")
+    scene[MASTER_KEY] = text.name
+    return scene
+
+def _fit_scene(scene, length):
+    # Only resize scenes whose frame range is still the one the sync gave them,
+    # so a range set by hand during layout is kept
+    previous = scene.get(FRAMES_KEY)
+    if previous is None or previous == scene.frame_end - scene.frame_start + 1:
+        scene.frame_end = scene.frame_start + length - 1
+        scene[FRAMES_KEY] = length
+
+def sync_timeline(text, method='EIGHTHS', words_per_minute=150):
+    """
+    Syncs the scenes of text, then lays them out back to back as scene strips
+    in the master scene's sequencer, with a marker at every scene start.
+    Only strips whose slot changed since the last sync are moved or resized;
+    the strips and markers of renamed scenes are renamed in place.
+    Returns (created, resized, moved, removed) strip counts, or None when the
+    text has no scene headers.
+    """
+    result = screenwriter_scenes.sync_scenes(text)
+    if result is None:
+        return None
+    _created_scenes, renamed, _orphaned = result
+
+    stats = screenwriter_stats.compute_stats(text)
+    master = master_scene(text)
+    fps = master.render.fps / master.render.fps_base
+    slots = fountain_timeline.layout(stats.scenes, fps, method, words_per_minute, master.frame_start)
+
+    # A renamed scene keeps its strip and marker
+    renames = dict(renamed)
+    old_names = {}
+    old_slots = []
+    for slot in fountain_timeline.loads_layout(text.get(TIMELINE_KEY, "")):
+        name, occurrence = slot.key
+        key = (renames.get(name, name), occurrence)
+        old_names[key] = name
+        old_slots.append(slot._replace(key=key))
+
+    editor = master.sequence_editor or master.sequence_editor_create()
+    strips = _strips(editor)
+    by_key = {}
+    for strip in strips:
+        name = strip.get(STRIP_SCENE_KEY)
+        if name is not None:
+            by_key[(renames.get(name, name), strip.get(STRIP_OCCURRENCE_KEY, 0))] = strip
+    markers = {(marker.name, marker.frame): marker for marker in master.timeline_markers}
+
+    # Renamed with their scene whether or not their slot changed, so the next
+    # sync still finds them under the new name
+    for (name, _occurrence), strip in by_key.items():
+        if strip.get(STRIP_SCENE_KEY) != name:
+            strip.name = strip[STRIP_SCENE_KEY] = name
+    for slot in old_slots:
+        old_name = old_names[slot.key]
+        marker = markers.pop((old_name, slot.start), None) if old_name != slot.key[0] else None
+        if marker is not None:
+            marker.name = slot.key[0]
+            markers[(slot.key[0], slot.start)] = marker
+
+    created, changed, moved, removed = fountain_timeline.diff_layout(old_slots, slots)
+    # Strips deleted by hand since the last sync are created again
+    touched = {slot.key for slot in created + changed + moved}
+    created += [slot for slot in slots if slot.key not in by_key and slot.key not in touched]
+    created_keys = {slot.key for slot in created}
+    changed = [slot for slot in changed if slot.key not in created_keys]
+    moved = [slot for slot in moved if slot.key not in created_keys]
+    old_by_key = {slot.key: slot for slot in old_slots}
+    scenes = bpy.data.scenes
+
+    for slot in removed:
+        strip = by_key.pop(slot.key, None)
+        if strip is not None:
+            strips.remove(strip)
+        marker = markers.pop((slot.key[0], slot.start), None)
+        if marker is not None:
+            master.timeline_markers.remove(marker)
+
+    # Park every strip that changes past the end of the timeline first, so no
+    # strip is ever placed over another one (the sequencer would shuffle it to
+    # another channel)
+    parked = []
+    park = max([strip.frame_final_end for strip in strips] + [slots[-1].start + slots[-1].length])
+    for slot in changed + moved + created:
+        scene = scenes.get(slot.key[0])
+        if scene is None:
+            continue
+        _fit_scene(scene, slot.length)
+        strip = by_key.get(slot.key)
+        if strip is None:
+            strip = strips.new_scene(name=slot.key[0], scene=scene, channel=STRIP_CHANNEL, frame_start=park)
+            strip[STRIP_SCENE_KEY] = slot.key[0]
+            strip[STRIP_OCCURRENCE_KEY] = slot.key[1]
+        else:
+            strip.frame_start = park
+        strip.frame_final_duration = slot.length
+        park += max(slot.length, strip.frame_final_duration)
+        parked.append((slot, strip))
+
+    for slot, strip in parked:
+        strip.channel = STRIP_CHANNEL
+        strip.frame_start = slot.start
+
+        old = old_by_key.get(slot.key)
+        marker = None
+        if old is not None:
+            marker = markers.pop((slot.key[0], old.start), None)
+        if marker is None:
+            marker = master.timeline_markers.new(slot.key[0], frame=slot.start)
+        marker.name = slot.key[0]
+        marker.frame = slot.start
+
+    master.frame_end = slots[-1].start + slots[-1].length - 1
+    text[TIMELINE_KEY] = fountain_timeline.dumps_layout(slots)
+    return len(created), len(changed), len(moved), len(removed)
+
+class SCREENWRITER_OT_sync_timeline(bpy.types.Operator):
+    """Sync scenes, then lay them out as scene strips in a master timeline sized by estimated screen time"""
+    bl_idname = "screenwriter.sync_timeline"
+    bl_label = "Sync Timeline"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    method: bpy.props.EnumProperty(
+        name="Duration",
+        items=[
+            ('EIGHTHS', "Page Length", "One page (eight eighths) is one minute"),
+            ('WORDS', "Word Count", "Every word of the scene read at the given rate"),
+        ],
+        default='EIGHTHS',
+    )
+    words_per_minute: bpy.props.IntProperty(
+        name="Words per Minute",
+        default=150,
+        min=30,
+        max=400,
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "method")
+        row = layout.row()
+        row.active = self.method == 'WORDS'
+        row.prop(self, "words_per_minute")
+
+    def execute(self, context):
+        text = getattr(context, "edit_text", None)
+        if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+             text = context.space_data.text
+
+        if not text:
+            self.report({'ERROR'}, "No active text.")
+            return {'CANCELLED'}
+
+        result = sync_timeline(text, self.method, self.words_per_minute)
+        if result is None:
+            self.report({'WARNING'}, "No scene headers found.")
+            return {'CANCELLED'}
+
+        created, resized, moved, removed = result
+        self.report(
+            {'INFO'},
+            f"Timeline: created {created} strips, resized {resized}, moved {moved}, removed {removed}.",
+        )
+        return {'FINISHED'}
+
+def register():
+    bpy.utils.register_class(SCREENWRITER_OT_sync_timeline)
+
+def unregister():
+    bpy.utils.unregister_class(SCREENWRITER_OT_sync_timeline)
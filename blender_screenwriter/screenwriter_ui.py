@@ -1,4 +1,5 @@
 import bpy
+from . import fountain_io, screenwriter_outline, screenwriter_pages, screenwriter_prefs, screenwriter_revision, screenwriter_search, screenwriter_stats
 
 class SCREENWRITER_PT_main_panel(bpy.types.Panel):
     """Creates a Panel in the Text Editor UI"""
@@ -21,18 +22,72 @@ class SCREENWRITER_PT_main_panel(bpy.types.Panel):
 
         col.separator()
         col.operator("screenwriter.save_fountain", text="Save Fountain", icon="FILE_TICK")
+        text = context.space_data.text
+        if text and text.get("screenwriter_external_change"):
+            box = col.box()
+            box.alert = True
+            box.label(text="File changed on disk", icon="ERROR")
+            box.operator("screenwriter.reload_fountain", icon="FILE_REFRESH")
         col.operator("screenwriter.format_fountain", text="Format Text as Fountain", icon="FILE_REFRESH")
+        prefs = screenwriter_prefs.get_preferences(context)
+        if prefs:
+            col.prop(prefs, "use_live_format", text="Live Formatting", icon="AUTO")
         
+        if text and fountain_io.is_fountain_text(text):
+            estimate = screenwriter_pages.page_estimate(text)
+            col.separator()
+            if estimate is None:
+                col.label(text="Counting pages...", icon="TIME")
+            else:
+                col.label(text=f"{estimate.pages} pages, ~{estimate.minutes:.0f} min", icon="TIME")
+
         col.separator()
         col.operator("screenwriter.sync_scenes", text="Sync to Scenes", icon="SCENE_DATA")
+        col.operator("screenwriter.sync_timeline", text="Sync to Timeline", icon="SEQUENCE")
+        col.operator("screenwriter.breakdown_scenes", text="Breakdown to Scenes", icon="OUTLINER_COLLECTION")
         
         row = layout.row(align=True)
 
         row.operator("screenwriter.import_fountain", text="Import")
         row.operator("screenwriter.export_fountain", text="Export")
+        row.operator("screenwriter.export_pdf", text="PDF")
+
+        row = layout.row(align=True)
+        row.operator("screenwriter.batch_import_fountain", text="Batch Import")
+        row.operator("screenwriter.batch_export_fountain", text="Batch Export")
+
+        screenwriter_search.draw_search(layout, context)
+
+class SCREENWRITER_PT_script_panel(bpy.types.Panel):
+    """Outline, statistics and revisions of the Fountain text in the Text Editor"""
+    bl_label = "Script"
+    bl_idname = "SCREENWRITER_PT_script_panel"
+    bl_space_type = 'TEXT_EDITOR'
+    bl_region_type = 'UI'
+    bl_category = "Screenwriter"
+
+    @classmethod
+    def poll(cls, context):
+        # Not for Python scripts: nothing to outline, and their caches would only cost memory
+        text = context.space_data.text
+        return text is not None and fountain_io.is_fountain_text(text)
+
+    def draw(self, context):
+        layout = self.layout
+        text = context.space_data.text
+        screenwriter_outline.draw_outline(layout, text)
+        screenwriter_stats.draw_stats(layout, text)
+        screenwriter_revision.draw_revisions(layout, text)
+
+classes = [
+    SCREENWRITER_PT_main_panel,
+    SCREENWRITER_PT_script_panel,
+]
 
 def register():
-    bpy.utils.register_class(SCREENWRITER_PT_main_panel)
+    for cls in classes:
+        bpy.utils.register_class(cls)
 
 def unregister():
-    bpy.utils.unregister_class(SCREENWRITER_PT_main_panel)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
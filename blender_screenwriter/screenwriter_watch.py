@@ -0,0 +1,178 @@
+import os
+import bpy
+from . import fountain_diff, fountain_io, fountain_parser, screenwriter_live, screenwriter_ops, screenwriter_prefs
+
+# Seconds between two ticks of the watcher
+WATCH_INTERVAL = 0.25
+# Files checked per tick, however many texts are watched, so a tick costs the same
+FILES_PER_TICK = 4
+EXTERNAL_CHANGE_KEY = fountain_io.EXTERNAL_CHANGE_KEY
+
+_state = {
+    "names": [],   # texts linked to a .fountain file, as of the last full pass
+    "position": 0, # next one to check
+}
+
+def replace_lines(text, start, stop, new_lines):
+    """Replaces lines start to stop of text with new_lines, leaving every other line untouched"""
+    lines = text.lines
+    if stop - start == len(new_lines):
+        for i, line in enumerate(new_lines, start):
+            lines[i].body = line
+        return
+
+    if stop < len(lines):
+        # From the start of line start to the start of line stop
+        text.select_set(start, 0, stop, 0)
+        text.write("".join([line + "\n" for line in new_lines]))
+    elif start > 0:
+        # Through the end of the text: from the end of the line before
+        text.select_set(start - 1, len(lines[start - 1].body), stop - 1, len(lines[stop - 1].body))
+        text.write("".join(["\n" + line for line in new_lines]))
+    else:
+        text.clear()
+        text.write("\n".join(new_lines))
+
+def _read(filepath):
+    # Stat first: a change made while reading is picked up by the next check
+    st = os.stat(filepath)
+    with open(filepath, "r", encoding="utf-8") as f:
+        return st, fountain_parser.file_lines(f.read())
+
+def reload_text(text, file_data=None):
+    """
+    Brings text in line with its linked file: only the hunks of lines that
+    differ (ignoring indentation) are replaced, then formatted through the
+    incremental formatter. file_data is (os.stat result, lines) if already read.
+    Returns the number of hunks applied.
+    """
+    filepath = bpy.path.abspath(text.filepath)
+    st, lines = file_data or _read(filepath)
+    current = [line.strip() for line in text.as_string().split("\n")]
+    new = [line.strip() for line in lines]
+
+    hunks = fountain_diff.line_hunks(current, new)
+    # Last hunk first, so the line numbers of the ones before stay valid
+    for old_start, old_stop, new_start, new_stop in reversed(hunks):
+        replace_lines(text, old_start, old_stop, new[new_start:new_stop])
+    if hunks:
+        # One edit from the first hunk through the last: the lines around them are all that is read
+        edit = (hunks[0][0], hunks[-1][1], hunks[-1][3])
+        fountain_io.format_text_block_incremental(text, edit, screenwriter_ops.cached_line_types(text))
+
+    fountain_io.set_save_stamp(text, filepath, fountain_parser.stripped_hash(new), st=st)
+    if EXTERNAL_CHANGE_KEY in text:
+        del text[EXTERNAL_CHANGE_KEY]
+    return len(hunks)
+
+def check_text(text):
+    """
+    Compares the linked file of text with the stamp of the last save or reload,
+    by size and mtime only. If the file changed, reloads it, or flags the text
+    when it has unsaved edits of its own. Returns 'RELOADED', 'CONFLICT' or None.
+    """
+    filepath = bpy.path.abspath(text.filepath)
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None
+    _source, stamp = fountain_io.get_save_stamp(text)
+    path = os.path.abspath(filepath)
+    if stamp is not None and stamp[0] == path and stamp[2:] == [st.st_size, st.st_mtime_ns]:
+        return None
+    signature = f"{st.st_size}:{st.st_mtime_ns}"
+    if text.get(EXTERNAL_CHANGE_KEY) == signature:
+        # Already flagged, waiting for the user to reload or save
+        return None
+
+    try:
+        file_data = _read(filepath)
+    except (OSError, UnicodeDecodeError):
+        return None
+    digest = fountain_parser.stripped_hash(file_data[1])
+    local = fountain_parser.stripped_hash(text.as_string().split("\n"))
+    if digest == local:
+        # Touched, or changed to what the text already holds
+        fountain_io.set_save_stamp(text, filepath, digest, st=file_data[0])
+        return None
+    if stamp is None or stamp[0] != path:
+        # Never synced with this file (e.g. linked before stamps were kept): nothing
+        # tells which side changed, so start watching from here. The next save
+        # writes the text's version.
+        fountain_io.set_file_stamp(text, filepath, digest, st=file_data[0])
+        return None
+    if local != stamp[1]:
+        # Edited here since the last sync: keep both, let the user decide
+        text[EXTERNAL_CHANGE_KEY] = signature
+        return 'CONFLICT'
+
+    hunks = reload_text(text, file_data)
+    print(f"Screenwriter: reloaded {text.name} from disk ({hunks} changed hunks)")
+    return 'RELOADED'
+
+def watch_tick():
+    """bpy.app.timers callback: checks the next FILES_PER_TICK watched files, round robin"""
+    prefs = screenwriter_prefs.get_preferences()
+    if prefs is not None and not prefs.use_file_watcher:
+        return None
+
+    changed = False
+    for _ in range(FILES_PER_TICK):
+        if _state["position"] >= len(_state["names"]):
+            # A full pass is done: pick up texts linked or removed since
+            _state["names"] = [
+                text.name for text in bpy.data.texts
+                if text.filepath and fountain_io.is_fountain_text(text)
+            ]
+            _state["position"] = 0
+            if not _state["names"]:
+                break
+        name = _state["names"][_state["position"]]
+        _state["position"] += 1
+        text = bpy.data.texts.get(name)
+        if text is not None and check_text(text):
+            changed = True
+
+    if changed:
+        screenwriter_live.redraw_text_editors()
+    return WATCH_INTERVAL
+
+def update_timer():
+    """Starts the watcher if it is not already running; it stops itself when disabled"""
+    if not bpy.app.timers.is_registered(watch_tick):
+        bpy.app.timers.register(watch_tick, first_interval=WATCH_INTERVAL, persistent=True)
+
+class SCREENWRITER_OT_reload_fountain(bpy.types.Operator):
+    """Reload the linked .fountain file, replacing only the lines that changed on disk (unsaved edits to them are lost)"""
+    bl_idname = "screenwriter.reload_fountain"
+    bl_label = "Reload from Disk"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        text = getattr(context, "edit_text", None)
+        if not text and hasattr(context, "space_data") and context.space_data.type == "TEXT_EDITOR":
+             text = context.space_data.text
+
+        if not text or not text.filepath:
+            self.report({'ERROR'}, "No active text linked to a file.")
+            return {'CANCELLED'}
+
+        try:
+            hunks = reload_text(text)
+        except (OSError, UnicodeDecodeError) as e:
+            self.report({'ERROR'}, f"Failed to reload: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Reloaded {hunks} changed hunks from {text.filepath}")
+        return {'FINISHED'}
+
+def register():
+    bpy.utils.register_class(SCREENWRITER_OT_reload_fountain)
+    # The tick stops itself when the watcher is disabled in the preferences
+    update_timer()
+
+def unregister():
+    if bpy.app.timers.is_registered(watch_tick):
+        bpy.app.timers.unregister(watch_tick)
+    bpy.utils.unregister_class(SCREENWRITER_OT_reload_fountain)
+    _state.update(names=[], position=0)